@@ -8,15 +8,19 @@ This module provides admin-only endpoints for:
 - Resetting user passwords
 """
 
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, status
 from pydantic import BaseModel, Field
-from sqlalchemy.orm import Session
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from datetime import datetime
 
-from database import get_db, User
-from auth_utils import hash_password, validate_password_strength
+from database import get_async_db, User
+from auth_utils import hash_password_async, validate_password_strength
 from auth import get_current_user
+from user_cache import user_cache
+from agents.llm_clients import llm_metrics
+from pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, parse_sort, keyset_page, page_rows, etag_response
 
 router = APIRouter(prefix="/api/admin", tags=["admin"])
 
@@ -73,51 +77,79 @@ class AdminResponse(BaseModel):
     message: str
     user: Optional[dict] = None
     users: Optional[List[dict]] = None
+    next_cursor: Optional[str] = None
 
 
 @router.get("/users", response_model=AdminResponse)
 async def list_users(
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    sort: str = "id",
+    q: Optional[str] = Query(None, description="Username or email contains"),
+    is_admin: Optional[bool] = None,
     admin_user: User = Depends(get_admin_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
-    List all users in the system.
+    List users in the system, one page at a time.
     
-    Admin-only endpoint that returns all users without password information.
+    Admin-only endpoint that returns users without password information.
+    Pass next_cursor back as cursor for the following page.
     
     Args:
+        request: Incoming request (for If-None-Match)
+        limit: Page size
+        cursor: next_cursor of the previous page
+        sort: id, username or created_at, prefixed with "-" for descending
+        q: Filter on username or email
+        is_admin: Filter on admin flag
         admin_user: Current admin user
         db: Database session
         
     Returns:
-        AdminResponse: List of all users
+        AdminResponse: One page of users, with ETag
     """
-    users = db.query(User).all()
+    sort_name, sort_column, descending = parse_sort(sort, {
+        "id": User.id,
+        "username": User.username,
+        "created_at": User.created_at
+    })
+    
+    stmt = select(User.id, User.username, User.email, User.is_admin, User.created_at, User.updated_at)
+    if q:
+        stmt = stmt.where(or_(User.username.contains(q, autoescape=True), User.email.contains(q, autoescape=True)))
+    if is_admin is not None:
+        stmt = stmt.where(User.is_admin == is_admin)
+    
+    rows = (await db.execute(keyset_page(stmt, sort_column, User.id, descending, cursor, limit))).all()
+    rows, next_cursor = page_rows(rows, limit, sort_name)
     
     user_list = [
         {
-            "id": user.id,
-            "username": user.username,
-            "email": user.email,
-            "is_admin": user.is_admin,
-            "created_at": user.created_at.isoformat(),
-            "updated_at": user.updated_at.isoformat()
+            "id": row.id,
+            "username": row.username,
+            "email": row.email,
+            "is_admin": row.is_admin,
+            "created_at": row.created_at.isoformat(),
+            "updated_at": row.updated_at.isoformat()
         }
-        for user in users
+        for row in rows
     ]
     
-    return AdminResponse(
+    return etag_response(request, AdminResponse(
         success=True,
-        message=f"Found {len(users)} users",
-        users=user_list
-    )
+        message=f"Found {len(user_list)} users",
+        users=user_list,
+        next_cursor=next_cursor
+    ))
 
 
 @router.post("/users", response_model=AdminResponse, status_code=status.HTTP_201_CREATED)
 async def create_user(
     request: CreateUserRequest,
     admin_user: User = Depends(get_admin_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Create a new user as admin.
@@ -144,7 +176,7 @@ async def create_user(
         )
     
     # Check if username already exists
-    existing_user = db.query(User).filter(User.username == request.username).first()
+    existing_user = await db.scalar(select(User).where(User.username == request.username))
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -153,7 +185,7 @@ async def create_user(
     
     # Check if email already exists (if provided)
     if request.email:
-        existing_email = db.query(User).filter(User.email == request.email).first()
+        existing_email = await db.scalar(select(User).where(User.email == request.email))
         if existing_email:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -161,7 +193,7 @@ async def create_user(
             )
     
     # Create new user
-    hashed_pw = hash_password(request.password)
+    hashed_pw = await hash_password_async(request.password)
     new_user = User(
         username=request.username,
         email=request.email,
@@ -170,8 +202,8 @@ async def create_user(
     )
     
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
     
     return AdminResponse(
         success=True,
@@ -189,7 +221,7 @@ async def create_user(
 async def delete_user(
     user_id: int,
     admin_user: User = Depends(get_admin_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Delete a user from the system.
@@ -208,7 +240,7 @@ async def delete_user(
         HTTPException: If user not found or trying to delete self
     """
     # Check if user exists
-    user_to_delete = db.query(User).filter(User.id == user_id).first()
+    user_to_delete = await db.get(User, user_id)
     if not user_to_delete:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -224,8 +256,9 @@ async def delete_user(
     
     # Delete user
     username = user_to_delete.username
-    db.delete(user_to_delete)
-    db.commit()
+    await db.delete(user_to_delete)
+    await db.commit()
+    user_cache.invalidate_user(user_id)
     
     return AdminResponse(
         success=True,
@@ -238,7 +271,7 @@ async def reset_user_password(
     user_id: int,
     request: ResetPasswordRequest,
     admin_user: User = Depends(get_admin_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Reset a user's password as admin.
@@ -266,7 +299,7 @@ async def reset_user_password(
         )
     
     # Check if user exists
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -274,11 +307,30 @@ async def reset_user_password(
         )
     
     # Reset password
-    user.password_hash = hash_password(request.new_password)
-    db.commit()
+    user.password_hash = await hash_password_async(request.new_password)
+    await db.commit()
+    user_cache.invalidate_user(user_id)
     
     return AdminResponse(
         success=True,
         message=f"Password reset successfully for user '{user.username}'"
     )
 
+
+
+@router.get("/llm-metrics")
+async def get_llm_metrics(admin_user: User = Depends(get_admin_user)):
+    """
+    Get LLM request metrics per model.
+    
+    Admin-only endpoint reporting calls, failures, retries and latency
+    percentiles for every OpenAI model used by this process, plus how many
+    TCP connections the shared client pools have opened.
+    
+    Args:
+        admin_user: Current admin user
+        
+    Returns:
+        dict: Metrics snapshot from agents/llm_clients.py
+    """
+    return llm_metrics.snapshot()
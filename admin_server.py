@@ -5,224 +5,97 @@ Runs on localhost:9002 and provides a web interface for:
 - Viewing git status
 - Viewing database tables and records
 - Quick links to resources
+
+The page is static: it is rendered from DASHBOARD_TEMPLATE and gzipped once
+at startup, and fetches its data from /api/status. That endpoint serves the
+shared system_status snapshot (see system_status.py), which a background
+thread keeps fresh, so no request waits on git or COUNT(*). Each client is
+served on its own thread (ThreadingHTTPServer).
+
+Both responses carry an ETag and are gzipped for clients that accept it; a
+request whose If-None-Match matches gets 304 Not Modified.
+
+Configuration (environment variables):
+    ADMIN_PORT                Port to listen on (default 9002)
+    ADMIN_REFRESH_SECONDS     How often the page re-fetches /api/status (default 10)
+    STATUS_REFRESH_SECONDS    Snapshot refresh interval, and the other STATUS_*
+                              settings in system_status.py
 """
 
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from string import Template
+from typing import Optional
+import gzip
+import hashlib
 import json
 import os
-import subprocess
-import sqlite3
-from datetime import datetime
+import threading
 
-class AdminHandler(BaseHTTPRequestHandler):
-    """Handle admin dashboard requests."""
-    
-    def do_GET(self):
-        """Serve admin dashboard or API endpoints."""
-        
-        if self.path == '/' or self.path == '/index.html':
-            # Serve main dashboard page
-            self.send_response(200)
-            self.send_header('Content-type', 'text/html')
-            self.end_headers()
-            
-            html = self.generate_dashboard_html()
-            self.wfile.write(html.encode())
-            
-        elif self.path == '/api/status':
-            # Serve status JSON for dashboard refresh
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json')
-            self.end_headers()
-            
-            status = self.get_system_status()
-            self.wfile.write(json.dumps(status).encode())
-            
-        else:
-            self.send_error(404)
-    
-    def get_system_status(self):
-        """Gather system status information."""
-        status = {
-            "project": self.get_project_info(),
-            "git": self.get_git_status(),
-            "database": self.get_database_info(),
-            "timestamp": datetime.now().isoformat()
-        }
-        return status
-    
-    def get_project_info(self):
-        """Get project information from config."""
-        try:
-            with open('user_config.json', 'r', encoding='utf-8') as f:
-                config = json.load(f)
-            
-            return {
-                "name": config.get('user_identity', {}).get('project_name', 'Unknown'),
-                "user": config.get('user_identity', {}).get('user_name', 'Unknown'),
-                "environment": os.getenv('ENVIRONMENT', 'development')
-            }
-        except:
-            return {
-                "name": "Unknown",
-                "user": "Unknown",
-                "environment": "development"
-            }
-    
-    def get_git_status(self):
-        """Get current git branch and commit info."""
-        try:
-            branch = subprocess.check_output(
-                ['git', 'branch', '--show-current'],
-                text=True,
-                stderr=subprocess.DEVNULL
-            ).strip()
-            
-            commit_hash = subprocess.check_output(
-                ['git', 'rev-parse', '--short', 'HEAD'],
-                text=True,
-                stderr=subprocess.DEVNULL
-            ).strip()
-            
-            commit_msg = subprocess.check_output(
-                ['git', 'log', '-1', '--pretty=%B'],
-                text=True,
-                stderr=subprocess.DEVNULL
-            ).strip()
-            
-            # Check if there are uncommitted changes
-            status_output = subprocess.check_output(
-                ['git', 'status', '--porcelain'],
-                text=True,
-                stderr=subprocess.DEVNULL
-            ).strip()
-            
-            has_changes = bool(status_output)
-            
-            return {
-                "branch": branch,
-                "commit_hash": commit_hash,
-                "commit_message": commit_msg,
-                "has_uncommitted_changes": has_changes,
-                "status": "⚠️ Uncommitted changes" if has_changes else "✅ Clean"
-            }
-        except:
-            return {
-                "branch": "unknown",
-                "commit_hash": "N/A",
-                "commit_message": "N/A",
-                "has_uncommitted_changes": False,
-                "status": "⚠️ Git info unavailable"
-            }
-    
-    def get_database_info(self):
-        """Get SQLite database information."""
-        db_path = 'boot_lang.db'
-        
-        if not os.path.exists(db_path):
-            return {
-                "exists": False,
-                "tables": [],
-                "total_records": 0
-            }
-        
-        try:
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
-            
-            # Get list of tables
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%';")
-            tables = cursor.fetchall()
-            
-            table_info = []
-            total_records = 0
-            
-            for (table_name,) in tables:
-                try:
-                    cursor.execute(f"SELECT COUNT(*) FROM {table_name}")
-                    count = cursor.fetchone()[0]
-                    total_records += count
-                    table_info.append({
-                        "name": table_name,
-                        "records": count
-                    })
-                except:
-                    table_info.append({
-                        "name": table_name,
-                        "records": "Error"
-                    })
-            
-            conn.close()
-            
-            return {
-                "exists": True,
-                "tables": table_info,
-                "total_records": total_records
-            }
-        except Exception as e:
-            return {
-                "exists": True,
-                "tables": [],
-                "total_records": 0,
-                "error": str(e)
-            }
+from system_status import system_status
+
+ADMIN_PORT = int(os.getenv("ADMIN_PORT", "9002"))
+REFRESH_SECONDS = float(os.getenv("ADMIN_REFRESH_SECONDS", "10"))
+
+
+class EncodedResponse:
+    """A response body encoded once: raw and gzipped bytes plus a weak ETag."""
     
-    def generate_dashboard_html(self):
-        """Generate the admin dashboard HTML."""
-        status = self.get_system_status()
-        
-        # Build tables HTML
-        tables_html = ""
-        if status['database']['exists'] and status['database']['tables']:
-            for table in status['database']['tables']:
-                tables_html += f'<div class="table-item"><span class="table-name">{table["name"]}</span><span class="table-count">{table["records"]} records</span></div>'
-        else:
-            tables_html = "<div class='empty-state'>Database not initialized yet</div>"
-        
-        html = f"""
-<!DOCTYPE html>
+    def __init__(self, body: bytes, content_type: str, etag_source: Optional[bytes] = None):
+        """
+        Args:
+            body: Response body
+            content_type: Content-Type header value
+            etag_source: Bytes the ETag is derived from (default: the body)
+        """
+        self.body = body
+        self.gzipped = gzip.compress(body)
+        self.content_type = content_type
+        self.etag = 'W/"' + hashlib.sha256(etag_source or body).hexdigest()[:32] + '"'
+
+
+DASHBOARD_TEMPLATE = Template("""<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>Boot Lang Admin Dashboard</title>
     <style>
-        * {{
+        * {
             margin: 0;
             padding: 0;
             box-sizing: border-box;
-        }}
+        }
         
-        body {{
+        body {
             font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Arial, sans-serif;
             background: #f7fafc;
             color: #2d3748;
-        }}
+        }
         
-        .header {{
+        .header {
             background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
             color: white;
             padding: 24px;
             box-shadow: 0 2px 8px rgba(0,0,0,0.1);
-        }}
+        }
         
-        .header h1 {{
+        .header h1 {
             font-size: 28px;
             margin-bottom: 8px;
-        }}
+        }
         
-        .header p {{
+        .header p {
             opacity: 0.9;
             font-size: 14px;
-        }}
+        }
         
-        .container {{
+        .container {
             max-width: 1200px;
             margin: 0 auto;
             padding: 24px;
-        }}
+        }
         
-        .refresh-button {{
+        .refresh-button {
             background: #667eea;
             color: white;
             border: none;
@@ -231,71 +104,71 @@ class AdminHandler(BaseHTTPRequestHandler):
             cursor: pointer;
             font-size: 14px;
             margin-bottom: 20px;
-        }}
+        }
         
-        .refresh-button:hover {{
+        .refresh-button:hover {
             background: #5568d3;
-        }}
+        }
         
-        .grid {{
+        .grid {
             display: grid;
             grid-template-columns: repeat(auto-fit, minmax(300px, 1fr));
             gap: 20px;
             margin-bottom: 24px;
-        }}
+        }
         
-        .card {{
+        .card {
             background: white;
             border-radius: 12px;
             padding: 24px;
             box-shadow: 0 2px 8px rgba(0,0,0,0.1);
-        }}
+        }
         
-        .card h2 {{
+        .card h2 {
             font-size: 18px;
             margin-bottom: 16px;
             color: #667eea;
-        }}
+        }
         
-        .info-row {{
+        .info-row {
             display: flex;
             justify-content: space-between;
             padding: 8px 0;
             border-bottom: 1px solid #e2e8f0;
-        }}
+        }
         
-        .info-row:last-child {{
+        .info-row:last-child {
             border-bottom: none;
-        }}
+        }
         
-        .label {{
+        .label {
             font-weight: 600;
             color: #4a5568;
             font-size: 14px;
-        }}
+        }
         
-        .value {{
+        .value {
             color: #2d3748;
             font-size: 14px;
             text-align: right;
             word-break: break-word;
             max-width: 60%;
-        }}
+        }
         
-        .link {{
+        .link {
             color: #667eea;
             text-decoration: none;
-        }}
+        }
         
-        .link:hover {{
+        .link:hover {
             text-decoration: underline;
-        }}
+        }
         
-        .table-list {{
+        .table-list {
             margin-top: 12px;
-        }}
+        }
         
-        .table-item {{
+        .table-item {
             background: #f7fafc;
             padding: 8px 12px;
             margin-bottom: 8px;
@@ -303,45 +176,51 @@ class AdminHandler(BaseHTTPRequestHandler):
             display: flex;
             justify-content: space-between;
             align-items: center;
-        }}
+        }
         
-        .table-name {{
+        .table-name {
             font-weight: 600;
             font-size: 14px;
-        }}
+        }
         
-        .table-count {{
+        .table-count {
             background: #667eea;
             color: white;
             padding: 2px 8px;
             border-radius: 12px;
             font-size: 12px;
-        }}
+        }
         
-        .status-badge {{
+        .status-badge {
             display: inline-block;
             padding: 4px 12px;
             border-radius: 12px;
             font-size: 12px;
             font-weight: 600;
-        }}
+        }
         
-        .status-success {{
+        .status-success {
             background: #c6f6d5;
             color: #22543d;
-        }}
+        }
         
-        .status-warning {{
+        .status-warning {
             background: #feebc8;
             color: #7c2d12;
-        }}
+        }
+        
+        .updated {
+            margin-left: 12px;
+            color: #718096;
+            font-size: 13px;
+        }
         
-        .empty-state {{
+        .empty-state {
             text-align: center;
             padding: 20px;
             color: #718096;
             font-style: italic;
-        }}
+        }
     </style>
 </head>
 <body>
@@ -349,7 +228,7 @@ class AdminHandler(BaseHTTPRequestHandler):
         <div style="display: flex; justify-content: space-between; align-items: center;">
             <div>
                 <h1>🎯 Boot Lang Admin Dashboard</h1>
-                <p>{status['project']['name']} - {status['project']['environment']}</p>
+                <p id="subtitle">Loading...</p>
             </div>
             <a href="http://localhost:3000" 
                target="prd_builder"
@@ -360,59 +239,26 @@ class AdminHandler(BaseHTTPRequestHandler):
     </div>
     
     <div class="container">
-        <button class="refresh-button" onclick="location.reload()">🔄 Refresh</button>
+        <button class="refresh-button" onclick="loadStatus()">🔄 Refresh</button>
+        <span class="updated" id="updated"></span>
         
         <div class="grid">
             <!-- Project Info Card -->
             <div class="card">
                 <h2>📋 Project Info</h2>
-                <div class="info-row">
-                    <span class="label">Project Name:</span>
-                    <span class="value">{status['project']['name']}</span>
-                </div>
-                <div class="info-row">
-                    <span class="label">Owner:</span>
-                    <span class="value">{status['project']['user']}</span>
-                </div>
-                <div class="info-row">
-                    <span class="label">Environment:</span>
-                    <span class="value">{status['project']['environment']}</span>
-                </div>
+                <div id="project"></div>
             </div>
             
             <!-- Git Status Card -->
             <div class="card">
                 <h2>🌿 Git Status</h2>
-                <div class="info-row">
-                    <span class="label">Branch:</span>
-                    <span class="value">{status['git']['branch']}</span>
-                </div>
-                <div class="info-row">
-                    <span class="label">Latest Commit:</span>
-                    <span class="value" title="{status['git']['commit_message']}">{status['git']['commit_hash']}</span>
-                </div>
-                <div class="info-row">
-                    <span class="label">Status:</span>
-                    <span class="value">{status['git']['status']}</span>
-                </div>
+                <div id="git"></div>
             </div>
             
             <!-- Database Card -->
             <div class="card">
                 <h2>🗄️ Database</h2>
-                {f'''
-                <div class="info-row">
-                    <span class="label">Total Tables:</span>
-                    <span class="value">{len(status['database']['tables'])}</span>
-                </div>
-                <div class="info-row">
-                    <span class="label">Total Records:</span>
-                    <span class="value">{status['database']['total_records']}</span>
-                </div>
-                <div class="table-list">
-                    {tables_html}
-                </div>
-                ''' if status['database']['exists'] else '<div class="empty-state">Database not initialized yet</div>'}
+                <div id="database"></div>
             </div>
         </div>
         
@@ -433,11 +279,172 @@ class AdminHandler(BaseHTTPRequestHandler):
             </div>
         </div>
     </div>
+    
+    <script>
+        const REFRESH_MS = $refresh_ms;
+        
+        function el(tag, className, text) {
+            const node = document.createElement(tag);
+            if (className) node.className = className;
+            if (text !== undefined) node.textContent = String(text);
+            return node;
+        }
+        
+        function row(label, value, title) {
+            const node = el('div', 'info-row');
+            const valueNode = el('span', 'value', value);
+            if (title) valueNode.title = title;
+            node.append(el('span', 'label', label), valueNode);
+            return node;
+        }
+        
+        function fill(id, children) {
+            document.getElementById(id).replaceChildren(...children);
+        }
+        
+        function render(status) {
+            const project = status.project;
+            document.getElementById('subtitle').textContent = project.name + ' - ' + project.environment;
+            fill('project', [
+                row('Project Name:', project.name),
+                row('Owner:', project.user),
+                row('Environment:', project.environment)
+            ]);
+            
+            const commit = status.git.recent_commits[0] || {hash: 'N/A', message: 'N/A'};
+            fill('git', [
+                row('Branch:', status.git.branch),
+                row('Latest Commit:', commit.hash, commit.message),
+                row('Status:', status.git.status)
+            ]);
+            
+            const database = status.database;
+            if (!database.exists) {
+                fill('database', [el('div', 'empty-state', 'Database not initialized yet')]);
+            } else {
+                const tables = el('div', 'table-list');
+                for (const table of database.tables) {
+                    const item = el('div', 'table-item');
+                    const records = (table.estimated ? '~' : '') + table.records + ' records';
+                    item.append(el('span', 'table-name', table.name), el('span', 'table-count', records));
+                    tables.append(item);
+                }
+                if (!database.tables.length) {
+                    tables.append(el('div', 'empty-state', 'Database not initialized yet'));
+                }
+                fill('database', [
+                    row('Total Tables:', database.tables.length),
+                    row('Total Records:', database.total_records),
+                    tables
+                ]);
+            }
+            
+            document.getElementById('updated').textContent =
+                'Updated ' + new Date(status.timestamp).toLocaleTimeString();
+        }
+        
+        async function loadStatus() {
+            try {
+                // no-cache: the browser revalidates with If-None-Match and reuses the body on 304
+                const response = await fetch('/api/status', {cache: 'no-cache'});
+                render(await response.json());
+            } catch (err) {
+                document.getElementById('updated').textContent = 'Status unavailable';
+            }
+        }
+        
+        loadStatus();
+        setInterval(loadStatus, REFRESH_MS);
+    </script>
 </body>
 </html>
-        """
+""")
+
+# The page has no data in it, so it's rendered and compressed once
+DASHBOARD_PAGE = EncodedResponse(
+    DASHBOARD_TEMPLATE.substitute(refresh_ms=int(REFRESH_SECONDS * 1000)).encode(),
+    "text/html; charset=utf-8"
+)
+
+_status_lock = threading.Lock()
+_status_response: Optional[EncodedResponse] = None
+
+
+def get_system_status() -> dict:
+    """The shared status snapshot, refreshing it first if it hasn't been built yet."""
+    snapshot = dict(system_status.snapshot() or system_status.refresh())
+    snapshot.pop("age_seconds", None)
+    return snapshot
+
+
+def status_response() -> EncodedResponse:
+    """
+    Encoded /api/status body, re-encoded only when the snapshot changes.
+    
+    The ETag covers the status data but not its refresh timestamp, so
+    clients get 304 until something they display actually changes.
+    
+    Returns:
+        EncodedResponse: JSON body for the current snapshot
+    """
+    global _status_response
+    
+    status = get_system_status()
+    body = json.dumps(status, sort_keys=True).encode()
+    
+    with _status_lock:
+        if _status_response is None or _status_response.body != body:
+            data = json.dumps({**status, "timestamp": None}, sort_keys=True).encode()
+            _status_response = EncodedResponse(body, "application/json", etag_source=data)
+        return _status_response
+
+
+class AdminHandler(BaseHTTPRequestHandler):
+    """Handle admin dashboard requests."""
+    
+    protocol_version = "HTTP/1.1"
+    
+    def do_GET(self):
+        """Serve admin dashboard or API endpoints."""
+        path = self.path.split('?', 1)[0]
         
-        return html
+        if path == '/' or path == '/index.html':
+            # Static page; the data comes from /api/status
+            self.send_encoded(DASHBOARD_PAGE)
+            
+        elif path == '/api/status':
+            # Serve status JSON for dashboard refresh
+            self.send_encoded(status_response())
+            
+        else:
+            self.send_error(404)
+    
+    def send_encoded(self, response: EncodedResponse):
+        """Send a response as 304, gzipped or plain, depending on the request headers."""
+        if_none_match = self.headers.get('If-None-Match', '')
+        if response.etag in [tag.strip() for tag in if_none_match.split(',')]:
+            self.send_response(304)
+            self.send_common_headers(response)
+            self.end_headers()
+            return
+        
+        use_gzip = 'gzip' in self.headers.get('Accept-Encoding', '')
+        body = response.gzipped if use_gzip else response.body
+        
+        self.send_response(200)
+        self.send_common_headers(response)
+        self.send_header('Content-Type', response.content_type)
+        self.send_header('Content-Length', str(len(body)))
+        if use_gzip:
+            self.send_header('Content-Encoding', 'gzip')
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def send_common_headers(self, response: EncodedResponse):
+        """Caching headers shared by 200 and 304 responses."""
+        self.send_header('ETag', response.etag)
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Vary', 'Accept-Encoding')
     
     def log_message(self, format, *args):
         """Suppress log messages."""
@@ -448,15 +455,17 @@ if __name__ == "__main__":
     print("=" * 60)
     print("[ADMIN] Boot Lang Admin Dashboard")
     print("=" * 60)
-    print("\nAccess at: http://localhost:9002")
+    print(f"\nAccess at: http://localhost:{ADMIN_PORT}")
     print("\nPress Ctrl+C to stop")
     print("=" * 60)
     print()
     
-    server = HTTPServer(('127.0.0.1', 9002), AdminHandler)
+    system_status.start()
+    server = ThreadingHTTPServer(('127.0.0.1', ADMIN_PORT), AdminHandler)
     try:
         server.serve_forever()
     except KeyboardInterrupt:
         print("\n\n[OK] Admin dashboard stopped")
-        server.shutdown()
-
+    finally:
+        system_status.stop()
+        server.server_close()
@@ -0,0 +1,410 @@
+# agents/llm_clients.py
+"""
+LLM Clients - process-wide pooled HTTP clients for OpenAI models
+
+Every ChatOpenAI / OpenAIEmbeddings instance in the process shares one
+keep-alive httpx connection pool (sync and async), so TLS handshakes and
+TCP connects are paid once instead of per agent or per call. Requests are
+retried on rate limits, server errors and network failures with jittered
+exponential backoff, and latency / failures are recorded per model.
+
+Configuration (environment variables):
+    LLM_POOL_MAX_CONNECTIONS   Max open connections per pool (default 20)
+    LLM_POOL_MAX_KEEPALIVE     Max idle keep-alive connections (default 10)
+    LLM_KEEPALIVE_EXPIRY       Seconds an idle connection is kept (default 30)
+    LLM_TIMEOUT                Read/write timeout in seconds (default 60)
+    LLM_CONNECT_TIMEOUT        Connect timeout in seconds (default 5)
+    LLM_MAX_RETRIES            Retries after the first attempt (default 2)
+    LLM_RETRY_BASE_DELAY       First backoff step in seconds (default 0.5)
+    LLM_RETRY_MAX_DELAY        Backoff cap in seconds (default 8)
+    LLM_HTTP2                  Use HTTP/2 when the h2 package is installed (default 1)
+    LLM_EMBEDDINGS_TOKENIZE    Split embedding inputs with tiktoken first (default 1)
+    OPENAI_BASE_URL            Point all clients at another server (e.g. a local mock)
+"""
+
+import os
+import json
+import time
+import random
+import asyncio
+import threading
+from collections import deque
+from typing import Dict, Any, Optional
+
+import httpx
+from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+
+from agents.llm_tracing import record_http, llm_trace_callback
+
+try:
+    import h2  # noqa: F401
+    H2_AVAILABLE = True
+except ImportError:
+    H2_AVAILABLE = False
+
+POOL_MAX_CONNECTIONS = int(os.getenv("LLM_POOL_MAX_CONNECTIONS", "20"))
+POOL_MAX_KEEPALIVE = int(os.getenv("LLM_POOL_MAX_KEEPALIVE", "10"))
+KEEPALIVE_EXPIRY = float(os.getenv("LLM_KEEPALIVE_EXPIRY", "30"))
+TIMEOUT = float(os.getenv("LLM_TIMEOUT", "60"))
+CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "5"))
+MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+RETRY_BASE_DELAY = float(os.getenv("LLM_RETRY_BASE_DELAY", "0.5"))
+RETRY_MAX_DELAY = float(os.getenv("LLM_RETRY_MAX_DELAY", "8"))
+HTTP2 = H2_AVAILABLE and os.getenv("LLM_HTTP2", "1") != "0"
+EMBEDDINGS_TOKENIZE = os.getenv("LLM_EMBEDDINGS_TOKENIZE", "1") != "0"
+
+# Status codes worth another attempt (timeouts, conflicts, rate limits, server errors)
+RETRY_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+# Latency samples kept per model for percentiles
+LATENCY_SAMPLES = 1000
+
+
+# ===== Metrics =====
+
+class LLMMetrics:
+    """
+    Thread-safe per-model request counters and latency samples.
+
+    Example:
+        llm_metrics.snapshot()
+        # {"models": {"gpt-3.5-turbo": {"calls": 12, "p95_ms": 840.2, ...}},
+        #  "connections_opened": 1}
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._models: Dict[str, Dict[str, Any]] = {}
+        self.connections_opened = 0
+
+    def record(self, model: str, latency: float, ok: bool, retries: int):
+        """
+        Record one logical request (all attempts together).
+
+        Args:
+            model (str): Model name from the request body
+            latency (float): Seconds from first attempt to final response
+            ok (bool): False if the final attempt failed
+            retries (int): Attempts made after the first one
+        """
+        with self._lock:
+            stats = self._models.get(model)
+            if stats is None:
+                stats = {
+                    "calls": 0,
+                    "failures": 0,
+                    "retries": 0,
+                    "total_latency": 0.0,
+                    "samples": deque(maxlen=LATENCY_SAMPLES)
+                }
+                self._models[model] = stats
+            stats["calls"] += 1
+            stats["retries"] += retries
+            stats["total_latency"] += latency
+            stats["samples"].append(latency)
+            if not ok:
+                stats["failures"] += 1
+
+    def connection_opened(self):
+        """Count a new TCP connection (a pool miss)."""
+        with self._lock:
+            self.connections_opened += 1
+
+    def reset(self):
+        """Clear all counters."""
+        with self._lock:
+            self._models.clear()
+            self.connections_opened = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get current metrics.
+
+        Returns:
+            dict: {"models": {model: stats}, "connections_opened": int,
+                   "requests": int} with latencies in milliseconds
+        """
+        with self._lock:
+            models = {}
+            requests = 0
+            for model, stats in self._models.items():
+                samples = sorted(stats["samples"])
+                requests += stats["calls"]
+                models[model] = {
+                    "calls": stats["calls"],
+                    "failures": stats["failures"],
+                    "retries": stats["retries"],
+                    "avg_ms": round(stats["total_latency"] / stats["calls"] * 1000, 1),
+                    "p50_ms": _percentile_ms(samples, 50),
+                    "p95_ms": _percentile_ms(samples, 95),
+                    "max_ms": round(samples[-1] * 1000, 1)
+                }
+            return {
+                "models": models,
+                "requests": requests,
+                "connections_opened": self.connections_opened
+            }
+
+
+def _percentile_ms(samples: list, pct: int) -> float:
+    """Nearest-rank percentile of sorted samples, in milliseconds."""
+    index = max(0, min(len(samples) - 1, round(pct / 100 * len(samples)) - 1))
+    return round(samples[index] * 1000, 1)
+
+
+llm_metrics = LLMMetrics()
+
+
+# ===== Retrying / metered transports =====
+
+def _request_model(request: httpx.Request) -> str:
+    """Read the model name from an OpenAI request body."""
+    try:
+        return json.loads(request.content).get("model") or "unknown"
+    except (httpx.RequestNotRead, ValueError, AttributeError):
+        return "unknown"
+
+
+def _backoff_delay(attempt: int, retry_after: Optional[str] = None) -> float:
+    """
+    Delay before the next attempt: server's Retry-After if given, otherwise
+    exponential backoff with full jitter, capped at RETRY_MAX_DELAY.
+    """
+    if retry_after:
+        try:
+            return min(float(retry_after), RETRY_MAX_DELAY)
+        except ValueError:
+            pass
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * (2 ** attempt)))
+
+
+def _trace(event_name: str, info: Dict[str, Any]):
+    """httpcore trace hook: count new TCP connections."""
+    if event_name == "connection.connect_tcp.complete":
+        llm_metrics.connection_opened()
+
+
+async def _async_trace(event_name: str, info: Dict[str, Any]):
+    """Async variant of _trace."""
+    _trace(event_name, info)
+
+
+class RetryingTransport(httpx.BaseTransport):
+    """Sync transport adding retries with jittered backoff and per-model metrics."""
+
+    def __init__(self, transport: httpx.BaseTransport, max_retries: int = MAX_RETRIES):
+        self._transport = transport
+        self.max_retries = max_retries
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        model = _request_model(request)
+        request.extensions.setdefault("trace", _trace)
+        start = time.perf_counter()
+        attempt = 0
+
+        while True:
+            try:
+                response = self._transport.handle_request(request)
+            except (httpx.TimeoutException, httpx.NetworkError, httpx.RemoteProtocolError):
+                if attempt >= self.max_retries:
+                    llm_metrics.record(model, time.perf_counter() - start, False, attempt)
+                    record_http(model, attempt, None)
+                    raise
+                delay = _backoff_delay(attempt)
+            else:
+                if response.status_code not in RETRY_STATUS_CODES or attempt >= self.max_retries:
+                    llm_metrics.record(
+                        model, time.perf_counter() - start, response.status_code < 400, attempt
+                    )
+                    record_http(model, attempt, response.headers.get("x-request-id"))
+                    return response
+                delay = _backoff_delay(attempt, response.headers.get("retry-after"))
+                response.close()
+
+            attempt += 1
+            time.sleep(delay)
+
+    def close(self):
+        self._transport.close()
+
+
+class AsyncRetryingTransport(httpx.AsyncBaseTransport):
+    """Async transport adding retries with jittered backoff and per-model metrics."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, max_retries: int = MAX_RETRIES):
+        self._transport = transport
+        self.max_retries = max_retries
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        model = _request_model(request)
+        request.extensions.setdefault("trace", _async_trace)
+        start = time.perf_counter()
+        attempt = 0
+
+        while True:
+            try:
+                response = await self._transport.handle_async_request(request)
+            except (httpx.TimeoutException, httpx.NetworkError, httpx.RemoteProtocolError):
+                if attempt >= self.max_retries:
+                    llm_metrics.record(model, time.perf_counter() - start, False, attempt)
+                    record_http(model, attempt, None)
+                    raise
+                delay = _backoff_delay(attempt)
+            else:
+                if response.status_code not in RETRY_STATUS_CODES or attempt >= self.max_retries:
+                    llm_metrics.record(
+                        model, time.perf_counter() - start, response.status_code < 400, attempt
+                    )
+                    record_http(model, attempt, response.headers.get("x-request-id"))
+                    return response
+                delay = _backoff_delay(attempt, response.headers.get("retry-after"))
+                await response.aclose()
+
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+# ===== Client factory =====
+
+_lock = threading.Lock()
+_http_client: Optional[httpx.Client] = None
+_async_http_client: Optional[httpx.AsyncClient] = None
+_chat_models: Dict[tuple, ChatOpenAI] = {}
+_embeddings: Dict[Optional[str], OpenAIEmbeddings] = {}
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=POOL_MAX_CONNECTIONS,
+        max_keepalive_connections=POOL_MAX_KEEPALIVE,
+        keepalive_expiry=KEEPALIVE_EXPIRY
+    )
+
+
+def _timeout() -> httpx.Timeout:
+    return httpx.Timeout(TIMEOUT, connect=CONNECT_TIMEOUT)
+
+
+def get_http_client() -> httpx.Client:
+    """
+    Get the shared sync httpx client (created on first use).
+
+    Returns:
+        httpx.Client: Pooled keep-alive client with retries and metrics
+    """
+    global _http_client
+    with _lock:
+        if _http_client is None:
+            _http_client = httpx.Client(
+                transport=RetryingTransport(
+                    httpx.HTTPTransport(http2=HTTP2, limits=_limits())
+                ),
+                timeout=_timeout()
+            )
+        return _http_client
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """
+    Get the shared async httpx client (created on first use).
+
+    Returns:
+        httpx.AsyncClient: Pooled keep-alive client with retries and metrics
+    """
+    global _async_http_client
+    with _lock:
+        if _async_http_client is None:
+            _async_http_client = httpx.AsyncClient(
+                transport=AsyncRetryingTransport(
+                    httpx.AsyncHTTPTransport(http2=HTTP2, limits=_limits())
+                ),
+                timeout=_timeout()
+            )
+        return _async_http_client
+
+
+def get_chat_model(model: str, temperature: float = 0.7, **kwargs) -> ChatOpenAI:
+    """
+    Get a ChatOpenAI model bound to the shared connection pools.
+
+    Instances are cached per (model, temperature, kwargs), so repeated calls
+    return the same object.
+
+    Args:
+        model (str): OpenAI model name (e.g., "gpt-3.5-turbo", "gpt-4o")
+        temperature (float): Sampling temperature
+        **kwargs: Extra ChatOpenAI arguments (e.g., max_tokens)
+
+    Returns:
+        ChatOpenAI: Shared chat model
+
+    Example:
+        >>> llm = get_chat_model("gpt-3.5-turbo", temperature=0.7)
+        >>> llm.invoke("Hello").content
+    """
+    key = (model, temperature, tuple(sorted(kwargs.items())))
+    cached = _chat_models.get(key)
+    if cached is not None:
+        return cached
+
+    chat_model = ChatOpenAI(
+        model=model,
+        temperature=temperature,
+        api_key=os.getenv("OPENAI_API_KEY"),
+        http_client=get_http_client(),
+        http_async_client=get_async_http_client(),
+        timeout=_timeout(),
+        max_retries=0,  # Retries happen in RetryingTransport
+        callbacks=[llm_trace_callback],
+        **kwargs
+    )
+    with _lock:
+        return _chat_models.setdefault(key, chat_model)
+
+
+def get_embeddings(model: Optional[str] = None) -> OpenAIEmbeddings:
+    """
+    Get OpenAIEmbeddings bound to the shared connection pools.
+
+    Args:
+        model (str, optional): Embedding model name, library default if None
+
+    Returns:
+        OpenAIEmbeddings: Shared embeddings client
+    """
+    cached = _embeddings.get(model)
+    if cached is not None:
+        return cached
+
+    options = {"model": model} if model else {}
+    embeddings = OpenAIEmbeddings(
+        api_key=os.getenv("OPENAI_API_KEY"),
+        http_client=get_http_client(),
+        http_async_client=get_async_http_client(),
+        timeout=_timeout(),
+        max_retries=0,
+        check_embedding_ctx_length=EMBEDDINGS_TOKENIZE,
+        **options
+    )
+    with _lock:
+        return _embeddings.setdefault(model, embeddings)
+
+
+async def close_clients():
+    """Close the shared connection pools (call on application shutdown)."""
+    global _http_client, _async_http_client
+    with _lock:
+        http_client, async_http_client = _http_client, _async_http_client
+        _http_client = None
+        _async_http_client = None
+        _chat_models.clear()
+        _embeddings.clear()
+
+    if http_client is not None:
+        http_client.close()
+    if async_http_client is not None:
+        await async_http_client.aclose()
+    print("✓ Closed LLM client pools")
@@ -0,0 +1,400 @@
+# agents/llm_tracing.py
+"""
+LLM Tracing - per-call latency, token and retry records for the POC Agent
+
+Every LLM, vision or embedding call the agent makes is wrapped in
+llm_call("<call site>"). The record it opens is filled in from two sides:
+- LLMTraceCallback (a LangChain callback on every chat model) adds the
+  model name and prompt/completion tokens
+- the shared HTTP transport in agents/llm_clients.py adds retries and the
+  OpenAI request id
+
+Records are tagged with the API request id and conversation id (set by the
+HTTP middleware in app.py and by the POC endpoints), kept per conversation
+for the breakdown API, and aggregated into Prometheus counters for /metrics.
+
+A call that invoked a model but sent no HTTP request was served from a cache
+and is counted as a cache hit. Structured calls also record whether their
+JSON output parsed, needed a repair, or failed.
+"""
+
+import os
+import time
+import uuid
+import threading
+import contextvars
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+# Conversations whose call records are kept in memory
+TRACE_CONVERSATIONS = int(os.getenv("LLM_TRACE_CONVERSATIONS", "500"))
+
+# Most recent call records kept regardless of conversation
+TRACE_RECENT_CALLS = int(os.getenv("LLM_TRACE_RECENT_CALLS", "2000"))
+
+# Latency histogram buckets (seconds) for /metrics
+LATENCY_BUCKETS = [0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0]
+
+
+class RequestTrace:
+    """Identifiers of the API request an LLM call belongs to."""
+
+    def __init__(self, request_id: str, path: str = ""):
+        self.request_id = request_id
+        self.path = path
+        self.conversation_id: Optional[str] = None
+        self.calls: List[Dict[str, Any]] = []
+
+
+_request_trace: contextvars.ContextVar = contextvars.ContextVar("llm_request_trace", default=None)
+_current_call: contextvars.ContextVar = contextvars.ContextVar("llm_current_call", default=None)
+
+
+# ===== Request scope =====
+
+def start_request(request_id: Optional[str] = None, path: str = "") -> RequestTrace:
+    """
+    Start tracing an API request in the current context.
+
+    Args:
+        request_id (str, optional): Incoming X-Request-ID, generated if None
+        path (str): Request path
+
+    Returns:
+        RequestTrace: Trace for the request
+    """
+    trace = RequestTrace(request_id or uuid.uuid4().hex[:16], path)
+    _request_trace.set(trace)
+    return trace
+
+
+def set_conversation(conversation_id: Optional[str]):
+    """Tag LLM calls of the current request with a conversation id."""
+    trace = _request_trace.get()
+    if trace is not None:
+        trace.conversation_id = conversation_id
+
+
+def current_request() -> Optional[RequestTrace]:
+    """Return the trace of the API request in the current context, if any."""
+    return _request_trace.get()
+
+
+# ===== Call scope =====
+
+@contextmanager
+def llm_call(call_site: str):
+    """
+    Trace one LLM call site (e.g. "requirements_extraction").
+
+    Example:
+        with llm_call("prd_content"):
+            result = chain.invoke({...})
+    """
+    trace = _request_trace.get()
+    record = {
+        "call_site": call_site,
+        "model": None,
+        "request_id": trace.request_id if trace else None,
+        "conversation_id": trace.conversation_id if trace else None,
+        "prompt_tokens": 0,
+        "completion_tokens": 0,
+        "latency_ms": 0.0,
+        "retries": 0,
+        "cache_hit": False,
+        "parse": None,
+        "openai_request_ids": [],
+        "error": None,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "_model_invocations": 0,
+        "_http_requests": 0
+    }
+    token = _current_call.set(record)
+    start = time.perf_counter()
+    try:
+        yield record
+    except Exception as e:
+        record["error"] = type(e).__name__
+        raise
+    finally:
+        _current_call.reset(token)
+        record["latency_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        if record["_model_invocations"] and not record["_http_requests"] and not record["error"]:
+            record["cache_hit"] = True
+        if trace is not None and record["conversation_id"] is None:
+            record["conversation_id"] = trace.conversation_id
+        trace_store.add(record)
+        if trace is not None:
+            trace.calls.append(record)
+
+
+def mark_cache_hit():
+    """Mark the current call as served from an application cache."""
+    record = _current_call.get()
+    if record is not None:
+        record["cache_hit"] = True
+
+
+def record_parse_result(call_site: str, outcome: str):
+    """
+    Count a structured output parse (called by agents/structured_output.py).
+
+    Args:
+        call_site (str): Call site name
+        outcome (str): "ok", "repaired" or "failed"
+    """
+    record = _current_call.get()
+    if record is not None:
+        record["parse"] = outcome
+    trace_store.add_parse_result(call_site, outcome)
+
+
+def record_http(model: str, retries: int, openai_request_id: Optional[str]):
+    """
+    Attach an HTTP exchange to the current call (called by the transport).
+
+    Args:
+        model (str): Model from the request body
+        retries (int): Attempts after the first one
+        openai_request_id (str, optional): x-request-id response header
+    """
+    record = _current_call.get()
+    if record is None:
+        return
+    record["_http_requests"] += 1
+    record["retries"] += retries
+    if record["model"] is None and model != "unknown":
+        record["model"] = model
+    if openai_request_id:
+        record["openai_request_ids"].append(openai_request_id)
+
+
+class LLMTraceCallback(BaseCallbackHandler):
+    """LangChain callback adding model and token usage to the current call."""
+
+    def on_chat_model_start(self, serialized, messages, **kwargs):
+        record = _current_call.get()
+        if record is None:
+            return
+        record["_model_invocations"] += 1
+        params = kwargs.get("invocation_params") or {}
+        model = params.get("model") or params.get("model_name")
+        if model:
+            record["model"] = model
+
+    def on_llm_end(self, response, **kwargs):
+        record = _current_call.get()
+        if record is None:
+            return
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        if not usage:
+            # Cached generations carry usage on the message instead
+            for generations in response.generations:
+                for generation in generations:
+                    message = getattr(generation, "message", None)
+                    metadata = getattr(message, "usage_metadata", None) or {}
+                    usage = {
+                        "prompt_tokens": metadata.get("input_tokens", 0),
+                        "completion_tokens": metadata.get("output_tokens", 0)
+                    }
+        record["prompt_tokens"] += usage.get("prompt_tokens", 0) or 0
+        record["completion_tokens"] += usage.get("completion_tokens", 0) or 0
+
+
+llm_trace_callback = LLMTraceCallback()
+
+
+# ===== Storage and aggregation =====
+
+def _public(record: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: v for k, v in record.items() if not k.startswith("_")}
+
+
+class TraceStore:
+    """
+    In-memory call records (per conversation and recent) plus Prometheus
+    counters aggregated by call site and model.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._conversations: "OrderedDict[str, List[Dict[str, Any]]]" = OrderedDict()
+        self._recent: deque = deque(maxlen=TRACE_RECENT_CALLS)
+        self._counters: Dict[tuple, Dict[str, Any]] = {}
+        self._parse_results: Dict[tuple, int] = {}
+
+    def add_parse_result(self, call_site: str, outcome: str):
+        """Count a structured output parse outcome."""
+        with self._lock:
+            key = (call_site, outcome)
+            self._parse_results[key] = self._parse_results.get(key, 0) + 1
+
+    def add(self, record: Dict[str, Any]):
+        """Store a finished call record."""
+        record = _public(record)
+        key = (record["call_site"], record["model"] or "none")
+        with self._lock:
+            self._recent.append(record)
+
+            conversation_id = record["conversation_id"]
+            if conversation_id:
+                calls = self._conversations.pop(conversation_id, [])
+                calls.append(record)
+                self._conversations[conversation_id] = calls
+                while len(self._conversations) > TRACE_CONVERSATIONS:
+                    self._conversations.popitem(last=False)
+
+            counter = self._counters.get(key)
+            if counter is None:
+                counter = {
+                    "calls": 0, "errors": 0, "retries": 0, "cache_hits": 0,
+                    "prompt_tokens": 0, "completion_tokens": 0,
+                    "latency_sum": 0.0, "buckets": [0] * len(LATENCY_BUCKETS)
+                }
+                self._counters[key] = counter
+            latency = record["latency_ms"] / 1000
+            counter["calls"] += 1
+            counter["errors"] += 1 if record["error"] else 0
+            counter["retries"] += record["retries"]
+            counter["cache_hits"] += 1 if record["cache_hit"] else 0
+            counter["prompt_tokens"] += record["prompt_tokens"]
+            counter["completion_tokens"] += record["completion_tokens"]
+            counter["latency_sum"] += latency
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if latency <= bound:
+                    counter["buckets"][i] += 1
+
+    def conversation_calls(self, conversation_id: str) -> List[Dict[str, Any]]:
+        """Call records of one conversation, oldest first."""
+        with self._lock:
+            return list(self._conversations.get(conversation_id, []))
+
+    def recent_calls(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """Most recent call records, newest first."""
+        with self._lock:
+            return list(self._recent)[-limit:][::-1]
+
+    def reset(self):
+        """Drop all records and counters."""
+        with self._lock:
+            self._conversations.clear()
+            self._recent.clear()
+            self._counters.clear()
+            self._parse_results.clear()
+
+    def prometheus(self) -> str:
+        """
+        Render counters in Prometheus text exposition format.
+
+        Returns:
+            str: Metrics text (content type text/plain; version=0.0.4)
+        """
+        with self._lock:
+            counters = {key: dict(value, buckets=list(value["buckets"])) for key, value in self._counters.items()}
+            parse_results = dict(self._parse_results)
+
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(samples)
+
+        def labels(call_site, model, **extra):
+            pairs = {"call_site": call_site, "model": model, **extra}
+            return "{" + ",".join(f'{k}="{v}"' for k, v in pairs.items()) + "}"
+
+        items = sorted(counters.items())
+        metric("poc_llm_calls_total", "counter", "LLM calls by call site and model", [
+            f"poc_llm_calls_total{labels(site, model)} {c['calls']}" for (site, model), c in items
+        ])
+        metric("poc_llm_errors_total", "counter", "LLM calls that raised an error", [
+            f"poc_llm_errors_total{labels(site, model)} {c['errors']}" for (site, model), c in items
+        ])
+        metric("poc_llm_retries_total", "counter", "HTTP retries made for LLM calls", [
+            f"poc_llm_retries_total{labels(site, model)} {c['retries']}" for (site, model), c in items
+        ])
+        metric("poc_llm_cache_hits_total", "counter", "LLM calls served from a cache", [
+            f"poc_llm_cache_hits_total{labels(site, model)} {c['cache_hits']}" for (site, model), c in items
+        ])
+        metric("poc_llm_tokens_total", "counter", "Tokens used by LLM calls", [
+            f"poc_llm_tokens_total{labels(site, model, type=kind)} {c[kind + '_tokens']}"
+            for (site, model), c in items for kind in ("prompt", "completion")
+        ])
+
+        histogram = []
+        for (site, model), c in items:
+            for bound, count in zip(LATENCY_BUCKETS, c["buckets"]):
+                histogram.append(f"poc_llm_call_duration_seconds_bucket{labels(site, model, le=bound)} {count}")
+            histogram.append(f"poc_llm_call_duration_seconds_bucket{labels(site, model, le='+Inf')} {c['calls']}")
+            histogram.append(f"poc_llm_call_duration_seconds_sum{labels(site, model)} {round(c['latency_sum'], 4)}")
+            histogram.append(f"poc_llm_call_duration_seconds_count{labels(site, model)} {c['calls']}")
+        metric("poc_llm_call_duration_seconds", "histogram", "LLM call latency by call site and model", histogram)
+
+        metric("poc_llm_structured_outputs_total", "counter", "Structured output parses by outcome (ok, repaired, failed)", [
+            f'poc_llm_structured_outputs_total{{call_site="{site}",outcome="{outcome}"}} {count}'
+            for (site, outcome), count in sorted(parse_results.items())
+        ])
+        failures: Dict[str, int] = {}
+        for (site, outcome), count in parse_results.items():
+            if outcome != "ok":
+                failures[site] = failures.get(site, 0) + count
+        metric("poc_llm_parse_failures_total", "counter", "Structured outputs that failed validation on the first attempt", [
+            f'poc_llm_parse_failures_total{{call_site="{site}"}} {count}'
+            for site, count in sorted(failures.items())
+        ])
+
+        return "\n".join(lines) + "\n"
+
+
+trace_store = TraceStore()
+
+
+def summarize_calls(calls: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Break call records down by call site, slowest total first.
+
+    Args:
+        calls (list): Call records
+
+    Returns:
+        dict: {"totals": {...}, "by_call_site": [...]} with each site's share
+              of total LLM latency
+    """
+    total_latency = sum(c["latency_ms"] for c in calls) or 1.0
+    sites: Dict[str, Dict[str, Any]] = {}
+    for call in calls:
+        site = sites.setdefault(call["call_site"], {
+            "call_site": call["call_site"], "calls": 0, "latency_ms": 0.0,
+            "prompt_tokens": 0, "completion_tokens": 0, "retries": 0,
+            "cache_hits": 0, "errors": 0, "parse_failures": 0
+        })
+        site["calls"] += 1
+        site["latency_ms"] += call["latency_ms"]
+        site["prompt_tokens"] += call["prompt_tokens"]
+        site["completion_tokens"] += call["completion_tokens"]
+        site["retries"] += call["retries"]
+        site["cache_hits"] += 1 if call["cache_hit"] else 0
+        site["errors"] += 1 if call["error"] else 0
+        site["parse_failures"] += 1 if call.get("parse") in ("repaired", "failed") else 0
+
+    by_site = sorted(sites.values(), key=lambda s: s["latency_ms"], reverse=True)
+    for site in by_site:
+        site["latency_ms"] = round(site["latency_ms"], 1)
+        site["avg_latency_ms"] = round(site["latency_ms"] / site["calls"], 1)
+        site["latency_share"] = round(site["latency_ms"] / total_latency, 3)
+
+    return {
+        "totals": {
+            "calls": len(calls),
+            "requests": len({c["request_id"] for c in calls if c["request_id"]}),
+            "latency_ms": round(sum(c["latency_ms"] for c in calls), 1),
+            "prompt_tokens": sum(c["prompt_tokens"] for c in calls),
+            "completion_tokens": sum(c["completion_tokens"] for c in calls)
+        },
+        "by_call_site": by_site
+    }
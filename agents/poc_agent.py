@@ -12,16 +12,19 @@ Uses LangChain for conversation management and OpenAI for LLM capabilities.
 """
 
 import os
+import re
 import json
 import base64
+import copy
 import shutil
+import hashlib
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Dict, List, Optional, Any
 from dotenv import load_dotenv
-from pydantic import BaseModel, Field
-from langchain_openai import ChatOpenAI, OpenAIEmbeddings
 from langchain.prompts import PromptTemplate, ChatPromptTemplate, MessagesPlaceholder
-from langchain.chains import ConversationChain, RetrievalQA, LLMChain
+from langchain.chains import ConversationChain, RetrievalQA
 from langchain.memory import ConversationBufferMemory
 from langchain_community.document_loaders import PyPDFLoader, TextLoader
 from langchain_community.vectorstores import FAISS
@@ -29,51 +32,22 @@ from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.schema import Document
 from langchain.output_parsers import PydanticOutputParser
 
+from agents.schemas import (
+    RequirementsSchema,
+    ContradictionAnalysis,
+    SimplificationAnalysis,
+    WireframeAnalysis
+)
+from agents.structured_output import parse_structured
+from agents.prompt_registry import PromptRegistry
+from agents.llm_clients import get_chat_model, get_embeddings
+from agents.llm_tracing import llm_call, mark_cache_hit
+from agents.wireframe_images import prepare_image, WireframeCache
+
 # Load environment variables
 load_dotenv()
 
 
-# ===== Pydantic Models for Requirements (Phase 4) =====
-
-class RequirementsSchema(BaseModel):
-    """
-    Structured schema for POC requirements.
-    Used by StructuredOutputParser to extract requirements from conversation.
-    """
-    goal: Optional[str] = Field(
-        None,
-        description="Main goal or purpose of the application"
-    )
-    users: Optional[str] = Field(
-        None,
-        description="Target users or user groups"
-    )
-    workflow: Optional[str] = Field(
-        None,
-        description="Core user workflow in 2-3 sentences"
-    )
-    frontend: Optional[Dict[str, Any]] = Field(
-        None,
-        description="Frontend requirements including pages, components, layout"
-    )
-    backend: Optional[Dict[str, Any]] = Field(
-        None,
-        description="Backend requirements including data operations, APIs, business logic"
-    )
-    database: Optional[Dict[str, Any]] = Field(
-        None,
-        description="Database requirements including entities, relationships, constraints"
-    )
-    integrations: Optional[List[str]] = Field(
-        None,
-        description="External systems or APIs to integrate with"
-    )
-    constraints: Optional[List[str]] = Field(
-        None,
-        description="Technical or business constraints"
-    )
-
-
 class POCAgent:
     """
     Technical Product Manager AI Agent for POC generation.
@@ -87,7 +61,8 @@ class POCAgent:
         Initialize POC Agent with LLM and prompt configuration.
         
         Loads prompts from agents/poc_agent_prompts.json
-        Uses gpt-3.5-turbo for cost efficiency
+        Models per call site come from its model_routing section
+        (small fast model per turn, large model for document generation)
         """
         # Check for API key
         api_key = os.getenv("OPENAI_API_KEY")
@@ -97,15 +72,17 @@ class POCAgent:
                 "Please set it in your .env file or environment."
             )
         
-        # Initialize LLM (gpt-3.5-turbo for cost efficiency)
-        self.llm = ChatOpenAI(
-            model="gpt-3.5-turbo",
-            temperature=0.7,
-            api_key=api_key
+        # Load and compile prompt templates from JSON. Each call site gets its
+        # model from model_routing; clients share the connection pools in
+        # agents/llm_clients.py
+        self.registry = PromptRegistry(
+            os.path.join(os.path.dirname(__file__), "poc_agent_prompts.json"),
+            get_chat_model
         )
+        self._llm = None
         
-        # Load prompt templates from JSON
-        self.prompts = self._load_prompts()
+        # Wireframe analyses cached by image content (agents/wireframe_images.py)
+        self.wireframe_cache = WireframeCache()
         
         # Agent state
         self.conversation_stage = "greeting"
@@ -120,7 +97,7 @@ class POCAgent:
         self.conversation_id = None
         
         # Initialize embeddings for RAG
-        self.embeddings = OpenAIEmbeddings(api_key=api_key)
+        self.embeddings = get_embeddings()
         
         # Vector store cache (per user)
         self.vector_stores: Dict[str, FAISS] = {}
@@ -132,38 +109,68 @@ class POCAgent:
             length_function=len
         )
         
-    def _load_prompts(self) -> Dict[str, Any]:
+    def _invoke(self, chain_name: str, inputs: Dict[str, Any]):
         """
-        Load prompt templates from JSON configuration file.
+        Run a compiled chain from the prompt registry, traced under its name.
         
+        Args:
+            chain_name (str): Registry chain name (also the tracing call site)
+            inputs (dict): Template variables for the call
+            
         Returns:
-            dict: Prompt configuration including system prompt, questions, templates
+            Chain output (AIMessage, or parsed object for parser chains)
+        """
+        with llm_call(chain_name):
+            return self.registry.chain(chain_name).invoke(inputs)
+    
+    def _invoke_structured(self, chain_name: str, inputs: Dict[str, Any], schema):
+        """
+        Run a JSON-mode chain and validate its reply against a Pydantic schema.
+        
+        An invalid reply gets one repair attempt (json_repair chain) inside the
+        same traced call.
+        
+        Args:
+            chain_name (str): Registry chain name (also the tracing call site)
+            inputs (dict): Template variables for the call
+            schema: Pydantic model class for the reply
+            
+        Returns:
+            Instance of schema
             
         Raises:
-            FileNotFoundError: If prompt file doesn't exist
-            json.JSONDecodeError: If JSON is invalid
+            StructuredOutputError: If the reply is still invalid after repair
         """
-        prompts_path = os.path.join(
-            os.path.dirname(__file__),
-            "poc_agent_prompts.json"
-        )
+        def repair(reply: str, error: str, json_schema: str) -> str:
+            return self.registry.chain("json_repair").invoke({
+                "reply": reply,
+                "error": error,
+                "schema": json_schema
+            }).content
+        
+        with llm_call(chain_name):
+            result = self.registry.chain(chain_name).invoke(inputs)
+            return parse_structured(result.content, schema, chain_name, repair)
+    
+    @property
+    def llm(self):
+        """Chat model for conversation turns (model_routing.call_sites.conversation)."""
+        return self._llm or self.registry.model("conversation")
+    
+    @llm.setter
+    def llm(self, value):
+        self._llm = value
+    
+    @property
+    def prompts(self) -> Dict[str, Any]:
+        """
+        Current prompt configuration from agents/poc_agent_prompts.json.
         
-        try:
-            with open(prompts_path, 'r') as f:
-                prompts = json.load(f)
-                print(f"✓ Loaded prompts version {prompts.get('version', 'unknown')}")
-                return prompts
-        except FileNotFoundError:
-            raise FileNotFoundError(
-                f"Prompt configuration not found at {prompts_path}. "
-                "Please ensure poc_agent_prompts.json exists."
-            )
-        except json.JSONDecodeError as e:
-            raise json.JSONDecodeError(
-                f"Invalid JSON in prompt configuration: {str(e)}",
-                e.doc,
-                e.pos
-            )
+        Returns:
+            dict: Prompt configuration including system prompt, questions, templates
+        """
+        self.registry.refresh()
+        return self.registry.prompts
     
     def generate_friendly_name(self, description: str) -> str:
         """
@@ -179,33 +186,10 @@ class POCAgent:
             >>> agent.generate_friendly_name("I want to build a tool for tracking customer feedback")
             "customer_feedback_tracker"
         """
-        # Get naming instructions from prompts
-        naming_config = self.prompts.get("poc_naming", {})
-        instructions = naming_config.get(
-            "instructions",
-            "Generate a short, lowercase name with underscores from this description."
-        )
-        max_length = naming_config.get("max_length", 50)
-        
-        # Create prompt for name generation
-        prompt = PromptTemplate(
-            input_variables=["description", "instructions", "max_length"],
-            template="""
-{instructions}
-
-User description: {description}
-
-Generate ONLY the name, nothing else. Maximum {max_length} characters.
-Name:"""
-        )
+        max_length = self.prompts.get("poc_naming", {}).get("max_length", 50)
         
         # Generate name using LLM
-        chain = prompt | self.llm
-        result = chain.invoke({
-            "description": description,
-            "instructions": instructions,
-            "max_length": max_length
-        })
+        result = self._invoke("poc_naming", {"description": description})
         
         # Clean up result
         name = result.content.strip().lower()
@@ -353,6 +337,19 @@ Keep questions brief. Move quickly through stages. Don't repeat questions about
             # Only create new ID if we don't have one yet
             self.conversation_id = f"conv_{user_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
         
+        # Approvals and "what's next" turns don't need the LLM
+        fast_response = self._try_fast_path(prompt)
+        if fast_response is not None:
+            return {
+                "response": fast_response,
+                "conversation_id": self.conversation_id,
+                "agent_state": {
+                    "stage": self.conversation_stage,
+                    "requirements": self.requirements
+                },
+                "next_action": self._determine_next_action()
+            }
+        
         # Set up conversation chain if not already done
         if self.conversation_chain is None:
             self._setup_conversation_chain()
@@ -382,7 +379,8 @@ Keep questions brief. Move quickly through stages. Don't repeat questions about
                 enhanced_prompt = f"{stage_guidance}\n\n{full_prompt}" if stage_guidance else full_prompt
                 
                 # Normal conversation flow
-                response = self.conversation_chain.predict(input=enhanced_prompt)
+                with llm_call("conversation"):
+                    response = self.conversation_chain.predict(input=enhanced_prompt)
             
             # Update requirements from conversation BEFORE stage update
             self.update_requirements_from_conversation()
@@ -499,6 +497,106 @@ Keep questions brief. Move quickly through stages. Don't repeat questions about
                 elif msg["type"] == "ai":
                     self.memory.chat_memory.add_ai_message(msg["content"])
     
+    def _get_flow_keywords(self) -> tuple:
+        """
+        Get the approval keywords and "what's next" triggers from configuration.
+        
+        Returns:
+            tuple: (approval_keywords, next_triggers)
+        """
+        flow = self.prompts.get("conversation_flow", {})
+        approval_keywords = flow.get(
+            "approval_keywords",
+            ['yes', 'correct', 'looks good', 'approve', 'sounds good', 'that works', 'perfect', 'sounds like a plan']
+        )
+        next_triggers = flow.get(
+            "next_triggers",
+            ["next", "what's next", "whats next", "what next", "done", "that's all", "thats all", "build", "prd"]
+        )
+        return approval_keywords, next_triggers
+    
+    def _is_pure_flow_turn(self, user_input: str) -> bool:
+        """
+        Check if a message is only an approval or a "what's next" request.
+        
+        The message must be short and contain nothing but approval keywords,
+        next triggers and filler words (e.g. "yes, sounds good!" or "ok what's next?").
+        Anything carrying new information goes through the LLM as usual.
+        
+        Args:
+            user_input (str): User's message
+            
+        Returns:
+            bool: True if the turn can be answered without the LLM
+        """
+        fast_path = self.prompts.get("conversation_flow", {}).get("fast_path", {})
+        if not fast_path:
+            return False
+        
+        text = " ".join(re.sub(r"[^a-z' ]", " ", user_input.lower()).split())
+        if not text or len(text.split()) > fast_path.get("max_words", 6):
+            return False
+        
+        # Strip longest phrases first so "what's next" goes before "next"
+        approval_keywords, next_triggers = self._get_flow_keywords()
+        phrases = sorted(approval_keywords + next_triggers, key=len, reverse=True)
+        matched = False
+        for phrase in phrases:
+            pattern = rf"(?<![a-z']){re.escape(phrase)}(?![a-z'])"
+            if re.search(pattern, text):
+                matched = True
+                text = re.sub(pattern, " ", text)
+        
+        filler_words = set(fast_path.get("filler_words", []))
+        leftover = [word for word in text.split() if word not in filler_words]
+        return matched and not leftover
+    
+    def _try_fast_path(self, prompt: str) -> Optional[str]:
+        """
+        Answer a pure approval / "what's next" turn from templates.
+        
+        Skips document retrieval, the conversation chain, requirements
+        extraction and contradiction detection. Only used when the turn moves
+        the conversation to a stage with a templated reply in
+        conversation_flow.fast_path.responses (or to the requirements summary).
+        
+        Args:
+            prompt (str): User's message
+            
+        Returns:
+            str: Templated response, or None if the turn needs the LLM
+        """
+        # Fresh memory still needs the system context from the conversation chain
+        if not self.memory.chat_memory.messages or not self._is_pure_flow_turn(prompt):
+            return None
+        
+        previous_stage = self.conversation_stage
+        previous_count = self.message_count
+        self._update_conversation_stage(prompt, "")
+        new_stage = self.conversation_stage
+        
+        responses = self.prompts["conversation_flow"]["fast_path"].get("responses", {})
+        moved = new_stage != previous_stage or new_stage == "ready_to_generate"
+        
+        if moved and new_stage == "requirements_review":
+            response = self._present_requirements_summary()
+        elif moved and new_stage in responses:
+            category = new_stage.replace("_requirements", "")
+            questions = self.prompts.get("requirements_gathering", {}).get(f"{category}_questions", [])
+            response = responses[new_stage].format(question=questions[0] if questions else "")
+        else:
+            # No template for this transition, let the LLM handle it
+            self.conversation_stage = previous_stage
+            self.message_count = previous_count
+            return None
+        
+        # Keep the turn in memory so the next LLM call sees it
+        self.memory.chat_memory.add_user_message(prompt)
+        self.memory.chat_memory.add_ai_message(response)
+        
+        print(f"✓ Fast path: {previous_stage} -> {new_stage}")
+        return response
+    
     def _update_conversation_stage(self, user_input: str, agent_response: str):
         """
         Update conversation stage based on current interaction.
@@ -511,7 +609,7 @@ Keep questions brief. Move quickly through stages. Don't repeat questions about
         self.message_count += 1
         
         # Check for approval/confirmation keywords
-        approval_keywords = ['yes', 'correct', 'looks good', 'approve', 'sounds good', 'that works', 'perfect', 'sounds like a plan']
+        approval_keywords, next_triggers = self._get_flow_keywords()
         is_approval = any(keyword in user_lower for keyword in approval_keywords)
         
         # Progress through stages
@@ -532,7 +630,6 @@ Keep questions brief. Move quickly through stages. Don't repeat questions about
         
         elif self.conversation_stage == "backend_requirements":
             # Move to review after discussing backend or user asks what's next
-            next_triggers = ["next", "what's next", "whats next", "what next", "done", "that's all", "thats all", "build", "prd"]
             if is_approval or any(trigger in user_lower for trigger in next_triggers):
                 self.conversation_stage = "requirements_review"
         
@@ -557,7 +654,7 @@ Keep questions brief. Move quickly through stages. Don't repeat questions about
             return "ready_to_generate"
         
         # Otherwise continue gathering
-            return "continue_chat"
+        return "continue_chat"
     
     def save_conversation(self) -> Dict[str, Any]:
         """
@@ -591,6 +688,64 @@ Keep questions brief. Move quickly through stages. Don't repeat questions about
             "updated_at": datetime.now().isoformat()
         }
     
+    def for_session(self, session) -> "POCAgent":
+        """
+        Per-request agent for one server-held conversation session.
+
+        Returns a shallow copy that shares this agent's prompt registry, model
+        clients, embeddings, vector stores and caches, with its own
+        conversation state bound to the session. Requests for different
+        conversations run at the same time, each on its own copy, so they
+        never overwrite each other's memory, stage or requirements.
+
+        Args:
+            session (ConversationSession): Session from conversation_store
+
+        Returns:
+            POCAgent: Agent to call process_request() and update_session() on
+
+        Example:
+            >>> with session.lock:
+            ...     agent = get_poc_agent().for_session(session)
+            ...     result = agent.process_request(prompt, user_id)
+            ...     agent.update_session(session)
+        """
+        agent = copy.copy(self)
+        agent.bind_session(session)
+        return agent
+
+    def bind_session(self, session):
+        """
+        Point the agent at a server-held conversation session.
+
+        The session's live memory is used directly, so nothing is replayed
+        and messages never accumulate in a previous conversation's memory.
+        This rebinds the agent itself; a server handling conversations
+        concurrently should bind a per-request copy from for_session().
+
+        Args:
+            session (ConversationSession): Session from conversation_store
+        """
+        self.conversation_id = session.conversation_id
+        self.conversation_stage = session.stage
+        self.requirements = session.requirements
+        self.message_count = session.message_count
+
+        if self.memory is not session.memory:
+            self.memory = session.memory
+            self.conversation_chain = None
+
+    def update_session(self, session):
+        """
+        Copy the agent's conversation state back onto a bound session.
+
+        Args:
+            session (ConversationSession): Session previously passed to bind_session()
+        """
+        session.stage = self.conversation_stage
+        session.requirements = self.requirements
+        session.message_count = self.message_count
+
     def load_conversation(self, saved_state: Dict[str, Any]):
         """
         Load a previously saved conversation state.
@@ -683,28 +838,30 @@ Keep questions brief. Move quickly through stages. Don't repeat questions about
         # Check if vector store already exists for this user
         vector_store_path = os.path.join(vector_store_dir, "faiss_index")
         
-        if user_id in self.vector_stores:
-            # Add to existing vector store
-            print(f"Adding {len(documents)} documents to existing vector store...")
-            self.vector_stores[user_id].add_documents(documents)
-            vector_store = self.vector_stores[user_id]
+        # Embedding the chunks is the LLM call here
+        with llm_call("document_embedding"):
+            if user_id in self.vector_stores:
+                # Add to existing vector store
+                print(f"Adding {len(documents)} documents to existing vector store...")
+                self.vector_stores[user_id].add_documents(documents)
+                vector_store = self.vector_stores[user_id]
             
-        elif os.path.exists(vector_store_path):
-            # Load existing vector store from disk
-            print(f"Loading existing vector store for user {user_id}...")
-            vector_store = FAISS.load_local(
-                vector_store_path,
-                self.embeddings,
-                allow_dangerous_deserialization=True
-            )
-            vector_store.add_documents(documents)
-            self.vector_stores[user_id] = vector_store
+            elif os.path.exists(vector_store_path):
+                # Load existing vector store from disk
+                print(f"Loading existing vector store for user {user_id}...")
+                vector_store = FAISS.load_local(
+                    vector_store_path,
+                    self.embeddings,
+                    allow_dangerous_deserialization=True
+                )
+                vector_store.add_documents(documents)
+                self.vector_stores[user_id] = vector_store
             
-        else:
-            # Create new vector store
-            print(f"Creating new vector store with {len(documents)} documents...")
-            vector_store = FAISS.from_documents(documents, self.embeddings)
-            self.vector_stores[user_id] = vector_store
+            else:
+                # Create new vector store
+                print(f"Creating new vector store with {len(documents)} documents...")
+                vector_store = FAISS.from_documents(documents, self.embeddings)
+                self.vector_stores[user_id] = vector_store
         
         # Save vector store to disk
         vector_store.save_local(vector_store_path)
@@ -752,7 +909,8 @@ Keep questions brief. Move quickly through stages. Don't repeat questions about
             retriever = self.vector_stores[user_id].as_retriever(
                 search_kwargs={"k": k}
             )
-            relevant_docs = retriever.get_relevant_documents(query)
+            with llm_call("rag_retrieval"):
+                relevant_docs = retriever.get_relevant_documents(query)
             
             if not relevant_docs:
                 return ""
@@ -791,38 +949,14 @@ Keep questions brief. Move quickly through stages. Don't repeat questions about
             >>> # ... have conversation ...
             >>> requirements = agent.gather_requirements("User said they want...")
         """
-        # Set up output parser
-        parser = PydanticOutputParser(pydantic_object=RequirementsSchema)
-        
-        # Create prompt for requirements extraction
-        extraction_prompt = PromptTemplate(
-            input_variables=["conversation", "format_instructions"],
-            template="""You are analyzing a conversation about building a POC application.
-Extract the requirements that have been discussed into a structured format.
-
-Conversation:
-{conversation}
-
-Extract all requirements mentioned. If a field hasn't been discussed yet, leave it as null.
-For frontend, backend, and database fields, extract into nested dictionaries with relevant details.
-
-{format_instructions}
-
-Output the requirements in the specified JSON format:"""
-        )
-        
-        # Create chain for extraction
-        extraction_chain = extraction_prompt | self.llm | parser
-        
         try:
             # Extract requirements
-            requirements = extraction_chain.invoke({
-                "conversation": conversation_so_far,
-                "format_instructions": parser.get_format_instructions()
-            })
+            requirements = self._invoke_structured("requirements_extraction", {
+                "conversation": conversation_so_far
+            }, RequirementsSchema)
             
             # Convert to dict
-            requirements_dict = requirements.dict()
+            requirements_dict = requirements.model_dump()
             print(f"✓ Extracted requirements with {sum(1 for v in requirements_dict.values() if v is not None)} sections")
             
             return requirements_dict
@@ -940,50 +1074,12 @@ Output the requirements in the specified JSON format:"""
                     "clarifying_questions": list
                 }
         """
-        # Get contradiction detection patterns from prompts
-        patterns = self.prompts.get("contradiction_detection", {}).get("patterns", [])
-        resolution_prompts = self.prompts.get("contradiction_detection", {}).get("resolution_prompts", [])
-        
-        # Create prompt for contradiction detection
-        contradiction_prompt = PromptTemplate(
-            input_variables=["requirements", "patterns"],
-            template="""Analyze these POC requirements for contradictions or conflicts.
-
-Requirements:
-{requirements}
-
-Known contradiction patterns to check:
-{patterns}
-
-Identify any contradictions, conflicts, or inconsistencies. Return your analysis as JSON:
-{{
-    "has_contradictions": true/false,
-    "contradictions": ["list of contradictions found"],
-    "clarifying_questions": ["questions to resolve contradictions"]
-}}
-"""
-        )
-        
-        # Create LLMChain
-        contradiction_chain = LLMChain(llm=self.llm, prompt=contradiction_prompt)
-        
         try:
-            result = contradiction_chain.invoke({
-                "requirements": json.dumps(requirements, indent=2),
-                "patterns": "\n".join(f"- {p}" for p in patterns)
-            })
-            
-            # Parse JSON response
-            response_text = result["text"]
-            # Extract JSON from response
-            import re
-            json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-            if json_match:
-                analysis = json.loads(json_match.group())
-            else:
-                analysis = {"has_contradictions": False, "contradictions": [], "clarifying_questions": []}
+            analysis = self._invoke_structured("contradiction_detection", {
+                "requirements": json.dumps(requirements, indent=2)
+            }, ContradictionAnalysis)
             
-            return analysis
+            return analysis.model_dump()
             
         except Exception as e:
             print(f"Warning: Contradiction detection failed: {e}")
@@ -1004,47 +1100,12 @@ Identify any contradictions, conflicts, or inconsistencies. Return your analysis
                     "suggestions": list
                 }
         """
-        guidelines = self.prompts.get("simplicity_enforcement", {}).get("guidelines", [])
-        
-        # Create prompt for simplification
-        simplification_prompt = PromptTemplate(
-            input_variables=["requirements", "guidelines"],
-            template="""Analyze these POC requirements for complexity. Suggest simplifications to keep it minimal and viable.
-
-Requirements:
-{requirements}
-
-Simplicity guidelines:
-{guidelines}
-
-Provide simplification suggestions as JSON:
-{{
-    "needs_simplification": true/false,
-    "complexity_score": 0.0-1.0,
-    "suggestions": ["list of simplification suggestions"]
-}}
-"""
-        )
-        
-        # Create LLMChain
-        simplification_chain = LLMChain(llm=self.llm, prompt=simplification_prompt)
-        
         try:
-            result = simplification_chain.invoke({
-                "requirements": json.dumps(requirements, indent=2),
-                "guidelines": "\n".join(f"- {g}" for g in guidelines)
-            })
+            analysis = self._invoke_structured("simplification", {
+                "requirements": json.dumps(requirements, indent=2)
+            }, SimplificationAnalysis)
             
-            # Parse JSON response
-            response_text = result["text"]
-            import re
-            json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-            if json_match:
-                analysis = json.loads(json_match.group())
-            else:
-                analysis = {"needs_simplification": False, "complexity_score": 0.5, "suggestions": []}
-            
-            return analysis
+            return analysis.model_dump()
             
         except Exception as e:
             print(f"Warning: Simplification analysis failed: {e}")
@@ -1125,37 +1186,7 @@ Provide simplification suggestions as JSON:
     
     def _generate_poc_description(self, requirements: Dict[str, Any], poc_name: str) -> str:
         """Generate poc_desc.md with business goal and features."""
-        prompt = PromptTemplate(
-            input_variables=["requirements", "poc_name"],
-            template="""Generate a POC description document in markdown format.
-
-POC Name: {poc_name}
-Requirements: {requirements}
-
-Create a document with these sections:
-# POC Description
-
-## Purpose
-[Clear statement of what this POC does]
-
-## Users
-[Who will use this]
-
-## Key Features
-[List 3-5 main features based on requirements]
-
-## Success Criteria
-[How we know it works]
-
-## Technical Stack
-- Frontend: React 19 + Tailwind CSS
-- Backend: FastAPI + Python
-- Database: SQLite
-"""
-        )
-        
-        chain = prompt | self.llm
-        result = chain.invoke({
+        result = self._invoke("poc_description", {
             "requirements": json.dumps(requirements, indent=2),
             "poc_name": poc_name
         })
@@ -1202,30 +1233,8 @@ Create a document with these sections:
         """Generate phase implementation document using template from prompts."""
         template = self.get_phase_template(phase)
         
-        # Extract phase-specific details
-        phase_data = {
-            "poc_name": poc_name,
-            "requirements": json.dumps(requirements, indent=2)
-        }
-        
         # Use LLM to fill in template with specific requirements
-        prompt = PromptTemplate(
-            input_variables=["template", "requirements", "poc_name"],
-            template="""Fill in this implementation template with specific details from the requirements.
-
-Template:
-{template}
-
-POC Name: {poc_name}
-Requirements: {requirements}
-
-Generate the complete phase document with all placeholders filled in.
-Make it actionable and ready for Cursor AI to execute.
-"""
-        )
-        
-        chain = prompt | self.llm
-        result = chain.invoke({
+        result = self._invoke("phase_document", {
             "template": template,
             "requirements": json.dumps(requirements, indent=2),
             "poc_name": poc_name
@@ -1284,222 +1293,7 @@ Make it actionable and ready for Cursor AI to execute.
     
     def _generate_prd_content(self, requirements: Dict[str, Any], feature_name: str) -> str:
         """Generate comprehensive PRD markdown content with Cursor instructions."""
-        
-        prompt = PromptTemplate(
-            input_variables=["requirements", "feature_name"],
-            template="""Generate a comprehensive Product Requirements Document (PRD) in markdown format.
-
-Feature Name: {feature_name}
-Requirements: {requirements}
-
-Create a PRD with these sections:
-
-# {feature_name} - Product Requirements Document
-
-## Overview
-[2-3 sentence description of what this feature does and why]
-
-## Goals
-- [Goal 1: What users will be able to accomplish]
-- [Goal 2: Business or user value]
-- [Goal 3: Success metric]
-
-## User Stories
-- As a [user type], I want to [action] so that [benefit]
-- As a [user type], I want to [action] so that [benefit]
-- As a [user type], I want to [action] so that [benefit]
-
-## Technical Stack (Boot_Lang)
-- **Frontend**: React 19 + Tailwind CSS
-- **Backend**: FastAPI + Python 3.11
-- **Database**: SQLite with SQLAlchemy ORM
-- **AI Features**: LangChain + OpenAI (if applicable)
-
-## Features & Requirements
-
-### Feature 1: [Name]
-**Description**: [What it does]
-**Requirements**:
-- [Requirement 1]
-- [Requirement 2]
-- [Requirement 3]
-
-### Feature 2: [Name]
-**Description**: [What it does]
-**Requirements**:
-- [Requirement 1]
-- [Requirement 2]
-
-## Data Model
-
-**Tables/Models**:
-```python
-# Example model structure
-class ExampleModel(Base):
-    __tablename__ = "examples"
-    id = Column(Integer, primary_key=True)
-    user_id = Column(Integer, nullable=False, index=True)
-    # Add other fields based on requirements
-```
-
-[List all database models needed with fields]
-
-## API Endpoints
-
-### Backend Routes
-- `POST /api/{feature_name}/create` - Create new item
-- `GET /api/{feature_name}/list` - List all items for user
-- `GET /api/{feature_name}/{{id}}` - Get single item
-- `PUT /api/{feature_name}/{{id}}` - Update item
-- `DELETE /api/{feature_name}/{{id}}` - Delete item
-
-[Define all endpoints with methods and paths]
-
-## UI/UX Requirements
-
-### Pages
-1. **Main Page** - [Description and purpose]
-2. **Detail Page** - [Description and purpose]
-3. **Form Page** - [Description and purpose]
-
-### Key Components
-- `ComponentName1` - [Purpose]
-- `ComponentName2` - [Purpose]
-
-### Styling
-- [Color scheme and visual requirements]
-- [Layout preferences]
-- [User experience notes]
-
-## Out of Scope
-- [Feature not included in this PRD]
-- [Future enhancement]
-- [Not part of MVP]
-
-## Success Criteria
-- [ ] Users can [action 1]
-- [ ] Users can [action 2]
-- [ ] Data persists correctly
-- [ ] All CRUD operations work
-- [ ] UI is responsive and matches requirements
-
----
-
-## Implementation Instructions for Cursor AI (Claude 4.5 Sonnet)
-
-### Phase 1: Database Setup
-
-**Instruction**: Add database models to `database.py`
-
-```python
-# Add these models to database.py after existing models
-
-[Generate complete SQLAlchemy model code based on data requirements]
-```
-
-**Run migration**:
-```bash
-source venv/bin/activate
-python3 database.py
-```
-
-### Phase 2: Backend API
-
-**Instruction**: Create new FastAPI router file `{feature_name}_api.py`
-
-```python
-# Create {feature_name}_api.py
-
-[Generate complete FastAPI router code with all endpoints, including:
-- Pydantic models for request/response
-- All CRUD operations
-- Authentication using get_current_user from auth.py
-- Database session management using get_db from database.py
-- Error handling with HTTPException
-]
-```
-
-**Register router in app.py**:
-```python
-from {feature_name}_api import router as {feature_name}_router
-app.include_router({feature_name}_router)
-```
-
-### Phase 3: Frontend Components
-
-**Instruction**: Create React components in `frontend/src/components/`
-
-1. **Main Component** (`{feature_name}/{feature_name}.tsx`):
-[Generate complete React component code with:
-- TypeScript interfaces
-- State management
-- API calls to backend
-- Tailwind CSS styling
-- Authentication using useAuth
-]
-
-2. **Form Component** (if needed)
-3. **List Component** (if needed)
-
-**Add routing in App.tsx**:
-```tsx
-import {feature_name}Component from './components/{feature_name}/{feature_name}';
-
-// Add route:
-<Route path="/{feature_name}" element={{
-  <ProtectedRoute>
-    <{feature_name}Component />
-  </ProtectedRoute>
-}} />
-```
-
-### Testing Checklist
-
-**Backend Testing**:
-```bash
-# Start backend
-source venv/bin/activate
-python3 app.py
-
-# Test endpoints with curl
-curl -X POST http://localhost:8000/api/{feature_name}/create \\
-  -H "Authorization: Bearer YOUR_TOKEN" \\
-  -H "Content-Type: application/json" \\
-  -d '{{"field": "value"}}'
-```
-
-**Frontend Testing**:
-```bash
-# Start frontend
-cd frontend
-npm start
-
-# Navigate to http://localhost:3000/{feature_name}
-# Test all user flows
-```
-
-### Deployment
-
-Once tested locally:
-```bash
-# Commit changes
-git add .
-git commit -m "feat: implement {feature_name}"
-git push origin main
-```
-
-GitHub Actions will automatically deploy to Azure.
-
----
-
-**PRD Version**: 1.0
-**Created**: {timestamp}
-**Boot_Lang Stack**: React 19, FastAPI, SQLite, LangChain
-"""
-        )
-        
-        chain = prompt | self.llm
-        result = chain.invoke({
+        result = self._invoke("prd_content", {
             "requirements": json.dumps(requirements, indent=2),
             "feature_name": feature_name,
             "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -1528,74 +1322,32 @@ GitHub Actions will automatically deploy to Azure.
         if not os.path.exists(image_path):
             raise FileNotFoundError(f"Image not found: {image_path}")
         
-        # Read and encode image
-        with open(image_path, "rb") as f:
-            image_data = base64.b64encode(f.read()).decode('utf-8')
+        # Downscale and recompress before encoding
+        image = prepare_image(image_path)
         
-        # Determine image format
-        ext = os.path.splitext(image_path)[1].lower()
-        mime_type = "image/jpeg" if ext in [".jpg", ".jpeg"] else "image/png"
+        # Cached analyses are only valid for the same prompt and model routing
+        fingerprint = hashlib.sha256(json.dumps([
+            self.prompts["templates"]["wireframe_analysis"],
+            self.prompts.get("model_routing", {}).get("call_sites", {}).get("wireframe_analysis")
+        ], sort_keys=True).encode()).hexdigest()
         
-        # Create vision LLM
-        vision_llm = ChatOpenAI(
-            model="gpt-4o",  # Updated model with vision capabilities
-            temperature=0.3,
-            api_key=os.getenv("OPENAI_API_KEY")
-        )
-        
-        # Create analysis prompt
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", "You are a UI/UX analyst. Analyze wireframe images and describe their layout, components, and styling in detail."),
-            ("human", [
-                {
-                    "type": "text",
-                    "text": """Analyze this wireframe image and provide a detailed description.
-
-Extract:
-1. Overall layout structure (header, sidebar, main content, footer)
-2. UI components visible (buttons, forms, tables, charts, etc.)
-3. Styling notes (colors, spacing, typography if visible)
-4. Interactive elements and their purpose
-
-Return your analysis as JSON:
-{
-    "layout": "description of overall layout",
-    "components": ["list", "of", "components"],
-    "styling": "styling observations",
-    "description": "comprehensive description"
-}"""
-                },
-                {
-                    "type": "image_url",
-                    "image_url": {
-                        "url": f"data:{mime_type};base64,{image_data}"
-                    }
-                }
-            ])
-        ])
+        cached = self.wireframe_cache.get(image, fingerprint)
+        if cached is not None:
+            with llm_call("wireframe_analysis"):
+                mark_cache_hit()
+            print(f"✓ Wireframe analysis cache hit: {os.path.basename(image_path)}")
+            return cached
         
         try:
-            chain = prompt | vision_llm
-            result = chain.invoke({})
-            
-            # Parse JSON response
-            import re
-            response_text = result.content
-            json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-            if json_match:
-                analysis = json.loads(json_match.group())
-            else:
-                # Fallback to structured text
-                analysis = {
-                    "layout": "Could not parse",
-                    "components": [],
-                    "styling": "Could not parse",
-                    "description": response_text
-                }
+            analysis = self._invoke_structured("wireframe_analysis", {
+                "mime_type": image.mime_type,
+                "image_data": base64.b64encode(image.data).decode('utf-8')
+            }, WireframeAnalysis).model_dump()
             
+            self.wireframe_cache.put(image, fingerprint, analysis)
             print(f"✓ Analyzed wireframe: {len(analysis.get('components', []))} components identified")
             return analysis
-            
+        
         except Exception as e:
             print(f"Warning: Wireframe analysis failed: {e}")
             return {
@@ -1605,6 +1357,34 @@ Return your analysis as JSON:
                 "description": f"Error: {str(e)}"
             }
     
+    def analyze_wireframes(self, image_paths: List[str], max_workers: int = 4) -> List[Dict[str, Any]]:
+        """
+        Analyze several wireframe images concurrently.
+        
+        Each image is analyzed on a worker thread with the caller's tracing
+        context, so the calls still show up under the current request.
+        
+        Args:
+            image_paths (list): Paths to wireframe images (PNG, JPG)
+            max_workers (int): Maximum concurrent vision calls
+        
+        Returns:
+            list: Analysis results in the same order as image_paths
+        
+        Example:
+            >>> agent.analyze_wireframes(["home.png", "checkout.png"])
+            [{"layout": "...", ...}, {"layout": "...", ...}]
+        """
+        if not image_paths:
+            return []
+        
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(image_paths))) as executor:
+            futures = [
+                executor.submit(contextvars.copy_context().run, self.analyze_wireframe, path)
+                for path in image_paths
+            ]
+            return [future.result() for future in futures]
+
     def load_document(self, file_path: str, file_type: str) -> List[Document]:
         """
         Load a document and split it into chunks for embedding.
@@ -1700,6 +1480,8 @@ Description: {analysis['description']}
 
 # Test functionality when run directly
 if __name__ == "__main__":
+    # These checks call the LLM. To run them offline, start the mock server
+    # (python mock_openai_server.py) and set OPENAI_BASE_URL=http://127.0.0.1:8089/v1
     print("=" * 60)
     print("Testing POC Agent - Phase 1 & 2")
     print("=" * 60)
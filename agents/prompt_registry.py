@@ -0,0 +1,275 @@
+# agents/prompt_registry.py
+"""
+Prompt Registry - compiled prompts and chains for the POC Agent
+
+Builds every PromptTemplate, output parser and runnable chain the agent uses
+once from poc_agent_prompts.json, instead of on every call. The file is
+watched by modification time, so prompt edits are picked up without a restart.
+
+Each call site gets its model, temperature and max_tokens from the
+model_routing section, with a fallback chain of other models used when the
+primary one times out, is rate limited or is unavailable.
+"""
+
+import os
+import json
+import threading
+import time
+from typing import Dict, Any, Optional, Callable
+
+import openai
+from langchain.prompts import PromptTemplate, ChatPromptTemplate
+from langchain.output_parsers import PydanticOutputParser
+
+from agents.schemas import RequirementsSchema
+
+# Minimum seconds between modification time checks of the prompts file
+RELOAD_CHECK_INTERVAL = float(os.getenv("PROMPTS_RELOAD_CHECK_INTERVAL", "1.0"))
+
+# Errors that move a call on to the next model in its fallback chain
+# (raised once the transport's own retries are used up)
+FALLBACK_ERRORS = (
+    openai.RateLimitError,
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.InternalServerError
+)
+
+# Routing used for call sites missing from model_routing
+DEFAULT_ROUTE = {"model": "gpt-3.5-turbo", "temperature": 0.7, "max_tokens": None, "fallbacks": []}
+
+
+class PromptRegistry:
+    """
+    Compiled prompt templates and chains, reloaded when the prompts file changes.
+
+    Example:
+        registry = PromptRegistry(prompts_path, get_chat_model)
+        result = registry.chain("poc_naming").invoke({"description": "..."})
+    """
+
+    def __init__(self, prompts_path: str, model_factory: Callable):
+        """
+        Load and compile the prompt configuration.
+
+        Args:
+            prompts_path (str): Path to poc_agent_prompts.json
+            model_factory (callable): model_factory(model, temperature, **kwargs)
+                returning a chat model (see agents/llm_clients.get_chat_model)
+
+        Raises:
+            FileNotFoundError: If prompt file doesn't exist
+            json.JSONDecodeError: If JSON is invalid
+        """
+        self.prompts_path = prompts_path
+        self.model_factory = model_factory
+
+        self.prompts: Dict[str, Any] = {}
+        self.chains: Dict[str, Any] = {}
+        self.models: Dict[str, Any] = {}
+        self.requirements_parser = PydanticOutputParser(pydantic_object=RequirementsSchema)
+
+        self._mtime: Optional[float] = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+
+        self.load()
+
+    def _read_prompts(self) -> Dict[str, Any]:
+        """Read the prompt configuration JSON."""
+        try:
+            with open(self.prompts_path, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise FileNotFoundError(
+                f"Prompt configuration not found at {self.prompts_path}. "
+                "Please ensure poc_agent_prompts.json exists."
+            )
+        except json.JSONDecodeError as e:
+            raise json.JSONDecodeError(
+                f"Invalid JSON in prompt configuration: {str(e)}",
+                e.doc,
+                e.pos
+            )
+
+    def _route(self, prompts: Dict[str, Any], call_site: str, json_mode: bool = False):
+        """
+        Build the model for a call site from model_routing.
+
+        Args:
+            prompts (dict): Parsed poc_agent_prompts.json
+            call_site (str): Call site name (e.g. "conversation", "prd_content")
+            json_mode (bool): Bind response_format json_object
+
+        Returns:
+            Runnable: Chat model, wrapped with fallbacks if any are configured
+        """
+        routing = prompts.get("model_routing", {})
+        route = {**DEFAULT_ROUTE, **routing.get("default", {}), **routing.get("call_sites", {}).get(call_site, {})}
+
+        options = {"max_tokens": route["max_tokens"]} if route.get("max_tokens") else {}
+        models = []
+        for name in [route["model"]] + list(route.get("fallbacks") or []):
+            model = self.model_factory(name, temperature=route["temperature"], **options)
+            if json_mode:
+                model = model.bind(response_format={"type": "json_object"})
+            models.append(model)
+
+        if len(models) == 1:
+            return models[0]
+        return models[0].with_fallbacks(models[1:], exceptions_to_handle=FALLBACK_ERRORS)
+
+    def _compile(self, prompts: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Build all runnable chains from a prompt configuration.
+
+        Static inputs (naming instructions, contradiction patterns, simplicity
+        guidelines, parser format instructions) are bound as partials here so
+        callers only pass per-call values. Chains with structured output use
+        the model's JSON mode.
+
+        Args:
+            prompts (dict): Parsed poc_agent_prompts.json
+
+        Returns:
+            tuple: (chain name -> runnable, call site -> routed model)
+        """
+        templates = prompts.get("templates", {})
+        required = [
+            "poc_naming", "requirements_extraction", "contradiction_detection",
+            "simplification", "poc_description", "phase_document", "prd_content",
+            "wireframe_analysis_system", "wireframe_analysis", "json_repair"
+        ]
+        missing = [name for name in required if name not in templates]
+        if missing:
+            raise ValueError(f"Prompt configuration is missing templates: {', '.join(missing)}")
+
+        naming_config = prompts.get("poc_naming", {})
+        patterns = prompts.get("contradiction_detection", {}).get("patterns", [])
+        guidelines = prompts.get("simplicity_enforcement", {}).get("guidelines", [])
+
+        naming_prompt = PromptTemplate.from_template(templates["poc_naming"]).partial(
+            instructions=naming_config.get(
+                "instructions",
+                "Generate a short, lowercase name with underscores from this description."
+            ),
+            max_length=str(naming_config.get("max_length", 50))
+        )
+
+        extraction_prompt = PromptTemplate.from_template(templates["requirements_extraction"]).partial(
+            format_instructions=self.requirements_parser.get_format_instructions()
+        )
+
+        contradiction_prompt = PromptTemplate.from_template(templates["contradiction_detection"]).partial(
+            patterns="\n".join(f"- {p}" for p in patterns)
+        )
+
+        simplification_prompt = PromptTemplate.from_template(templates["simplification"]).partial(
+            guidelines="\n".join(f"- {g}" for g in guidelines)
+        )
+
+        wireframe_prompt = ChatPromptTemplate.from_messages([
+            ("system", templates["wireframe_analysis_system"]),
+            ("human", [
+                {"type": "text", "text": templates["wireframe_analysis"]},
+                {"type": "image_url", "image_url": {"url": "data:{mime_type};base64,{image_data}"}}
+            ])
+        ])
+
+        # Structured calls run in JSON mode and are validated by agents/structured_output.py
+        structured = {"requirements_extraction", "contradiction_detection", "simplification",
+                      "wireframe_analysis", "json_repair"}
+        call_sites = ["conversation", "poc_naming", "poc_description", "phase_document",
+                      "prd_content"] + sorted(structured)
+        models = {site: self._route(prompts, site, site in structured) for site in call_sites}
+
+        chains = {
+            "poc_naming": naming_prompt | models["poc_naming"],
+            "requirements_extraction": extraction_prompt | models["requirements_extraction"],
+            "contradiction_detection": contradiction_prompt | models["contradiction_detection"],
+            "simplification": simplification_prompt | models["simplification"],
+            "poc_description": PromptTemplate.from_template(templates["poc_description"]) | models["poc_description"],
+            "phase_document": PromptTemplate.from_template(templates["phase_document"]) | models["phase_document"],
+            "prd_content": PromptTemplate.from_template(templates["prd_content"]) | models["prd_content"],
+            "wireframe_analysis": wireframe_prompt | models["wireframe_analysis"],
+            "json_repair": PromptTemplate.from_template(templates["json_repair"]) | models["json_repair"]
+        }
+        return chains, models
+
+    def load(self):
+        """
+        Read and compile the prompts file, replacing the current registry.
+
+        Raises:
+            FileNotFoundError: If prompt file doesn't exist
+            json.JSONDecodeError: If JSON is invalid
+            ValueError: If required templates are missing
+        """
+        mtime = os.path.getmtime(self.prompts_path) if os.path.exists(self.prompts_path) else None
+        prompts = self._read_prompts()
+        chains, models = self._compile(prompts)
+
+        with self._lock:
+            self.prompts = prompts
+            self.chains = chains
+            self.models = models
+            self._mtime = mtime
+
+        print(f"✓ Loaded prompts version {prompts.get('version', 'unknown')}")
+
+    def refresh(self) -> bool:
+        """
+        Reload the registry if the prompts file changed on disk.
+
+        Checks at most once per RELOAD_CHECK_INTERVAL seconds. A broken edit
+        keeps the previously compiled prompts in place.
+
+        Returns:
+            bool: True if the prompts were reloaded
+        """
+        now = time.monotonic()
+        if now - self._last_check < RELOAD_CHECK_INTERVAL:
+            return False
+        self._last_check = now
+
+        try:
+            mtime = os.path.getmtime(self.prompts_path)
+        except OSError:
+            return False
+
+        if mtime == self._mtime:
+            return False
+
+        try:
+            self.load()
+            return True
+        except Exception as e:
+            print(f"Warning: Could not reload prompts, keeping previous version: {e}")
+            self._mtime = mtime
+            return False
+
+    def chain(self, name: str):
+        """
+        Get a compiled chain by name.
+
+        Args:
+            name (str): Chain name (e.g., "poc_naming", "prd_content")
+
+        Returns:
+            Runnable: Compiled prompt | llm chain
+        """
+        self.refresh()
+        return self.chains[name]
+
+    def model(self, call_site: str):
+        """
+        Get the routed model (with fallbacks) for a call site.
+
+        Args:
+            call_site (str): Call site name (e.g., "conversation")
+
+        Returns:
+            Runnable: Chat model for the call site
+        """
+        self.refresh()
+        return self.models[call_site]
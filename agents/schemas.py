@@ -0,0 +1,104 @@
+# agents/schemas.py
+"""
+Pydantic models for structured POC Agent outputs.
+"""
+
+from typing import Dict, List, Optional, Any
+from pydantic import BaseModel, Field
+
+
+# ===== Pydantic Models for Requirements (Phase 4) =====
+
+class RequirementsSchema(BaseModel):
+    """
+    Structured schema for POC requirements.
+    Used by StructuredOutputParser to extract requirements from conversation.
+    """
+    goal: Optional[str] = Field(
+        None,
+        description="Main goal or purpose of the application"
+    )
+    users: Optional[str] = Field(
+        None,
+        description="Target users or user groups"
+    )
+    workflow: Optional[str] = Field(
+        None,
+        description="Core user workflow in 2-3 sentences"
+    )
+    frontend: Optional[Dict[str, Any]] = Field(
+        None,
+        description="Frontend requirements including pages, components, layout"
+    )
+    backend: Optional[Dict[str, Any]] = Field(
+        None,
+        description="Backend requirements including data operations, APIs, business logic"
+    )
+    database: Optional[Dict[str, Any]] = Field(
+        None,
+        description="Database requirements including entities, relationships, constraints"
+    )
+    integrations: Optional[List[str]] = Field(
+        None,
+        description="External systems or APIs to integrate with"
+    )
+    constraints: Optional[List[str]] = Field(
+        None,
+        description="Technical or business constraints"
+    )
+
+
+# ===== Pydantic Models for Structured Analysis (Phases 5 & 7) =====
+
+class ContradictionAnalysis(BaseModel):
+    """Result of contradiction detection over requirements."""
+    has_contradictions: bool = Field(
+        False,
+        description="Whether any contradictions were found"
+    )
+    contradictions: List[str] = Field(
+        default_factory=list,
+        description="Contradictions found"
+    )
+    clarifying_questions: List[str] = Field(
+        default_factory=list,
+        description="Questions to resolve the contradictions"
+    )
+
+
+class SimplificationAnalysis(BaseModel):
+    """Result of the complexity check over requirements."""
+    needs_simplification: bool = Field(
+        False,
+        description="Whether the requirements should be simplified"
+    )
+    complexity_score: float = Field(
+        0.5,
+        ge=0.0,
+        le=1.0,
+        description="Complexity from 0.0 (minimal) to 1.0 (very complex)"
+    )
+    suggestions: List[str] = Field(
+        default_factory=list,
+        description="Simplification suggestions"
+    )
+
+
+class WireframeAnalysis(BaseModel):
+    """Result of analyzing a wireframe image."""
+    layout: str = Field(
+        "",
+        description="Overall layout structure"
+    )
+    components: List[str] = Field(
+        default_factory=list,
+        description="UI components visible in the wireframe"
+    )
+    styling: str = Field(
+        "",
+        description="Styling observations"
+    )
+    description: str = Field(
+        "",
+        description="Comprehensive description"
+    )
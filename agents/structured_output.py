@@ -0,0 +1,80 @@
+# agents/structured_output.py
+"""
+Structured Output - validate JSON-mode LLM replies against Pydantic models
+
+Structured chains run the model in JSON mode, so replies are a JSON object
+rather than prose with JSON somewhere inside. The reply is validated
+against a Pydantic schema; if that fails, the model gets one repair attempt
+with the validation error and the schema. Parse failures are counted per
+call site (see poc_llm_parse_failures_total in /metrics) instead of being
+silently replaced by defaults.
+"""
+
+import json
+from typing import Callable, Optional, Type, TypeVar
+
+from pydantic import BaseModel, ValidationError
+
+from agents.llm_tracing import record_parse_result
+
+T = TypeVar("T", bound=BaseModel)
+
+
+class StructuredOutputError(ValueError):
+    """Raised when a reply is still invalid after the repair attempt."""
+
+
+def _validate(text: str, schema: Type[T]) -> T:
+    """Validate a JSON reply, tolerating a markdown code fence around it."""
+    text = text.strip()
+    if text.startswith("```"):
+        text = text.strip("`")
+        if text.startswith("json"):
+            text = text[4:]
+    return schema.model_validate_json(text)
+
+
+def parse_structured(
+    text: str,
+    schema: Type[T],
+    call_site: str,
+    repair: Optional[Callable[[str, str, str], str]] = None
+) -> T:
+    """
+    Parse an LLM reply into a Pydantic model, with one repair attempt.
+
+    Args:
+        text (str): Raw reply content
+        schema (type): Pydantic model to validate against
+        call_site (str): Call site name for metrics
+        repair (callable, optional): repair(reply, error, json_schema) -> new reply
+
+    Returns:
+        BaseModel: Validated instance of schema
+
+    Raises:
+        StructuredOutputError: If the reply (and its repair) is invalid
+
+    Example:
+        >>> parse_structured('{"has_contradictions": false}', ContradictionAnalysis, "contradiction_detection")
+        ContradictionAnalysis(has_contradictions=False, contradictions=[], clarifying_questions=[])
+    """
+    try:
+        result = _validate(text, schema)
+        record_parse_result(call_site, "ok")
+        return result
+    except ValidationError as e:
+        error = str(e)
+
+    if repair is not None:
+        repaired = repair(text, error, json.dumps(schema.model_json_schema()))
+        try:
+            result = _validate(repaired, schema)
+            record_parse_result(call_site, "repaired")
+            print(f"✓ Repaired {call_site} output")
+            return result
+        except ValidationError as e:
+            error = str(e)
+
+    record_parse_result(call_site, "failed")
+    raise StructuredOutputError(f"Invalid {call_site} output: {error}")
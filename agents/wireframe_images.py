@@ -0,0 +1,190 @@
+# agents/wireframe_images.py
+"""
+Wireframe Images - downscaling and analysis cache for GPT-4o vision
+
+Wireframes are resized to fit WIREFRAME_MAX_SIDE and recompressed before
+they are base64-encoded, so multi-megabyte screenshots become small
+requests. The model downsamples large images anyway, so detail is not lost.
+
+Analysis results are cached by the SHA-256 of the downscaled bytes sent to
+the model, so re-uploads, and re-saved copies that decode to the same
+pixels, skip the vision call. There is no near-duplicate matching: two
+wireframes with the same layout but different labels (a sign-in and a
+register form) look alike to a perceptual hash but need their own
+analyses. Entries are kept in memory and in wireframe_cache/ on disk, and
+are only reused while the wireframe prompt and model routing are unchanged.
+
+Configuration (environment variables):
+    WIREFRAME_MAX_SIDE        Longest side in pixels after resizing (default 1536)
+    WIREFRAME_JPEG_QUALITY    JPEG quality when recompressing (default 85)
+    WIREFRAME_CACHE_SIZE      Entries kept in memory (default 256)
+    WIREFRAME_CACHE_DIR       Disk cache directory (default wireframe_cache)
+"""
+
+import io
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+MAX_SIDE = int(os.getenv("WIREFRAME_MAX_SIDE", "1536"))
+JPEG_QUALITY = int(os.getenv("WIREFRAME_JPEG_QUALITY", "85"))
+CACHE_SIZE = int(os.getenv("WIREFRAME_CACHE_SIZE", "256"))
+CACHE_DIR = os.getenv("WIREFRAME_CACHE_DIR", "wireframe_cache")
+
+
+class PreparedImage:
+    """Image bytes ready for the vision API plus their cache key (SHA-256 of data)."""
+
+    def __init__(self, data: bytes, mime_type: str):
+        self.data = data
+        self.mime_type = mime_type
+        self.sha256 = hashlib.sha256(data).hexdigest()
+
+
+def prepare_image(image_path: str) -> PreparedImage:
+    """
+    Load, downscale and recompress a wireframe image.
+
+    The smallest of the original (if it already fits), PNG and JPEG is kept. Without Pillow the
+    original bytes are sent unchanged.
+
+    Args:
+        image_path (str): Path to a PNG or JPG image
+
+    Returns:
+        PreparedImage: Encoded image and its cache key
+
+    Example:
+        >>> image = prepare_image("uploads/1/wireframe.png")
+        >>> len(image.data), image.mime_type
+        (48213, 'image/jpeg')
+    """
+    with open(image_path, "rb") as f:
+        original = f.read()
+
+    ext = os.path.splitext(image_path)[1].lower()
+    original_mime = "image/jpeg" if ext in [".jpg", ".jpeg"] else "image/png"
+
+    if not PIL_AVAILABLE:
+        return PreparedImage(original, original_mime)
+
+    try:
+        image = Image.open(io.BytesIO(original))
+        image.load()
+    except OSError:
+        # Not a format Pillow can decode; let the vision API judge it
+        return PreparedImage(original, original_mime)
+
+    with image:
+        original_mime = Image.MIME.get(image.format, original_mime)
+        original_side = max(image.size)
+
+        # Flatten transparency onto white so JPEG is an option
+        if image.mode in ("RGBA", "LA", "P"):
+            image = image.convert("RGBA")
+            background = Image.new("RGB", image.size, (255, 255, 255))
+            background.paste(image, mask=image.split()[-1])
+            image = background
+        elif image.mode != "RGB":
+            image = image.convert("RGB")
+
+        if max(image.size) > MAX_SIDE:
+            image.thumbnail((MAX_SIDE, MAX_SIDE), Image.LANCZOS)
+
+        # The original is only a candidate if it already fits
+        candidates = [(original, original_mime)] if original_side <= MAX_SIDE else []
+        png = io.BytesIO()
+        image.save(png, format="PNG", optimize=True)
+        candidates.append((png.getvalue(), "image/png"))
+        jpeg = io.BytesIO()
+        image.save(jpeg, format="JPEG", quality=JPEG_QUALITY, optimize=True)
+        candidates.append((jpeg.getvalue(), "image/jpeg"))
+
+    data, mime_type = min(candidates, key=lambda c: len(c[0]))
+
+    return PreparedImage(data, mime_type)
+
+
+class WireframeCache:
+    """
+    Thread-safe analysis cache keyed by the SHA-256 of the prepared image.
+
+    Example:
+        cache = WireframeCache()
+        analysis = cache.get(image, fingerprint)
+        if analysis is None:
+            analysis = analyze(...)
+            cache.put(image, fingerprint, analysis)
+    """
+
+    def __init__(self, cache_dir: str = CACHE_DIR, max_entries: int = CACHE_SIZE):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, sha256: str) -> str:
+        return os.path.join(self.cache_dir, f"{sha256}.json")
+
+    def _remember(self, sha256: str, entry: Dict[str, Any]):
+        self._entries[sha256] = entry
+        self._entries.move_to_end(sha256)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _write(self, sha256: str, entry: Dict[str, Any]):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(self._path(sha256), "w") as f:
+                json.dump(entry, f)
+        except OSError as e:
+            print(f"Warning: Could not write wireframe cache: {e}")
+
+    def get(self, image: PreparedImage, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached analysis for an image.
+
+        Args:
+            image (PreparedImage): Prepared image
+            fingerprint (str): Prompt/model fingerprint the entry must match
+
+        Returns:
+            dict: Cached analysis, or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(image.sha256)
+            if entry is None and os.path.exists(self._path(image.sha256)):
+                try:
+                    with open(self._path(image.sha256)) as f:
+                        entry = json.load(f)
+                    self._remember(image.sha256, entry)
+                except (OSError, ValueError):
+                    entry = None
+
+            # Entries with a dhash predate exact-only keys and may hold a near-duplicate's analysis
+            if entry is None or "dhash" in entry or entry["fingerprint"] != fingerprint:
+                return None
+            return dict(entry["analysis"])
+
+    def put(self, image: PreparedImage, fingerprint: str, analysis: Dict[str, Any]):
+        """
+        Store an analysis in memory and on disk.
+
+        Args:
+            image (PreparedImage): Prepared image
+            fingerprint (str): Prompt/model fingerprint
+            analysis (dict): Analysis result
+        """
+        entry = {"fingerprint": fingerprint, "analysis": analysis}
+        with self._lock:
+            self._remember(image.sha256, entry)
+            self._write(image.sha256, entry)
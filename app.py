@@ -1,9 +1,12 @@
 # app.py
+import json
 import os
 from datetime import datetime
-from typing import Optional, Dict, Any
-from fastapi import FastAPI, HTTPException, Depends
+from typing import Optional, Dict, Any, List
+from fastapi import FastAPI, HTTPException, Depends, Query, Request
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from dotenv import load_dotenv
 
@@ -11,7 +14,8 @@ from dotenv import load_dotenv
 load_dotenv()
 
 # Import database initialization
-from database import init_db
+from database import (init_db, async_engine, IS_SQLITE, database_exists, read_table_records, read_table_cell,
+                      iter_table_records)
 
 # Import routers
 from auth import router as auth_router
@@ -19,6 +23,15 @@ from user_management import router as user_router
 from admin import router as admin_router
 from poc_api import router as poc_router
 from tenant.tenant_1.poc_idea_1.backend.routes import router as t1_poc1_router
+from agents.llm_clients import close_clients, llm_metrics
+from agents.llm_tracing import start_request, trace_store
+from rate_limiter import rate_limiter
+from system_status import system_status
+from pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, decode_cursor, encode_cursor
+
+# Table browser: characters of each text cell in a records page, rows per export query
+TABLE_CELL_PREVIEW = int(os.getenv("TABLE_CELL_PREVIEW", "200"))
+TABLE_EXPORT_BATCH = int(os.getenv("TABLE_EXPORT_BATCH", "500"))
 
 app = FastAPI(title="Boot_Lang Platform")
 
@@ -27,8 +40,17 @@ app = FastAPI(title="Boot_Lang Platform")
 async def startup_event():
     """Initialize database tables on application startup."""
     init_db()
+    system_status.start()
     print("✓ Application started, database initialized")
 
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Close shared LLM connection pools and the async database engine on application shutdown."""
+    system_status.stop()
+    await close_clients()
+    await async_engine.dispose()
+
 # CORS - pre-configured for deployment
 app.add_middleware(
     CORSMiddleware,
@@ -46,6 +68,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request id + LLM call tracing for every API request
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    """Tag LLM calls with the request id and report them in response headers."""
+    trace = start_request(request.headers.get("X-Request-ID"), request.url.path)
+    response = await call_next(request)
+    response.headers["X-Request-ID"] = trace.request_id
+    if trace.calls:
+        response.headers["X-LLM-Calls"] = str(len(trace.calls))
+        response.headers["X-LLM-Time-Ms"] = str(round(sum(c["latency_ms"] for c in trace.calls), 1))
+    return response
+
 # Include routers
 app.include_router(auth_router)
 app.include_router(user_router)
@@ -94,6 +128,26 @@ async def root():
             "version": "1.0.0"
         }
 
+# Prometheus metrics
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """
+    LLM call metrics in Prometheus text format.
+    
+    Calls, errors, retries, cache hits, tokens and latency histograms by
+    call site and model, connections opened by the shared LLM pools, and
+    rate limiter admissions.
+    """
+    connections = llm_metrics.snapshot()["connections_opened"]
+    return PlainTextResponse(
+        trace_store.prometheus()
+        + rate_limiter.prometheus()
+        + "# HELP poc_llm_connections_opened_total TCP connections opened by the LLM client pools\n"
+        + "# TYPE poc_llm_connections_opened_total counter\n"
+        + f"poc_llm_connections_opened_total {connections}\n",
+        media_type="text/plain; version=0.0.4"
+    )
+
 # Config endpoint - serves user configuration for splash page
 @app.get("/api/config")
 async def get_config():
@@ -139,133 +193,15 @@ async def get_system_status():
     """
     Get system status for admin dashboard.
     
-    Returns git status, database info, and project info.
+    Returns git status, database info, and project info from the snapshot
+    kept by the background refresher (see system_status.py). timestamp is
+    when the snapshot was taken and age_seconds how old it is.
     """
-    import json
-    import subprocess
-    import sqlite3
-    
-    status = {
-        "project": {},
-        "git": {},
-        "database": {},
-        "timestamp": datetime.now().isoformat()
-    }
-    
-    # Project info
-    try:
-        with open('user_config.json', 'r') as f:
-            config = json.load(f)
-        
-        status["project"] = {
-            "name": config.get('user_identity', {}).get('project_name', 'Unknown'),
-            "user": config.get('user_identity', {}).get('user_name', 'Unknown'),
-            "environment": os.getenv('ENVIRONMENT', 'development')
-        }
-    except:
-        status["project"] = {
-            "name": "Unknown",
-            "user": "Unknown",
-            "environment": "development"
-        }
-    
-    # Git status
-    try:
-        branch = subprocess.check_output(
-            ['git', 'branch', '--show-current'],
-            text=True,
-            stderr=subprocess.DEVNULL
-        ).strip()
-        
-        # Get last 3 commits
-        commits_output = subprocess.check_output(
-            ['git', 'log', '-3', '--pretty=%h|%s'],
-            text=True,
-            stderr=subprocess.DEVNULL
-        ).strip()
-        
-        commits = []
-        for line in commits_output.split('\n'):
-            if '|' in line:
-                hash_part, msg_part = line.split('|', 1)
-                commits.append({
-                    "hash": hash_part.strip(),
-                    "message": msg_part.strip()
-                })
-        
-        status_output = subprocess.check_output(
-            ['git', 'status', '--porcelain'],
-            text=True,
-            stderr=subprocess.DEVNULL
-        ).strip()
-        
-        has_changes = bool(status_output)
-        
-        status["git"] = {
-            "branch": branch,
-            "recent_commits": commits,
-            "has_uncommitted_changes": has_changes,
-            "status": "⚠️ Uncommitted changes" if has_changes else "✅ Clean"
-        }
-    except:
-        status["git"] = {
-            "branch": "unknown",
-            "recent_commits": [],
-            "has_uncommitted_changes": False,
-            "status": "⚠️ Git info unavailable"
-        }
-    
-    # Database info
-    db_path = 'boot_lang.db'
-    
-    if not os.path.exists(db_path):
-        status["database"] = {
-            "exists": False,
-            "tables": [],
-            "total_records": 0
-        }
-    else:
-        try:
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%';")
-            tables = cursor.fetchall()
-            
-            table_info = []
-            total_records = 0
-            
-            for (table_name,) in tables:
-                try:
-                    cursor.execute(f"SELECT COUNT(*) FROM {table_name}")
-                    count = cursor.fetchone()[0]
-                    total_records += count
-                    table_info.append({
-                        "name": table_name,
-                        "records": count
-                    })
-                except:
-                    table_info.append({
-                        "name": table_name,
-                        "records": "Error"
-                    })
-            
-            conn.close()
-            
-            status["database"] = {
-                "exists": True,
-                "tables": table_info,
-                "total_records": total_records
-            }
-        except Exception as e:
-            status["database"] = {
-                "exists": True,
-                "tables": [],
-                "total_records": 0,
-                "error": str(e)
-            }
-    
-    return status
+    snapshot = system_status.snapshot()
+    if snapshot is None:
+        await run_in_threadpool(system_status.refresh)
+        snapshot = system_status.snapshot()
+    return snapshot
 
 
 # Settings config endpoint
@@ -298,64 +234,146 @@ async def get_settings_config():
         raise HTTPException(status_code=500, detail=f"Error loading configuration: {str(e)}")
 
 
-# Table records endpoint for admin dashboard
+# Table browser endpoints for admin dashboard
+def _parse_columns(columns: Optional[str]) -> Optional[List[str]]:
+    """Split a comma-separated column projection, e.g. "id,username"."""
+    if not columns:
+        return None
+    return [column.strip() for column in columns.split(",") if column.strip()]
+
+
+def _parse_key(key: str):
+    """Row keys arrive as query strings; integer keys (rowids, ids) are compared as integers."""
+    return int(key) if key.lstrip("-").isdigit() else key
+
+
 @app.get("/api/system/table/{table_name}/records")
-async def get_table_records(table_name: str):
+async def get_table_records(
+    table_name: str,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    columns: Optional[str] = None,
+    max_cell: int = Query(TABLE_CELL_PREVIEW, ge=0)
+):
     """
-    Get all records from a specific database table.
+    Get one page of records from a specific database table.
+    
+    Rows come in row key order (rowid on SQLite); pass next_cursor back as
+    cursor for the next page. Text longer than max_cell characters is cut
+    short and listed in "truncated"; fetch it in full from the cell endpoint.
     
     Args:
         table_name: Name of the table to query
+        cursor: next_cursor of the previous page
+        limit: Rows per page
+        columns: Comma-separated columns to return (default: all)
+        max_cell: Characters of each text value to return (0 = no limit)
         
     Returns:
-        JSON with columns and rows data
+        JSON with columns, rows, their keys, truncated cells and next_cursor
     """
-    import sqlite3
-    
-    db_path = 'boot_lang.db'
-    
-    if not os.path.exists(db_path):
+    if IS_SQLITE and not database_exists():
         raise HTTPException(status_code=404, detail="Database not found")
     
+    after = decode_cursor(cursor)[1] if cursor else None
+    
     try:
-        conn = sqlite3.connect(db_path)
-        conn.row_factory = sqlite3.Row  # Enable column access by name
-        cursor = conn.cursor()
-        
-        # Verify table exists
-        cursor.execute(
-            "SELECT name FROM sqlite_master WHERE type='table' AND name=?",
-            (table_name,)
-        )
-        if not cursor.fetchone():
-            conn.close()
-            raise HTTPException(status_code=404, detail=f"Table '{table_name}' not found")
-        
-        # Get all records
-        cursor.execute(f"SELECT * FROM {table_name}")
-        rows = cursor.fetchall()
-        
-        # Get column names
-        columns = [description[0] for description in cursor.description]
-        
-        # Convert rows to list of dicts
-        records = [dict(row) for row in rows]
-        
-        conn.close()
+        async with async_engine.connect() as conn:
+            page = await conn.run_sync(
+                read_table_records, table_name, after, limit, _parse_columns(columns), max_cell or None
+            )
         
         return {
             "table_name": table_name,
-            "columns": columns,
-            "records": records,
-            "count": len(records)
+            "columns": page["columns"],
+            "keys": page["keys"],
+            "records": page["records"],
+            "count": len(page["records"]),
+            "truncated": page["truncated"],
+            "next_cursor": encode_cursor(page["next_key"], page["next_key"]) if page["next_key"] is not None else None
         }
         
-    except HTTPException:
-        raise
+    except KeyError as e:  # a LookupError too, so it's caught first
+        raise HTTPException(status_code=400, detail=f"Unknown column(s): {e.args[0]}")
+    except LookupError:
+        raise HTTPException(status_code=404, detail=f"Table '{table_name}' not found")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching table records: {str(e)}")
 
 
+@app.get("/api/system/table/{table_name}/cell")
+async def get_table_cell(table_name: str, key: str, column: str):
+    """
+    Get the full value of one cell, e.g. one the records endpoint truncated.
+    
+    Args:
+        table_name: Name of the table to query
+        key: Row key, from "keys" or "truncated" of the records endpoint
+        column: Column to read
+        
+    Returns:
+        JSON with the untruncated value
+    """
+    if IS_SQLITE and not database_exists():
+        raise HTTPException(status_code=404, detail="Database not found")
+    
+    try:
+        async with async_engine.connect() as conn:
+            value = await conn.run_sync(read_table_cell, table_name, _parse_key(key), column)
+        
+        return {"table_name": table_name, "key": key, "column": column, "value": value}
+        
+    except KeyError as e:
+        raise HTTPException(status_code=400, detail=f"Unknown column(s): {e.args[0]}")
+    except LookupError:
+        raise HTTPException(status_code=404, detail=f"Row '{key}' of table '{table_name}' not found")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching table cell: {str(e)}")
+
+
+@app.get("/api/system/table/{table_name}/export")
+async def export_table(table_name: str, columns: Optional[str] = None):
+    """
+    Stream a whole table as NDJSON, one JSON object per line.
+    
+    Rows are read in keyset batches and serialized as they are sent, so
+    memory use stays the same however large the table is. Values are not
+    truncated.
+    
+    Args:
+        table_name: Name of the table to export
+        columns: Comma-separated columns to export (default: all)
+        
+    Returns:
+        StreamingResponse: application/x-ndjson download
+    """
+    if IS_SQLITE and not database_exists():
+        raise HTTPException(status_code=404, detail="Database not found")
+    
+    rows = iter_table_records(table_name, _parse_columns(columns), TABLE_EXPORT_BATCH)
+    try:
+        # Reading the first row checks the table and columns while an error can still be a status code
+        first = await run_in_threadpool(next, rows, None)
+    except KeyError as e:
+        raise HTTPException(status_code=400, detail=f"Unknown column(s): {e.args[0]}")
+    except LookupError:
+        raise HTTPException(status_code=404, detail=f"Table '{table_name}' not found")
+    
+    def lines():
+        if first is None:
+            return
+        yield json.dumps(first, default=str) + "\n"
+        for row in rows:
+            yield json.dumps(row, default=str) + "\n"
+    
+    # A sync generator: Starlette pulls each line in its thread pool, so batch queries don't block the loop
+    return StreamingResponse(
+        lines(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{table_name}.ndjson"'}
+    )
+
+
 # Login endpoint
 @app.post("/api/login", response_model=LoginResponse)
 async def login(request: LoginRequest):
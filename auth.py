@@ -10,18 +10,21 @@ This module provides:
 from fastapi import APIRouter, HTTPException, Depends, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel, Field
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 from datetime import datetime
 
-from database import get_db, User
+from database import get_async_db, User
 from auth_utils import (
-    hash_password, 
-    verify_password, 
+    hash_password_async, 
+    verify_password_async, 
+    needs_rehash,
     create_access_token, 
     decode_access_token,
     validate_password_strength
 )
+from user_cache import user_cache
 
 router = APIRouter(prefix="/api/auth", tags=["authentication"])
 security = HTTPBearer()
@@ -61,11 +64,17 @@ class UserInfo(BaseModel):
 # Dependency to get current user from JWT token
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> User:
     """
     Dependency to extract and validate current user from JWT token.
     
+    Decoded tokens and user rows come from user_cache when fresh, so most
+    requests do no JWT or database work here. The returned user is detached
+    from the session; endpoints that modify it must load the row with
+    db.get(User, current_user.id) (await it on an AsyncSession) and call
+    user_cache.invalidate_user().
+    
     Args:
         credentials: HTTP Bearer token from Authorization header
         db: Database session
@@ -77,13 +86,15 @@ async def get_current_user(
         HTTPException: If token is invalid or user not found
     """
     token = credentials.credentials
-    payload = decode_access_token(token)
-    
+    payload = user_cache.get_token(token)
     if payload is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid or expired token"
-        )
+        payload = decode_access_token(token)
+        if payload is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid or expired token"
+            )
+        user_cache.put_token(token, payload)
     
     user_id = payload.get("sub")
     if user_id is None:
@@ -92,18 +103,22 @@ async def get_current_user(
             detail="Invalid token payload"
         )
     
-    user = db.query(User).filter(User.id == int(user_id)).first()
+    user = user_cache.get_user(int(user_id))
     if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found"
-        )
+        user = await db.get(User, int(user_id))
+        if user is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not found"
+            )
+        user_cache.put_user(user)
+        db.expunge(user)
     
     return user
 
 
 @router.post("/register", response_model=AuthResponse, status_code=status.HTTP_201_CREATED)
-async def register(request: RegisterRequest, db: Session = Depends(get_db)):
+async def register(request: RegisterRequest, db: AsyncSession = Depends(get_async_db)):
     """
     Register a new user account.
     
@@ -126,7 +141,7 @@ async def register(request: RegisterRequest, db: Session = Depends(get_db)):
         )
     
     # Check if username already exists
-    existing_user = db.query(User).filter(User.username == request.username).first()
+    existing_user = await db.scalar(select(User).where(User.username == request.username))
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -135,7 +150,7 @@ async def register(request: RegisterRequest, db: Session = Depends(get_db)):
     
     # Check if email already exists (if provided)
     if request.email:
-        existing_email = db.query(User).filter(User.email == request.email).first()
+        existing_email = await db.scalar(select(User).where(User.email == request.email))
         if existing_email:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -143,7 +158,7 @@ async def register(request: RegisterRequest, db: Session = Depends(get_db)):
             )
     
     # Create new user
-    hashed_pw = hash_password(request.password)
+    hashed_pw = await hash_password_async(request.password)
     new_user = User(
         username=request.username,
         email=request.email,
@@ -152,8 +167,8 @@ async def register(request: RegisterRequest, db: Session = Depends(get_db)):
     )
     
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
     
     # Generate JWT token
     token = create_access_token(
@@ -178,7 +193,7 @@ async def register(request: RegisterRequest, db: Session = Depends(get_db)):
 
 
 @router.post("/login", response_model=AuthResponse)
-async def login(request: LoginRequest, db: Session = Depends(get_db)):
+async def login(request: LoginRequest, db: AsyncSession = Depends(get_async_db)):
     """
     Authenticate user and return JWT token.
     
@@ -193,7 +208,7 @@ async def login(request: LoginRequest, db: Session = Depends(get_db)):
         HTTPException: If credentials are invalid
     """
     # Find user by username
-    user = db.query(User).filter(User.username == request.username).first()
+    user = await db.scalar(select(User).where(User.username == request.username))
     
     if not user:
         raise HTTPException(
@@ -202,12 +217,18 @@ async def login(request: LoginRequest, db: Session = Depends(get_db)):
         )
     
     # Verify password
-    if not verify_password(request.password, user.password_hash):
+    if not await verify_password_async(request.password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid username or password"
         )
     
+    # Upgrade hashes made with an older work factor
+    if needs_rehash(user.password_hash):
+        user.password_hash = await hash_password_async(request.password)
+        await db.commit()
+        user_cache.invalidate_user(user.id)
+    
     # Generate JWT token
     token = create_access_token(
         data={
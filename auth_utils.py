@@ -3,11 +3,15 @@ Authentication utilities for JWT token management and password hashing.
 
 This module provides functions for:
 - Password hashing and verification using bcrypt
+- Async variants that run bcrypt on a bounded thread pool, so password work
+  never blocks the event loop (bcrypt releases the GIL while hashing)
 - JWT token creation and validation
 - Token payload extraction
 """
 
+import asyncio
 import bcrypt
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
 from jose import JWTError, jwt
@@ -19,6 +23,15 @@ SECRET_KEY = os.getenv("JWT_SECRET_KEY", "your-secret-key-change-in-production")
 ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_HOURS = int(os.getenv("JWT_EXPIRATION_HOURS", "24"))
 
+# Password hashing configuration
+# BCRYPT_ROUNDS is the work factor for new hashes; older hashes with fewer
+# rounds are upgraded on the next successful login (see needs_rehash)
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# Dedicated pool, so a login storm can't take over the default executor
+_password_pool = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+
 
 def hash_password(password: str) -> str:
     """
@@ -35,7 +48,7 @@ def hash_password(password: str) -> str:
         # Returns: "$2b$12$..."
     """
     # Generate salt and hash password
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=BCRYPT_ROUNDS)
     password_bytes = password.encode('utf-8')
     hashed = bcrypt.hashpw(password_bytes, salt)
     return hashed.decode('utf-8')
@@ -62,6 +75,49 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return bcrypt.checkpw(password_bytes, hashed_bytes)
 
 
+def needs_rehash(hashed_password: str) -> bool:
+    """
+    Check whether a hash was made with fewer rounds than BCRYPT_ROUNDS.
+    
+    Args:
+        hashed_password: Bcrypt hash ("$2b$<rounds>$...")
+        
+    Returns:
+        bool: True if the hash should be upgraded
+        
+    Example:
+        if needs_rehash(user.password_hash):
+            user.password_hash = hash_password(password)
+    """
+    try:
+        return int(hashed_password.split("$")[2]) < BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return False
+
+
+async def hash_password_async(password: str) -> str:
+    """
+    Hash a password on the bcrypt pool without blocking the event loop.
+    
+    Example:
+        hashed = await hash_password_async("mypassword123")
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_password_pool, hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verify a password on the bcrypt pool without blocking the event loop.
+    
+    Example:
+        if await verify_password_async(request.password, user.password_hash):
+            ...
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_password_pool, verify_password, plain_password, hashed_password)
+
+
 def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
     """
     Create a JWT access token.
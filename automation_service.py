@@ -1,18 +1,53 @@
 """
 Automation Service - Handles all setup automation in Python
 Replaces external bash/PowerShell scripts for cross-platform compatibility
+
+run_automation declares its steps with their dependencies (see steps()) and
+runs them through step_scheduler, so independent steps overlap. Each step is
+timed and checkpointed in setup_progress.log; a failed run started again
+with the same configuration resumes from the step that failed.
+
+install_dependencies installs from a wheelhouse: wheels for every
+requirement, built once per requirements.txt hash, Python version and
+platform. When one exists the install is offline; uv installs from it when
+it's on PATH. Each run appends its step timings to SETUP_TIMINGS_FILE.
+
+requirements.txt uses >= ranges, so a wheelhouse pins whatever versions
+were current when it was built. It is rebuilt from scratch (picking up new
+releases, including security fixes) once it is WHEELHOUSE_MAX_AGE_DAYS old,
+or on demand with SETUP_REFRESH_WHEELS=1; in between, installs are fast
+and reproducible but don't see new releases.
+
+Configuration (environment variables):
+    SETUP_MAX_WORKERS   Most setup steps running at once (default 4)
+    WHEELHOUSE_DIR      Wheelhouse cache root (default ~/.cache/boot_lang/wheelhouse)
+    WHEELHOUSE_MAX_AGE_DAYS  Rebuild a wheelhouse older than this, 0 = never (default 7)
+    SETUP_REFRESH_WHEELS     Set to 1 to rebuild the wheelhouse on this run (default 0)
+    SETUP_USE_UV        Set to 0 to install with pip even if uv is available (default 1)
+    SETUP_TIMINGS_FILE  JSON lines history of setup timings (default setup_timings.jsonl)
 """
 
 import os
 import sys
 import json
+import hashlib
 import subprocess
+import threading
 import time
 import platform
 import shutil
 import webbrowser
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
+
+from step_scheduler import Step, StepScheduler, read_checkpoints
+
+MAX_WORKERS = int(os.getenv("SETUP_MAX_WORKERS", "4"))
+WHEELHOUSE_DIR = os.getenv("WHEELHOUSE_DIR", os.path.join(Path.home(), ".cache", "boot_lang", "wheelhouse"))
+WHEELHOUSE_MAX_AGE_DAYS = float(os.getenv("WHEELHOUSE_MAX_AGE_DAYS", "7"))
+REFRESH_WHEELS = os.getenv("SETUP_REFRESH_WHEELS", "0") == "1"
+USE_UV = os.getenv("SETUP_USE_UV", "1") != "0"
+TIMINGS_FILE = os.getenv("SETUP_TIMINGS_FILE", "setup_timings.jsonl")
 
 
 class AutomationService:
@@ -23,6 +58,10 @@ class AutomationService:
         self.config = self._load_config()
         self.is_windows = platform.system() == 'Windows'
         self.progress_log = 'setup_progress.log'
+        # Steps run in parallel and all append to the progress log
+        self._log_lock = threading.Lock()
+        # Wheelhouse hit/miss and phase timings of install_dependencies, for the timings history
+        self.install_details: Dict[str, Any] = {}
         
     def _load_config(self) -> Dict[str, Any]:
         """Load user configuration."""
@@ -39,22 +78,24 @@ class AutomationService:
         timestamp = time.strftime('%Y-%m-%d %H:%M:%S')
         formatted = f"[{timestamp}] {message}"
         print(formatted)
-        with open(self.progress_log, 'a', encoding='utf-8') as f:
-            f.write(f"{formatted}\n")
+        with self._log_lock:
+            with open(self.progress_log, 'a', encoding='utf-8') as f:
+                f.write(f"{formatted}\n")
     
     def _log_progress(self, message: str):
         """Log progress to file (for /progress endpoint)."""
-        with open(self.progress_log, 'a', encoding='utf-8') as f:
-            f.write(f"{message}\n")
+        with self._log_lock:
+            with open(self.progress_log, 'a', encoding='utf-8') as f:
+                f.write(f"{message}\n")
     
-    def _run_command(self, cmd: list, check=True, capture_output=False) -> Optional[subprocess.CompletedProcess]:
-        """Run shell command with error handling."""
+    def _run_command(self, cmd: list, check=True, capture_output=False, cwd: Optional[str] = None) -> Optional[subprocess.CompletedProcess]:
+        """Run shell command with error handling (in cwd, since steps share the process's directory)."""
         try:
             if capture_output:
-                result = subprocess.run(cmd, check=check, capture_output=True, text=True, encoding='utf-8')
+                result = subprocess.run(cmd, check=check, capture_output=True, text=True, encoding='utf-8', cwd=cwd)
                 return result
             else:
-                result = subprocess.run(cmd, check=check, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                result = subprocess.run(cmd, check=check, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, cwd=cwd)
                 return result
         except subprocess.CalledProcessError as e:
             print(f"[ERROR] Command failed: {' '.join(cmd)}")
@@ -197,11 +238,9 @@ class AutomationService:
                     f'cd /d {os.getcwd()}\\frontend && set PORT=9000 && npm start'
                 ], shell=True)
             else:
-                os.chdir('frontend')
                 env = os.environ.copy()
                 env['PORT'] = '9000'
-                subprocess.Popen(['npm', 'start'], env=env)
-                os.chdir('..')
+                subprocess.Popen(['npm', 'start'], env=env, cwd='frontend')
             time.sleep(1)
         except Exception as e:
             print(f"[ERROR] Failed to start React app: {e}")
@@ -311,8 +350,73 @@ class AutomationService:
         print("[OK] Virtual environment ready")
         self._log_progress("DONE:Creating virtual environment")
     
+    def _timed_command(self, label: str, cmd: list, **kwargs):
+        """Run a command (raising if it fails) and log how long it took."""
+        started = time.perf_counter()
+        try:
+            return self._run_command(cmd, **kwargs)
+        finally:
+            seconds = time.perf_counter() - started
+            self.install_details[label] = round(seconds, 1)
+            self._log(f"[TIMING] {label}: {seconds:.1f}s")
+    
+    def _wheelhouse_path(self, python_path: str, requirements: str = 'requirements.txt') -> str:
+        """
+        Wheelhouse directory for these requirements and the venv's Python.
+        
+        Wheels are specific to the Python version and platform, so both are
+        part of the key along with the hash of the requirements file.
+        
+        Returns:
+            str: Directory under WHEELHOUSE_DIR
+        """
+        with open(requirements, 'rb') as f:
+            requirements_hash = hashlib.sha256(f.read()).hexdigest()[:16]
+        result = self._run_command([
+            python_path, '-c',
+            'import sys, platform; print(f"py{sys.version_info[0]}{sys.version_info[1]}-{sys.platform}-{platform.machine()}")'
+        ], capture_output=True)
+        return os.path.join(WHEELHOUSE_DIR, f"{requirements_hash}-{result.stdout.strip()}")
+    
+    def _wheelhouse_state(self, marker: str) -> str:
+        """
+        Whether a wheelhouse can be installed from, given its .complete marker.
+        
+        Returns:
+            str: "hit", "miss" (never finished), "expired" (older than
+                 WHEELHOUSE_MAX_AGE_DAYS) or "refresh" (SETUP_REFRESH_WHEELS=1)
+        """
+        if not os.path.exists(marker):
+            return "miss"
+        if REFRESH_WHEELS:
+            return "refresh"
+        age_days = (time.time() - os.path.getmtime(marker)) / 86400
+        if WHEELHOUSE_MAX_AGE_DAYS > 0 and age_days > WHEELHOUSE_MAX_AGE_DAYS:
+            return "expired"
+        return "hit"
+    
+    def _install_from_wheelhouse(self, python_path: str, wheelhouse: str):
+        """Install requirements offline from a wheelhouse, with uv if it's available."""
+        uv_cmd = shutil.which('uv') if USE_UV else None
+        if uv_cmd:
+            cmd = [uv_cmd, 'pip', 'install', '--python', python_path]
+        else:
+            cmd = [python_path, '-m', 'pip', 'install', '--disable-pip-version-check']
+        cmd += ['--no-index', '--find-links', wheelhouse, '-r', 'requirements.txt']
+        self.install_details["installer"] = 'uv' if uv_cmd else 'pip'
+        self._timed_command("install from wheelhouse", cmd)
+    
     def install_dependencies(self):
-        """Install Python dependencies."""
+        """
+        Install Python dependencies from the wheelhouse cache.
+        
+        On a cache hit nothing is downloaded or built. On a miss the
+        wheelhouse is filled with `pip wheel` first (the slow part, once per
+        requirements.txt), then installed from. An expired or refreshed
+        wheelhouse is emptied and built again, so the requirement ranges
+        resolve to current releases. If that fails, falls back to a plain
+        `pip install -r requirements.txt`.
+        """
         self._log_progress("PROGRESS:Installing dependencies")
         print("-> Installing dependencies...")
         
@@ -324,15 +428,63 @@ class AutomationService:
             pip_path = os.path.join('venv', 'bin', 'pip')
             python_path = os.path.join('venv', 'bin', 'python')
         
-        # Upgrade pip
-        self._run_command([python_path, '-m', 'pip', 'install', '--upgrade', 'pip'])
-        
-        # Install requirements
-        self._run_command([pip_path, 'install', '-r', 'requirements.txt'])
+        try:
+            wheelhouse = self._wheelhouse_path(python_path)
+            marker = os.path.join(wheelhouse, '.complete')
+            state = self._wheelhouse_state(marker)
+            
+            if state == "hit":
+                self.install_details["wheelhouse"] = "hit"
+                self._log(f"[OK] Wheelhouse cache hit: {wheelhouse}")
+                try:
+                    self._install_from_wheelhouse(python_path, wheelhouse)
+                    print("[OK] Dependencies installed (offline)")
+                    self._log_progress("DONE:Installing dependencies")
+                    return
+                except (subprocess.CalledProcessError, FileNotFoundError):
+                    # A wheel went missing or is unusable; build the wheelhouse again
+                    os.remove(marker)
+                    state = "miss"
+            
+            self.install_details["wheelhouse"] = state
+            if state != "miss":
+                # Start empty, so no wheel pinned by the old build is picked again
+                self._log(f"-> Wheelhouse {state}, rebuilding from the index")
+                shutil.rmtree(wheelhouse)
+            self._log(f"-> Building wheelhouse: {wheelhouse}")
+            os.makedirs(wheelhouse, exist_ok=True)
+            self._timed_command("upgrade pip", [python_path, '-m', 'pip', 'install', '--upgrade', 'pip'])
+            self._timed_command("build wheelhouse", [
+                python_path, '-m', 'pip', 'wheel', '--disable-pip-version-check',
+                '-r', 'requirements.txt', '-w', wheelhouse
+            ])
+            self._install_from_wheelhouse(python_path, wheelhouse)
+            with open(marker, 'w', encoding='utf-8') as f:
+                f.write(time.strftime('%Y-%m-%d %H:%M:%S') + "\n")
+        except (subprocess.CalledProcessError, FileNotFoundError, OSError) as e:
+            self._log(f"[WARN] Wheelhouse install failed ({e}), installing from the index")
+            self.install_details["wheelhouse"] = "fallback"
+            self._timed_command("pip install", [pip_path, 'install', '-r', 'requirements.txt'])
         
         print("[OK] Dependencies installed")
         self._log_progress("DONE:Installing dependencies")
     
+    def _record_timings(self, scheduler: StepScheduler, success: bool):
+        """Append this run's step timings to the SETUP_TIMINGS_FILE history."""
+        entry = {
+            "timestamp": time.strftime('%Y-%m-%dT%H:%M:%S'),
+            "success": success,
+            "platform": platform.system(),
+            "steps": {name: round(seconds, 1) for name, seconds in scheduler.timings.items()},
+            "skipped": scheduler.skipped,
+            "install_dependencies": self.install_details
+        }
+        try:
+            with open(TIMINGS_FILE, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry) + "\n")
+        except OSError as e:
+            self._log(f"[WARN] Could not write {TIMINGS_FILE}: {e}")
+    
     def initialize_database(self):
         """Initialize SQLite database."""
         self._log_progress("PROGRESS:Initializing database")
@@ -380,10 +532,8 @@ class AutomationService:
                     f.write(html)
         
         # Build React app
-        os.chdir('frontend')
-        self._run_command(['npm', 'install'])
-        self._run_command(['npm', 'run', 'build'])
-        os.chdir('..')
+        self._run_command(['npm', 'install'], cwd='frontend')
+        self._run_command(['npm', 'run', 'build'], cwd='frontend')
         
         print("[OK] Welcome page built")
         self._log_progress("DONE:Building welcome page")
@@ -415,31 +565,22 @@ class AutomationService:
             print("[ERROR] GitHub CLI not found")
             return False
         
-        openai_key = self.config['api_keys']['openai_api_key']
-        anthropic_key = self.config['api_keys'].get('anthropic_api_key', '')
-        langsmith_key = self.config['api_keys'].get('langsmith_api_key', '')
-        
-        # Set OpenAI key
-        proc = subprocess.Popen([gh_cmd, 'secret', 'set', 'OPENAI_API_KEY'], 
-                               stdin=subprocess.PIPE, 
-                               stdout=subprocess.DEVNULL, 
-                               stderr=subprocess.DEVNULL)
-        proc.communicate(input=openai_key.encode())
-        
-        # Set optional keys
-        if anthropic_key:
-            proc = subprocess.Popen([gh_cmd, 'secret', 'set', 'ANTHROPIC_API_KEY'], 
-                                   stdin=subprocess.PIPE, 
-                                   stdout=subprocess.DEVNULL, 
-                                   stderr=subprocess.DEVNULL)
-            proc.communicate(input=anthropic_key.encode())
-        
-        if langsmith_key:
-            proc = subprocess.Popen([gh_cmd, 'secret', 'set', 'LANGSMITH_API_KEY'], 
-                                   stdin=subprocess.PIPE, 
-                                   stdout=subprocess.DEVNULL, 
-                                   stderr=subprocess.DEVNULL)
-            proc.communicate(input=langsmith_key.encode())
+        secrets = {
+            'OPENAI_API_KEY': self.config['api_keys']['openai_api_key'],
+            # Optional keys
+            'ANTHROPIC_API_KEY': self.config['api_keys'].get('anthropic_api_key', ''),
+            'LANGSMITH_API_KEY': self.config['api_keys'].get('langsmith_api_key', '')
+        }
+        
+        for name, value in secrets.items():
+            if not value:
+                continue
+            result = subprocess.run([gh_cmd, 'secret', 'set', name], input=value.encode(),
+                                    stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+            if result.returncode != 0:
+                # Raising fails the step, so the scheduler retries it
+                error = result.stderr.decode('utf-8', errors='replace').strip()
+                raise RuntimeError(f"gh secret set {name} failed: {error or f'exit code {result.returncode}'}")
         
         print("[OK] API key secrets set")
         self._log_progress("DONE:Setting API key secrets")
@@ -456,63 +597,99 @@ class AutomationService:
         self._run_command(['git', 'restore', '--staged', 'user_config.json'], check=False)
         
         # Add all files except user_config.json
-        self._run_command(['git', 'add', '.'], check=False)
+        self._run_command(['git', 'add', '.'])
         self._run_command(['git', 'reset', 'user_config.json'], check=False)
         
-        self._run_command(['git', 'commit', '-m', f'Initial Boot_Lang setup: {project_name}'], check=False)
-        self._run_command(['git', 'push', '-u', 'origin', 'main', '--force'], check=False)
+        # A retry after a failed push has nothing left to commit
+        staged = self._run_command(['git', 'diff', '--cached', '--quiet'], check=False)
+        if staged is None or staged.returncode != 0:
+            self._run_command(['git', 'commit', '-m', f'Initial Boot_Lang setup: {project_name}'])
+        # Failures raise, so the scheduler retries the step (and a resumed run repeats it)
+        self._run_command(['git', 'push', '-u', 'origin', 'main', '--force'])
         
         print("[OK] Pushed to GitHub")
         self._log_progress("DONE:Pushing to GitHub")
     
-    def run_automation(self) -> bool:
-        """Run full automation sequence (local/dev, no Azure)."""
+    def steps(self) -> List[Step]:
+        """
+        Setup steps and what each one needs to have finished first.
+        
+        Steps without a path between them run at the same time, e.g. the
+        venv and dependencies install while GitHub authentication waits for
+        the user and the frontend builds. commit_and_push waits for every
+        step that writes files it commits.
+        
+        Returns:
+            list: Steps in the order ready steps start
+        """
+        return [
+            Step("install_cli_tools", self.install_cli_tools),
+            Step("authenticate_github", self.authenticate_github, depends_on=["install_cli_tools"]),
+            Step("setup_git_remote", self.setup_git_remote),
+            Step("create_virtual_environment", self.create_virtual_environment),
+            Step("install_dependencies", self.install_dependencies,
+                 depends_on=["create_virtual_environment"], retries=2),
+            Step("initialize_database", self.initialize_database, depends_on=["install_dependencies"]),
+            Step("build_welcome_page", self.build_welcome_page, retries=1),
+            Step("secure_config_file", self.secure_config_file),
+            Step("set_api_key_secrets", self.set_api_key_secrets,
+                 depends_on=["authenticate_github", "setup_git_remote"], retries=2),
+            Step("commit_and_push", self.commit_and_push,
+                 depends_on=["set_api_key_secrets", "initialize_database", "build_welcome_page",
+                             "secure_config_file"], retries=2),
+            Step("start_helper_services", self.start_helper_services, depends_on=["commit_and_push"]),
+        ]
+    
+    def _run_key(self) -> str:
+        """Checkpoint key of this configuration; changing the config starts setup over."""
+        return hashlib.sha256(json.dumps(self.config, sort_keys=True).encode()).hexdigest()[:12]
+    
+    def _completed_steps(self) -> set:
+        """Steps an earlier, unfinished run with this configuration completed."""
+        if not os.path.exists(self.progress_log):
+            return set()
+        with open(self.progress_log, 'r', encoding='utf-8', errors='replace') as f:
+            return read_checkpoints(f, self._run_key())
+    
+    def run_automation(self, resume: bool = True) -> bool:
+        """
+        Run full automation (local/dev, no Azure), resuming an unfinished run.
+        
+        Args:
+            resume: Skip steps a failed run with the same config completed
+            
+        Returns:
+            bool: True if every step finished
+        """
         try:
-            # Initialize progress log
-            with open(self.progress_log, 'w', encoding='utf-8') as f:
-                f.write("Starting automation...\n")
+            completed = self._completed_steps() if resume else set()
+            
+            # Initialize progress log; a resumed run keeps the earlier checkpoints
+            with open(self.progress_log, 'a' if completed else 'w', encoding='utf-8') as f:
+                if completed:
+                    f.write(f"Resuming automation ({len(completed)} steps already done)...\n")
+                else:
+                    f.write(f"Starting automation... ({time.strftime('%Y-%m-%d %H:%M:%S')})\n")
+            self._log_progress(f"RUN:{self._run_key()}")
             print("")
             print("=" * 50)
             print("  Starting Automated Setup (Local Only)")
             print("=" * 50)
             print("")
-
-            # Step 0: Install CLI tools
-            if not self.install_cli_tools():
-                print("[ERROR] CLI tool installation failed")
-                return False
-
-            # Step 1: Authenticate GitHub
-            if not self.authenticate_github():
+            
+            scheduler = StepScheduler(self.steps(), max_workers=MAX_WORKERS,
+                                      record=self._log_progress, log=self._log)
+            success = scheduler.run(completed=completed)
+            
+            for name, seconds in sorted(scheduler.timings.items(), key=lambda item: -item[1]):
+                self._log(f"[TIMING] {name}: {seconds:.1f}s")
+            self._record_timings(scheduler, success)
+            
+            if not success:
+                self._log(f"[ERROR] Setup step '{scheduler.failed}' failed; run setup again to resume from it")
+                self._log_progress(f"ERROR:Setup step {scheduler.failed} failed")
                 return False
 
-            # Step 2: Setup git remote
-            self.setup_git_remote()
-
-            # Step 3: Create virtual environment
-            self.create_virtual_environment()
-
-            # Step 4: Install dependencies
-            self.install_dependencies()
-
-            # Step 5: Initialize database
-            self.initialize_database()
-
-            # Step 6: Build welcome page
-            self.build_welcome_page()
-
-            # Step 7: Secure config
-            self.secure_config_file()
-
-            # Step 8: Set API key secrets
-            self.set_api_key_secrets()
-
-            # Step 9: Commit and push
-            self.commit_and_push()
-
-            # Step 10: Start helper services (dashboard, admin panel)
-            self.start_helper_services()
-
             print("")
             print("=" * 50)
             print("  [OK] Local Setup Complete!")
@@ -532,10 +709,10 @@ class AutomationService:
             return False
 
 
-def run_automation(config_path: str = 'user_config.json') -> bool:
+def run_automation(config_path: str = 'user_config.json', resume: bool = True) -> bool:
     """Main entry point for automation."""
     service = AutomationService(config_path)
-    return service.run_automation()
+    return service.run_automation(resume=resume)
 
 
 if __name__ == '__main__':
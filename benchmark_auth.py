@@ -0,0 +1,137 @@
+"""
+Login Storm Benchmark
+
+Fires concurrent logins at the FastAPI app while a probe keeps calling a
+cheap authenticated endpoint (/api/auth/me), to show whether bcrypt work
+stalls other requests on the worker.
+
+Reports:
+- Login p50 / p95 / p99 latency and logins per second
+- Probe p50 / p95 / max latency during the storm (event loop stalls)
+- Whether a legacy low-cost hash was upgraded on login
+
+--inline runs bcrypt on the event loop, the way the endpoints did before
+password work moved to the bcrypt pool, for comparison.
+
+Usage:
+    python benchmark_auth.py
+    python benchmark_auth.py --logins 100 --concurrency 20 --rounds 12
+    python benchmark_auth.py --inline
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmark_poc import percentile, REPO_DIR
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark concurrent logins and event loop stalls")
+    parser.add_argument("--users", type=int, default=5, help="Accounts logging in")
+    parser.add_argument("--logins", type=int, default=40, help="Total login requests")
+    parser.add_argument("--concurrency", type=int, default=10, help="Logins in flight at once")
+    parser.add_argument("--rounds", type=int, default=12, help="BCRYPT_ROUNDS work factor")
+    parser.add_argument("--workers", type=int, help="PASSWORD_HASH_WORKERS (default: min(4, CPUs))")
+    parser.add_argument("--inline", action="store_true", help="Run bcrypt on the event loop (old behaviour)")
+    args = parser.parse_args()
+
+    os.environ["BCRYPT_ROUNDS"] = str(args.rounds)
+    if args.workers:
+        os.environ["PASSWORD_HASH_WORKERS"] = str(args.workers)
+    os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+    # Run in a scratch directory so the database stays out of the repo
+    sys.path.insert(0, REPO_DIR)
+    work_dir = tempfile.mkdtemp(prefix="auth_benchmark_")
+    os.chdir(work_dir)
+
+    import bcrypt
+    from fastapi.testclient import TestClient
+    import auth
+    import auth_utils
+    from app import app
+    from database import SessionLocal, User
+
+    if args.inline:
+        async def hash_inline(password):
+            return auth_utils.hash_password(password)
+
+        async def verify_inline(plain, hashed):
+            return auth_utils.verify_password(plain, hashed)
+
+        auth.hash_password_async = hash_inline
+        auth.verify_password_async = verify_inline
+
+    print(f"✓ Working directory {work_dir}")
+    print(f"✓ bcrypt rounds {args.rounds}, {'inline on the event loop' if args.inline else f'{auth_utils.PASSWORD_HASH_WORKERS} pool workers'}")
+
+    with TestClient(app) as client:
+        for i in range(args.users):
+            response = client.post("/api/auth/register", json={"username": f"storm{i}", "password": "storm1234"})
+            assert response.status_code == 201, response.text
+        probe_token = client.post("/api/auth/login", json={"username": "storm0", "password": "storm1234"}).json()["token"]
+        probe_headers = {"Authorization": f"Bearer {probe_token}"}
+
+        # Legacy account hashed with a lower work factor
+        db = SessionLocal()
+        legacy_hash = bcrypt.hashpw(b"legacy1234", bcrypt.gensalt(rounds=4)).decode()
+        db.add(User(username="legacy", password_hash=legacy_hash, is_admin=False))
+        db.commit()
+        db.close()
+
+        login_latencies = []
+        probe_latencies = []
+        errors = []
+        storming = threading.Event()
+        storming.set()
+
+        def probe():
+            while storming.is_set():
+                start = time.perf_counter()
+                client.get("/api/auth/me", headers=probe_headers)
+                probe_latencies.append(time.perf_counter() - start)
+                time.sleep(0.01)
+
+        def login(i):
+            start = time.perf_counter()
+            response = client.post("/api/auth/login", json={
+                "username": f"storm{i % args.users}", "password": "storm1234"
+            })
+            login_latencies.append(time.perf_counter() - start)
+            if response.status_code != 200:
+                errors.append(response.status_code)
+
+        prober = threading.Thread(target=probe)
+        prober.start()
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+            list(executor.map(login, range(args.logins)))
+        wall_time = time.perf_counter() - start
+        storming.clear()
+        prober.join()
+
+        response = client.post("/api/auth/login", json={"username": "legacy", "password": "legacy1234"})
+        db = SessionLocal()
+        upgraded_hash = db.query(User).filter(User.username == "legacy").first().password_hash
+        db.close()
+
+    print("\n" + "=" * 62)
+    print(f"{'':16}{'ops':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    print("-" * 62)
+    for name, samples in [("login", login_latencies), ("probe (/me)", probe_latencies)]:
+        print(f"{name:16}{len(samples):>6}"
+              f"{percentile(samples, 50) * 1000:>10.1f}{percentile(samples, 95) * 1000:>10.1f}"
+              f"{percentile(samples, 99) * 1000:>10.1f}{max(samples or [0]) * 1000:>10.1f}")
+    print("=" * 62)
+    print(f"Logins/s: {len(login_latencies) / wall_time:.1f}, errors: {len(errors)}")
+    print(f"Legacy hash upgraded on login: {upgraded_hash.split('$')[2]} rounds "
+          f"({'yes' if upgraded_hash != legacy_hash else 'no'})")
+
+
+if __name__ == "__main__":
+    main()
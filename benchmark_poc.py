@@ -0,0 +1,371 @@
+"""
+POC Agent Benchmark
+
+Drives scripted users through the FastAPI app (upload a spec and a
+wireframe, chat through the requirements conversation, generate a PRD)
+against the local mock OpenAI server, so runs cost nothing and are
+repeatable.
+
+Reports per phase:
+- p50 / p95 / p99 / mean latency
+- LLM calls and tokens per operation
+- Throughput (operations per second)
+
+Each run is saved to benchmark_results/ and compared with the previous run
+(or --baseline) to catch regressions.
+
+Usage:
+    python benchmark_poc.py
+    python benchmark_poc.py --users 5 --concurrency 5 --latency-ms 200
+    python benchmark_poc.py --baseline benchmark_results/poc_20250101_120000.json --fail-on-regression
+"""
+
+import argparse
+import glob
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import httpx
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = os.path.join(REPO_DIR, "benchmark_results")
+
+SPEC_TEXT = """Expense Tracker Spec
+
+Employees submit expenses with a receipt, amount, category and date.
+Managers approve or reject submitted expenses with a comment.
+Everyone sees a monthly summary grouped by category.
+Keep it simple: one currency, no integrations, email login only.
+"""
+
+CONVERSATION = [
+    "I want to build an expense tracker for my team",
+    "Employees submit expenses with receipts and managers approve them",
+    "Employees and their managers, about 30 people",
+    "Sounds good",
+    "A dashboard, an add expense form and an approvals page",
+    "what's next?",
+    "Save expenses, approvals and a monthly summary per category",
+    "yes"
+]
+
+# Metrics compared against the baseline; higher is worse for all of them
+COMPARED_METRICS = ["p50_ms", "p95_ms", "p99_ms", "llm_calls_per_op", "tokens_per_op"]
+
+
+def percentile(samples: list, pct: float) -> float:
+    """Nearest-rank percentile of unsorted samples."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def git_commit() -> str:
+    """Current git commit hash, or 'unknown'."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=REPO_DIR, capture_output=True, text=True, timeout=5
+        ).stdout.strip() or "unknown"
+    except Exception:
+        return "unknown"
+
+
+class Phase:
+    """Latency samples and mock server counters for one benchmark phase."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.latencies = []
+        self.errors = 0
+        self.wall_time = 0.0
+        self.llm = {}
+
+    def summary(self) -> dict:
+        ops = len(self.latencies)
+        llm_calls = sum(
+            count for call_type, count in self.llm.get("by_type", {}).items()
+            if call_type != "embeddings"
+        )
+        return {
+            "operations": ops,
+            "errors": self.errors,
+            "p50_ms": round(percentile(self.latencies, 50) * 1000, 1),
+            "p95_ms": round(percentile(self.latencies, 95) * 1000, 1),
+            "p99_ms": round(percentile(self.latencies, 99) * 1000, 1),
+            "mean_ms": round(sum(self.latencies) / ops * 1000, 1) if ops else 0.0,
+            "throughput_per_sec": round(ops / self.wall_time, 2) if self.wall_time else 0.0,
+            "llm_calls_per_op": round(llm_calls / ops, 2) if ops else 0.0,
+            "embedding_calls_per_op": round(self.llm.get("by_type", {}).get("embeddings", 0) / ops, 2) if ops else 0.0,
+            "tokens_per_op": round(self.llm.get("total_tokens", 0) / ops, 1) if ops else 0.0,
+            "llm_calls_by_type": self.llm.get("by_type", {})
+        }
+
+
+class Benchmark:
+    """Runs the scripted scenario through a FastAPI TestClient."""
+
+    def __init__(self, client, mock_url: str, users: int, concurrency: int):
+        self.client = client
+        self.mock_root = mock_url.rsplit("/v1", 1)[0]
+        self.users = users
+        self.concurrency = concurrency
+        self.tokens = []
+        self.conversations = {}
+        self.phases = {}
+
+    def _mock_stats(self) -> dict:
+        return httpx.get(f"{self.mock_root}/stats").json()
+
+    def _reset_mock_stats(self):
+        httpx.post(f"{self.mock_root}/stats/reset")
+
+    def _timed(self, phase: Phase, method: str, url: str, **kwargs):
+        start = time.perf_counter()
+        response = self.client.request(method, url, **kwargs)
+        phase.latencies.append(time.perf_counter() - start)
+        if response.status_code >= 400:
+            phase.errors += 1
+            print(f"  ! {method} {url} -> {response.status_code}: {response.text[:200]}")
+        return response
+
+    def _run_phase(self, name: str, work):
+        """Run work(user_index, phase) for every user and collect counters."""
+        phase = Phase(name)
+        self._reset_mock_stats()
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            list(pool.map(lambda i: work(i, phase), range(self.users)))
+        phase.wall_time = time.perf_counter() - start
+        phase.llm = self._mock_stats()
+        self.phases[name] = phase
+        print(f"✓ {name}: {len(phase.latencies)} operations in {phase.wall_time:.2f}s")
+
+    def _headers(self, index: int) -> dict:
+        return {"Authorization": f"Bearer {self.tokens[index]}"}
+
+    def register_users(self):
+        run_id = datetime.now().strftime("%H%M%S")
+        for i in range(self.users):
+            response = self.client.post("/api/auth/register", json={
+                "username": f"bench_{run_id}_{i}",
+                "password": "benchmark-pass-1",
+                "email": f"bench_{run_id}_{i}@example.com"
+            })
+            response.raise_for_status()
+            self.tokens.append(response.json()["token"])
+
+    def upload(self, index: int, phase: Phase):
+        headers = self._headers(index)
+        self._timed(phase, "POST", "/api/poc/upload", headers=headers, files={
+            "file": ("spec.txt", SPEC_TEXT.encode(), "text/plain")
+        })
+        with open(os.path.join(REPO_DIR, "test_wireframe.png"), "rb") as f:
+            self._timed(phase, "POST", "/api/poc/upload", headers=headers, files={
+                "file": ("wireframe.png", f.read(), "image/png")
+            })
+
+    def chat(self, index: int, phase: Phase):
+        conversation_id = None
+        for prompt in CONVERSATION:
+            response = self._timed(phase, "POST", "/api/poc/chat", headers=self._headers(index), json={
+                "prompt": prompt,
+                "conversation_id": conversation_id
+            })
+            if response.status_code == 200:
+                conversation_id = response.json()["conversation_id"]
+        self.conversations[index] = conversation_id
+
+    def generate(self, index: int, phase: Phase):
+        self._timed(phase, "POST", "/api/poc/generate-prd", headers=self._headers(index), json={
+            "requirements": {},
+            "conversation_id": self.conversations.get(index)
+        })
+
+    def run(self) -> dict:
+        self.register_users()
+        start = time.perf_counter()
+        self._run_phase("upload", self.upload)
+        self._run_phase("chat_turn", self.chat)
+        self._run_phase("generate_prd", self.generate)
+        total_time = time.perf_counter() - start
+
+        # Which LLM call sites dominate a conversation
+        call_sites = []
+        if self.conversations.get(0):
+            response = self.client.get(
+                f"/api/poc/conversations/{self.conversations[0]}/llm-calls",
+                headers=self._headers(0)
+            )
+            if response.status_code == 200:
+                call_sites = response.json()["by_call_site"]
+
+        total_ops = sum(len(p.latencies) for p in self.phases.values())
+        return {
+            "phases": {name: phase.summary() for name, phase in self.phases.items()},
+            "call_sites": call_sites,
+            "total": {
+                "operations": total_ops,
+                "errors": sum(p.errors for p in self.phases.values()),
+                "wall_time_sec": round(total_time, 2),
+                "throughput_per_sec": round(total_ops / total_time, 2) if total_time else 0.0
+            }
+        }
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list:
+    """
+    Compare phase metrics with a baseline run.
+
+    Args:
+        current (dict): Results of this run
+        baseline (dict): Results of the baseline run
+        threshold (float): Allowed increase in percent before flagging
+
+    Returns:
+        list: Regression descriptions (empty if none)
+    """
+    regressions = []
+    print(f"\nComparison with {baseline.get('timestamp')} ({baseline.get('git_commit')}):")
+    for name, phase in current["phases"].items():
+        base_phase = baseline.get("phases", {}).get(name)
+        if not base_phase:
+            continue
+        for metric in COMPARED_METRICS:
+            before, after = base_phase.get(metric, 0), phase.get(metric, 0)
+            if not before:
+                continue
+            change = (after - before) / before * 100
+            flag = ""
+            if change > threshold:
+                flag = "  <-- REGRESSION"
+                regressions.append(f"{name}.{metric}: {before} -> {after} (+{change:.1f}%)")
+            print(f"  {name:<14} {metric:<18} {before:>10} -> {after:>10} ({change:+.1f}%){flag}")
+    return regressions
+
+
+def print_results(results: dict):
+    print("\n" + "=" * 78)
+    print(f"{'phase':<14}{'ops':>6}{'err':>5}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+          f"{'ops/s':>8}{'llm/op':>8}{'tok/op':>9}")
+    print("-" * 78)
+    for name, p in results["phases"].items():
+        print(f"{name:<14}{p['operations']:>6}{p['errors']:>5}{p['p50_ms']:>10}{p['p95_ms']:>10}"
+              f"{p['p99_ms']:>10}{p['throughput_per_sec']:>8}{p['llm_calls_per_op']:>8}{p['tokens_per_op']:>9}")
+    print("=" * 78)
+    if results.get("call_sites"):
+        print("LLM time by call site (first conversation):")
+        for site in results["call_sites"]:
+            print(f"  {site['call_site']:<26}{site['calls']:>4} calls{site['latency_ms']:>10} ms"
+                  f"  {site['latency_share'] * 100:>5.1f}%")
+    clients = results.get("llm_clients", {})
+    print(f"LLM requests: {clients.get('requests', 0)}, "
+          f"connections opened: {clients.get('connections_opened', 0)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the POC Agent API against a mock OpenAI server")
+    parser.add_argument("--users", type=int, default=3, help="Scripted users (one conversation each)")
+    parser.add_argument("--concurrency", type=int, default=1, help="Users running at the same time")
+    parser.add_argument("--latency-ms", type=float, default=50, help="Mock base latency per LLM request")
+    parser.add_argument("--tokens-per-sec", type=float, default=500, help="Mock completion token rate")
+    parser.add_argument("--vision-latency-ms", type=float, default=200, help="Mock extra latency for images")
+    parser.add_argument("--mock-url", help="Use an already running mock server (e.g. http://127.0.0.1:8089/v1)")
+    parser.add_argument("--baseline", help="Results file to compare with (default: latest in benchmark_results/)")
+    parser.add_argument("--threshold", type=float, default=15.0, help="Regression threshold in percent")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit with status 1 on regression")
+    parser.add_argument("--no-save", action="store_true", help="Don't store results")
+    args = parser.parse_args()
+
+    from mock_openai_server import MockOpenAIServer
+
+    mock = None
+    mock_url = args.mock_url
+    if not mock_url:
+        mock = MockOpenAIServer(
+            latency_ms=args.latency_ms,
+            tokens_per_sec=args.tokens_per_sec,
+            vision_latency_ms=args.vision_latency_ms
+        ).start()
+        mock_url = mock.base_url
+
+    # Point every LLM client at the mock before the app is imported
+    os.environ["OPENAI_BASE_URL"] = mock_url
+    os.environ["OPENAI_API_KEY"] = "sk-benchmark"
+    # Measure the pipeline, not the per-user quotas
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "0")
+    try:
+        import tiktoken
+        tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        # No cached tokenizer and no network: send raw text to the embeddings mock
+        os.environ["LLM_EMBEDDINGS_TOKENIZE"] = "0"
+
+    # Run in a scratch directory so the database, uploads and PRDs stay out of the repo
+    sys.path.insert(0, REPO_DIR)
+    work_dir = tempfile.mkdtemp(prefix="poc_benchmark_")
+    os.chdir(work_dir)
+
+    from fastapi.testclient import TestClient
+    from app import app
+    from agents.llm_clients import llm_metrics
+
+    print(f"✓ Mock OpenAI at {mock_url}")
+    print(f"✓ Working directory {work_dir}")
+
+    try:
+        with TestClient(app) as client:
+            benchmark = Benchmark(client, mock_url, args.users, args.concurrency)
+            results = benchmark.run()
+    finally:
+        if mock:
+            mock.stop()
+
+    results.update({
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "git_commit": git_commit(),
+        "config": {
+            "users": args.users,
+            "concurrency": args.concurrency,
+            "latency_ms": args.latency_ms,
+            "tokens_per_sec": args.tokens_per_sec,
+            "vision_latency_ms": args.vision_latency_ms,
+            "conversation_turns": len(CONVERSATION)
+        },
+        "llm_clients": llm_metrics.snapshot()
+    })
+    print_results(results)
+
+    baseline_path = args.baseline
+    if not baseline_path:
+        previous = sorted(glob.glob(os.path.join(RESULTS_DIR, "poc_*.json")))
+        baseline_path = previous[-1] if previous else None
+
+    regressions = []
+    if baseline_path:
+        with open(baseline_path) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+
+    if not args.no_save:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        path = os.path.join(RESULTS_DIR, f"poc_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+        with open(path, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n✓ Results saved to {os.path.relpath(path, REPO_DIR)}")
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) over {args.threshold}%")
+        if args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+"""
+Server-side conversation sessions for the POC Agent.
+
+This module keeps each POC chat conversation on the server, keyed by its
+conversation_id, so clients only send the conversation_id and the new prompt:
+- Hot in-process LRU cache of live sessions (memory objects are reused, never replayed)
+- SQLite fallback through the poc_conversations table on a cache miss
+- Versioned optimistic concurrency so concurrent turns can't overwrite each other
+"""
+
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from langchain.memory import ConversationBufferMemory
+from sqlalchemy.orm import Session, undefer
+
+from database import POCConversation
+
+# Maximum number of live sessions kept in memory per worker
+CONVERSATION_CACHE_SIZE = int(os.getenv("CONVERSATION_CACHE_SIZE", "256"))
+
+
+class ConversationNotFoundError(Exception):
+    """Raised when a conversation_id doesn't exist or belongs to another user."""
+
+
+class ConversationConflictError(Exception):
+    """Raised when a session was saved by another request since it was loaded."""
+
+
+class ConversationSession:
+    """
+    Live state of one POC Agent conversation.
+
+    Attributes:
+        conversation_id: Session identifier returned to the client
+        user_id: Owner of the conversation
+        stage: Current conversation stage
+        requirements: Requirements captured so far
+        message_count: Number of user turns processed
+        memory: LangChain memory holding the message history
+        version: Version of the stored row this session was loaded from
+    """
+
+    def __init__(
+        self,
+        conversation_id: str,
+        user_id: int,
+        stage: str = "greeting",
+        requirements: Optional[Dict[str, Any]] = None,
+        message_count: int = 0,
+        messages: Optional[List[Dict[str, str]]] = None,
+        version: int = 0
+    ):
+        self.conversation_id = conversation_id
+        self.user_id = user_id
+        self.stage = stage
+        self.requirements = requirements or {}
+        self.message_count = message_count
+        self.version = version
+        self.lock = threading.Lock()
+
+        # Rebuilt once on a cold load, then kept live in the cache
+        self.memory = ConversationBufferMemory(return_messages=True)
+        for msg in messages or []:
+            if msg["type"] == "human":
+                self.memory.chat_memory.add_user_message(msg["content"])
+            elif msg["type"] == "ai":
+                self.memory.chat_memory.add_ai_message(msg["content"])
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any], user_id: int, version: int) -> "ConversationSession":
+        """
+        Build a session from a saved conversation state.
+
+        Args:
+            state: Dict produced by POCAgent.save_conversation()
+            user_id: Owner of the conversation
+            version: Version of the stored row
+
+        Returns:
+            ConversationSession: Session with memory restored
+        """
+        return cls(
+            conversation_id=state.get("conversation_id"),
+            user_id=user_id,
+            stage=state.get("stage", "greeting"),
+            requirements=state.get("requirements", {}),
+            message_count=state.get("message_count", 0),
+            messages=state.get("memory", {}).get("messages", []),
+            version=version
+        )
+
+    def to_state(self) -> Dict[str, Any]:
+        """
+        Serialize the session in the same format as POCAgent.save_conversation().
+
+        Returns:
+            dict: Conversation state including memory, stage, requirements
+        """
+        return {
+            "conversation_id": self.conversation_id,
+            "stage": self.stage,
+            "requirements": self.requirements,
+            "message_count": self.message_count,
+            "memory": {
+                "messages": [
+                    {"type": msg.type, "content": msg.content}
+                    for msg in self.memory.chat_memory.messages
+                ]
+            },
+            "updated_at": datetime.now().isoformat()
+        }
+
+
+class ConversationStore:
+    """
+    Cache-first store of conversation sessions backed by poc_conversations.
+
+    Example:
+        session = conversation_store.get(db, conversation_id, user.id)
+        agent = get_poc_agent().for_session(session)
+        result = agent.process_request(prompt, user_id=str(user.id))
+        agent.update_session(session)
+        conversation_store.save(db, session)
+    """
+
+    def __init__(self, max_size: int = CONVERSATION_CACHE_SIZE):
+        self.max_size = max_size
+        self._cache: "OrderedDict[str, ConversationSession]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _cache_get(self, conversation_id: str) -> Optional[ConversationSession]:
+        with self._lock:
+            session = self._cache.get(conversation_id)
+            if session is not None:
+                self._cache.move_to_end(conversation_id)
+            return session
+
+    def _cache_put(self, session: ConversationSession):
+        with self._lock:
+            self._cache[session.conversation_id] = session
+            self._cache.move_to_end(session.conversation_id)
+            while len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+
+    def evict(self, conversation_id: str):
+        """Drop a session from the in-process cache."""
+        with self._lock:
+            self._cache.pop(conversation_id, None)
+
+    def create(self, db: Session, user_id: int) -> ConversationSession:
+        """
+        Start a new conversation and persist its empty row.
+
+        Args:
+            db: Database session
+            user_id: Owner of the conversation
+
+        Returns:
+            ConversationSession: New session at version 1
+        """
+        conversation_id = f"conv_{user_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+        session = ConversationSession(conversation_id=conversation_id, user_id=user_id, version=1)
+
+        db.add(POCConversation(
+            conversation_id=conversation_id,
+            user_id=user_id,
+            conversation_history=session.to_state(),
+            version=1,
+            updated_at=datetime.utcnow()
+        ))
+        db.commit()
+
+        self._cache_put(session)
+        return session
+
+    def get(self, db: Session, conversation_id: str, user_id: int) -> ConversationSession:
+        """
+        Get a conversation session, loading it from SQLite on a cache miss.
+
+        Args:
+            db: Database session
+            conversation_id: Conversation to load
+            user_id: Current user (must own the conversation)
+
+        Returns:
+            ConversationSession: Live session
+
+        Raises:
+            ConversationNotFoundError: If missing or owned by another user
+        """
+        session = self._cache_get(conversation_id)
+        if session is not None:
+            if session.user_id != user_id:
+                raise ConversationNotFoundError(conversation_id)
+            return session
+
+        row = db.query(POCConversation).options(
+            undefer(POCConversation.conversation_history)
+        ).filter(
+            POCConversation.conversation_id == conversation_id
+        ).first()
+
+        if row is None or row.user_id != user_id:
+            raise ConversationNotFoundError(conversation_id)
+
+        state = row.conversation_history or {}
+        state.setdefault("conversation_id", conversation_id)
+        session = ConversationSession.from_state(state, user_id=row.user_id, version=row.version or 0)
+
+        self._cache_put(session)
+        return session
+
+    def save(self, db: Session, session: ConversationSession) -> int:
+        """
+        Persist a session if nobody else saved it since it was loaded.
+
+        The row is only updated when its version still matches the session's,
+        then both are bumped. On a mismatch the stale cached copy is dropped so
+        the next request reloads the latest state.
+
+        Args:
+            db: Database session
+            session: Session to save
+
+        Returns:
+            int: New version number
+
+        Raises:
+            ConversationConflictError: If the stored version has moved on
+        """
+        new_version = session.version + 1
+
+        updated = db.query(POCConversation).filter(
+            POCConversation.conversation_id == session.conversation_id,
+            POCConversation.version == session.version
+        ).update(
+            {
+                POCConversation.conversation_history: session.to_state(),
+                POCConversation.version: new_version,
+                POCConversation.updated_at: datetime.utcnow()
+            },
+            synchronize_session=False
+        )
+
+        if updated == 0:
+            db.rollback()
+            self.evict(session.conversation_id)
+            raise ConversationConflictError(session.conversation_id)
+
+        db.commit()
+        session.version = new_version
+        return new_version
+
+
+# Process-wide store used by the POC API
+conversation_store = ConversationStore()
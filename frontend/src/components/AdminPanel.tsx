@@ -56,12 +56,19 @@ const AdminPanel: React.FC = () => {
     setLoading(true);
     setError('');
     try {
-      const response = await axios.get(`${API_URL}/api/admin/users`, {
-        headers: getAuthHeader(),
-      });
-      if (response.data.success) {
-        setUsers(response.data.users);
-      }
+      // The list is paginated; follow next_cursor until every page is loaded
+      const loaded: User[] = [];
+      let cursor: string | null = null;
+      do {
+        const response: any = await axios.get(`${API_URL}/api/admin/users`, {
+          headers: getAuthHeader(),
+          params: { limit: 200, cursor: cursor || undefined },
+        });
+        if (!response.data.success) break;
+        loaded.push(...response.data.users);
+        cursor = response.data.next_cursor;
+      } while (cursor);
+      setUsers(loaded);
     } catch (err: any) {
       setError(err.response?.data?.detail || 'Failed to load users');
     } finally {
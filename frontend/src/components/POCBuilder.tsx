@@ -67,7 +67,7 @@ const PRDBuilder: React.FC = () => {
       const response = await axios.get(`${API_URL}/api/poc/documents`, {
         headers: { Authorization: `Bearer ${token}` }
       });
-      setDocuments(response.data);
+      setDocuments(response.data.documents);
     } catch (error) {
       console.error('Failed to load documents:', error);
     }
@@ -76,7 +76,7 @@ const PRDBuilder: React.FC = () => {
   const loadPRDs = useCallback(async () => {
     try {
       const response = await axios.get(`${API_URL}/api/poc/list-prds`);
-      setPrds(response.data);
+      setPrds(response.data.prds);
     } catch (error) {
       console.error('Failed to load PRDs:', error);
     }
@@ -151,7 +151,8 @@ const PRDBuilder: React.FC = () => {
         const prdResponse = await axios.post(
           `${API_URL}/api/poc/generate-prd`,
           {
-            requirements: {} // Agent will extract from conversation
+            requirements: {}, // Agent will extract from conversation
+            conversation_id: conversationId
           },
           {
             headers: { Authorization: `Bearer ${token}` }
@@ -185,7 +186,7 @@ const PRDBuilder: React.FC = () => {
         `${API_URL}/api/poc/chat`,
         {
           prompt: userInput,
-          conversation_history: conversationId ? { conversation_id: conversationId } : null
+          conversation_id: conversationId
         },
         {
           headers: { Authorization: `Bearer ${token}` }
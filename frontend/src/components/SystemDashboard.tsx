@@ -31,8 +31,11 @@ interface SystemStatus {
 interface TableRecords {
   table_name: string;
   columns: string[];
+  keys: Array<string | number>;
   records: Array<Record<string, any>>;
   count: number;
+  truncated: Array<{ key: string | number; column: string; length: number }>;
+  next_cursor: string | null;
 }
 
 const SystemDashboard: React.FC = () => {
@@ -73,6 +76,49 @@ const SystemDashboard: React.FC = () => {
     }
   };
 
+  const loadMoreRecords = async () => {
+    if (!tableRecords?.next_cursor) return;
+    
+    try {
+      const response = await axios.get(`${API_URL}/api/system/table/${tableRecords.table_name}/records`, {
+        params: { cursor: tableRecords.next_cursor }
+      });
+      const page: TableRecords = response.data;
+      setTableRecords({
+        ...page,
+        keys: [...tableRecords.keys, ...page.keys],
+        records: [...tableRecords.records, ...page.records],
+        count: tableRecords.count + page.count,
+        truncated: [...tableRecords.truncated, ...page.truncated]
+      });
+    } catch (err: any) {
+      console.error('Error loading table records:', err);
+    }
+  };
+
+  const isTruncated = (key: string | number, column: string) =>
+    !!tableRecords?.truncated.some((cell) => cell.key === key && cell.column === column);
+
+  const loadFullCell = async (idx: number, column: string) => {
+    if (!tableRecords) return;
+    const key = tableRecords.keys[idx];
+    
+    try {
+      const response = await axios.get(`${API_URL}/api/system/table/${tableRecords.table_name}/cell`, {
+        params: { key, column }
+      });
+      const records = [...tableRecords.records];
+      records[idx] = { ...records[idx], [column]: response.data.value };
+      setTableRecords({
+        ...tableRecords,
+        records,
+        truncated: tableRecords.truncated.filter((cell) => !(cell.key === key && cell.column === column))
+      });
+    } catch (err: any) {
+      console.error('Error loading table cell:', err);
+    }
+  };
+
   useEffect(() => {
     loadStatus();
   }, []);
@@ -229,14 +275,22 @@ const SystemDashboard: React.FC = () => {
                 <div className="mt-4">
                   <div className="flex justify-between items-center mb-3">
                     <h3 className="text-sm font-semibold text-gray-700">
-                      {tableRecords.table_name} - {tableRecords.count} records
+                      {tableRecords.table_name} - {tableRecords.count}{tableRecords.next_cursor ? '+' : ''} records
                     </h3>
-                    <button
-                      onClick={() => setSelectedTable(null)}
-                      className="text-sm text-gray-500 hover:text-gray-700"
-                    >
-                      ✕ Close
-                    </button>
+                    <div className="flex gap-4">
+                      <a
+                        href={`${API_URL}/api/system/table/${tableRecords.table_name}/export`}
+                        className="text-sm text-gray-500 hover:text-gray-700"
+                      >
+                        ⬇ Export NDJSON
+                      </a>
+                      <button
+                        onClick={() => setSelectedTable(null)}
+                        className="text-sm text-gray-500 hover:text-gray-700"
+                      >
+                        ✕ Close
+                      </button>
+                    </div>
                   </div>
                   
                   {tableRecords.count === 0 ? (
@@ -269,6 +323,14 @@ const SystemDashboard: React.FC = () => {
                                   {record[column] !== null && record[column] !== undefined
                                     ? String(record[column])
                                     : '-'}
+                                  {isTruncated(tableRecords.keys[idx], column) && (
+                                    <button
+                                      onClick={() => loadFullCell(idx, column)}
+                                      className="ml-1 text-blue-600 hover:text-blue-800"
+                                    >
+                                      …
+                                    </button>
+                                  )}
                                 </td>
                               ))}
                             </tr>
@@ -277,6 +339,17 @@ const SystemDashboard: React.FC = () => {
                       </table>
                     </div>
                   )}
+                  
+                  {tableRecords.next_cursor && (
+                    <div className="text-center mt-3">
+                      <button
+                        onClick={loadMoreRecords}
+                        className="text-sm text-blue-600 hover:text-blue-800"
+                      >
+                        Load more
+                      </button>
+                    </div>
+                  )}
                 </div>
               )}
             </>
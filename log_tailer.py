@@ -0,0 +1,281 @@
+"""
+Incremental reader for setup_progress.log.
+
+The setup page polls /progress every 500ms while automation appends to the
+log. ProgressLogTailer keeps the parsed progress state and the byte offset
+it has read up to, so each poll only reads and parses the bytes appended
+since the last one; a poll with no new output is a single stat().
+
+The log is rewritten from scratch when automation starts, so the tailer
+also remembers the first bytes of the file and starts over when they (or
+the size) no longer match.
+
+Raw log text is served by position with read_log(), which /log_content and
+the /log_events SSE stream use to send only what a client hasn't seen. A
+position is "<run>:<offset>": the byte offset plus a hash of the log's first
+bytes, so each client finds out on its own that the log was rewritten since
+its last read (a new run starts with a timestamped line).
+
+Configuration (environment variables):
+    LOG_CHUNK_BYTES     Most log bytes returned per read (default 1048576)
+"""
+
+import hashlib
+import os
+import re
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+LOG_CHUNK_BYTES = int(os.getenv("LOG_CHUNK_BYTES", str(1024 * 1024)))
+
+# Bytes from the start of the file that identify it across rewrites
+HEAD_BYTES = 64
+
+# Device login prompts printed by `gh auth login` and `az login`
+DEVICE_CODE_PATTERNS = {
+    "github": (re.compile(r"First copy your one-time code:\s*([A-Z0-9-]+)"),
+               re.compile(r"Open this URL.*?:\s*(https://github\.com/login/device)")),
+    "azure": (re.compile(r"code\s+([A-Z0-9]+)\s+to authenticate", re.IGNORECASE),
+              re.compile(r"(https://microsoft\.com/devicelogin|https://aka\.ms/devicelogin)", re.IGNORECASE)),
+}
+
+
+def complete_utf8(data: bytes) -> bytes:
+    """
+    Drop a multi-byte UTF-8 character cut off at the end of data.
+
+    The dropped bytes are read again with the next chunk, so a client that
+    decodes each chunk on its own never sees a broken character.
+
+    Args:
+        data: Bytes read from the log
+
+    Returns:
+        bytes: data, without a trailing incomplete character
+    """
+    for back in range(1, min(4, len(data)) + 1):
+        byte = data[-back]
+        if byte & 0xC0 == 0x80:
+            continue  # continuation byte, keep looking for the lead byte
+        if byte < 0x80:
+            needed = 1
+        elif byte >> 5 == 0b110:
+            needed = 2
+        elif byte >> 4 == 0b1110:
+            needed = 3
+        else:
+            needed = 4
+        return data if needed <= back else data[:-back]
+    return data
+
+
+def parse_position(position: str) -> Tuple[Optional[str], int]:
+    """
+    Split a read_log() position into its run hash and byte offset.
+
+    A bare offset (no run hash) is accepted and only checked against the size.
+
+    Args:
+        position: "<run>:<offset>" or "<offset>"
+
+    Returns:
+        tuple: (run hash or None, offset); (None, 0) if it can't be parsed
+    """
+    run, _, offset = position.rpartition(":")
+    try:
+        return run or None, max(0, int(offset))
+    except ValueError:
+        return None, 0
+
+
+def _run_hash(head: bytes) -> str:
+    """Identify a log by its first bytes."""
+    return hashlib.sha1(head).hexdigest()[:12]
+
+
+class ProgressLogTailer:
+    """
+    Parsed progress state of a log file, updated from newly appended bytes.
+
+    Example:
+        progress_tailer.poll()             # parses new lines, if any
+        state = progress_tailer.progress()
+        data, position, reset = progress_tailer.read_log(position)
+    """
+
+    def __init__(self, path: str = "setup_progress.log"):
+        self.path = path
+        self._lock = threading.Lock()
+        self.stats = {"polls": 0, "bytes_parsed": 0, "resets": 0}
+        self._reset()
+
+    def _reset(self):
+        """Forget everything parsed so far."""
+        self._offset = 0
+        self._mtime = None
+        self._head = b""
+        self._partial = b""
+        self._progress: List[Dict[str, Any]] = []
+        self._complete_url = ""
+        self._error = ""
+        self._download_progress: Dict[str, int] = {}
+        self._device_codes: Dict[str, Dict[str, str]] = {}
+
+    def _rewritten(self, f, size: int) -> bool:
+        """Whether the file was truncated or replaced since the last poll."""
+        if size < self._offset:
+            return True
+        if not self._head:
+            return False
+        f.seek(0)
+        return f.read(len(self._head)) != self._head
+
+    def poll(self) -> bool:
+        """
+        Parse lines appended since the last poll.
+
+        Returns:
+            bool: True if the log exists
+        """
+        with self._lock:
+            self.stats["polls"] += 1
+            try:
+                stat = os.stat(self.path)
+            except OSError:
+                if self._offset:
+                    self._reset()
+                return False
+
+            size = stat.st_size
+            if size == self._offset and stat.st_mtime_ns == self._mtime and len(self._head) == min(size, HEAD_BYTES):
+                return True
+
+            with open(self.path, "rb") as f:
+                if self._rewritten(f, size):
+                    self._reset()
+                    self.stats["resets"] += 1
+                if len(self._head) < HEAD_BYTES:
+                    f.seek(0)
+                    self._head = f.read(HEAD_BYTES)
+                f.seek(self._offset)
+                data = f.read(size - self._offset)
+
+            self._offset += len(data)
+            self._mtime = stat.st_mtime_ns
+            self.stats["bytes_parsed"] += len(data)
+            *lines, self._partial = (self._partial + data).split(b"\n")
+            for line in lines:
+                self._parse_line(line.decode("utf-8", errors="replace").strip())
+            return True
+
+    def _parse_line(self, line: str):
+        """Apply one log line to the progress state."""
+        if line.startswith('PROGRESS:'):
+            task = line.replace('PROGRESS:', '')
+            # A retried or resumed step restarts its task instead of listing it twice
+            for p in self._progress:
+                if p["task"] == task and p["status"] != "done":
+                    p["progress"] = 0
+                    break
+            else:
+                self._progress.append({"task": task, "status": "running", "progress": 0})
+        elif line.startswith('RUN:'):
+            # A resumed run appends to the log; the failure that stopped the last one is over
+            self._error = ""
+            self._complete_url = ""
+        elif line.startswith('DONE:'):
+            task = line.replace('DONE:', '')
+            # Update matching task to done
+            for p in self._progress:
+                if p["task"] == task:
+                    p["status"] = "done"
+                    p["progress"] = 100
+                    break
+        elif line.startswith('DOWNLOAD_PROGRESS:'):
+            # Format: DOWNLOAD_PROGRESS:Tool Name:75
+            parts = line.replace('DOWNLOAD_PROGRESS:', '').split(':')
+            if len(parts) >= 2 and parts[1].strip().isdigit():
+                tool_name = parts[0]
+                percent = int(parts[1])
+                self._download_progress[tool_name] = percent
+                # Update progress for matching task
+                for p in self._progress:
+                    if tool_name in p["task"]:
+                        p["progress"] = percent
+                        break
+        elif line.startswith('COMPLETE:'):
+            self._complete_url = line.replace('COMPLETE:', '')
+        elif line.startswith('ERROR:'):
+            self._error = line.replace('ERROR:', '')
+
+        for service, (code_pattern, url_pattern) in DEVICE_CODE_PATTERNS.items():
+            found = self._device_codes.setdefault(service, {})
+            for key, pattern in (("code", code_pattern), ("url", url_pattern)):
+                if key not in found:
+                    match = pattern.search(line)
+                    if match:
+                        found[key] = match.group(1)
+
+    def progress(self) -> Dict[str, Any]:
+        """
+        Current progress state (call poll() first to pick up new lines).
+
+        Returns:
+            dict: progress (tasks), complete, url, error, device_codes
+                  (service -> {"code", "url"} once both have been printed)
+        """
+        with self._lock:
+            return {
+                "progress": [dict(p) for p in self._progress],
+                "complete": bool(self._complete_url),
+                "url": self._complete_url,
+                "error": self._error,
+                "device_codes": {
+                    service: dict(found) for service, found in self._device_codes.items()
+                    if "code" in found and "url" in found
+                }
+            }
+
+    def read_log(self, position: str = "0", limit: int = LOG_CHUNK_BYTES) -> Tuple[Optional[bytes], str, bool]:
+        """
+        Read raw log bytes from a position a client got from a previous read.
+
+        The log counts as rewritten (and reading restarts at 0) when the
+        offset is past its end, or when its first bytes no longer hash to the
+        position's run. Positions carry their own run hash, so every client
+        detects a rewrite, however many read the same log.
+
+        A trailing \r is held back with an incomplete character, so a \r\n
+        split across reads arrives together.
+
+        Args:
+            position: Position returned by the previous read ("0" to start)
+            limit: Most bytes to return
+
+        Returns:
+            tuple: (bytes or None if there's no log, next position, reset) where
+                   reset means the log was rewritten and reading restarted at 0
+        """
+        run, offset = parse_position(position)
+        try:
+            with open(self.path, "rb") as f:
+                size = os.fstat(f.fileno()).st_size
+                reset = offset > size
+                if not reset and offset and run is not None:
+                    reset = _run_hash(f.read(min(offset, HEAD_BYTES))) != run
+                if reset:
+                    offset = 0
+                f.seek(offset)
+                data = complete_utf8(f.read(min(limit, size - offset)))
+                if data.endswith(b"\r"):
+                    data = data[:-1]
+                next_offset = offset + len(data)
+                f.seek(0)
+                head = f.read(min(next_offset, HEAD_BYTES))
+        except OSError:
+            return None, "0", offset > 0
+        return data, f"{_run_hash(head)}:{next_offset}", reset
+
+
+# Global tailer used by setup_server
+progress_tailer = ProgressLogTailer()
@@ -0,0 +1,447 @@
+"""
+Versioned schema migrations for Boot_Lang.
+
+create_all only creates missing tables, so changes to existing tables never
+reach a database that was created earlier. Each migration below runs once per
+database, in version order, inside its own transaction, and is recorded in
+the schema_migrations table.
+
+Every migration carries its own explicit DDL, frozen as of its version: the
+tables, columns, indexes and foreign keys it names never follow later model
+changes, so replaying the history always builds the same schema. Nothing here
+derives DDL from the current models.
+
+init_db() runs the migrations before create_all, so the core tables of a new
+database are built by the migrations too; create_all then only adds tables no
+migration knows about (tenant POC models). schema_drift() lists anything the
+models declare that the migrated database lacks, which is what a forgotten
+migration looks like.
+
+Adding a migration:
+    1. Change the model in database.py
+    2. Write a function issuing the DDL for that change (spelled out, not
+       derived from the model) and append Migration(<next version>,
+       "<name>", <function>) to MIGRATIONS; the function receives the
+       Connection of the migration's transaction
+
+Usage:
+    python migrations.py            # Apply pending migrations
+    python migrations.py --status   # Show applied and pending migrations
+"""
+
+import argparse
+from datetime import datetime
+from typing import Callable, List
+
+from sqlalchemy import (
+    JSON, Boolean, Column, DateTime, ForeignKey, Index, Integer, MetaData,
+    String, Table, Text, inspect, select
+)
+from sqlalchemy.schema import CreateTable
+
+from database import Base, DB_COMPRESS_JSON
+
+# Applied migrations, one row per version
+SCHEMA_MIGRATIONS = Table(
+    "schema_migrations", MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("name", String(100), nullable=False),
+    Column("applied_at", DateTime, nullable=False)
+)
+
+# Foreign keys added by migration 3: (table, column, parent table, ON DELETE).
+# Parents come first, so orphans cascade down (pocs, then poc_phases).
+FOREIGN_KEYS_V3 = [
+    ("documents", "user_id", "users", "CASCADE"),
+    ("pocs", "user_id", "users", "CASCADE"),
+    ("poc_conversations", "poc_id", "pocs", "SET NULL"),
+    ("poc_conversations", "user_id", "users", "CASCADE"),
+    ("poc_phases", "poc_id", "pocs", "CASCADE"),
+]
+
+# Columns migration 5 stores as bytes
+BINARY_JSON_COLUMNS_V5 = [
+    ("pocs", "requirements"),
+    ("poc_conversations", "conversation_history"),
+    ("poc_conversations", "langchain_memory"),
+]
+
+
+class Migration:
+    """One schema change, applied once per database."""
+
+    def __init__(self, version: int, name: str, upgrade: Callable):
+        self.version = version
+        self.name = name
+        self.upgrade = upgrade
+
+
+def baseline_tables(foreign_keys: bool = False) -> MetaData:
+    """
+    The core tables as migration 1 defines them (frozen; never edit to follow the models).
+
+    Args:
+        foreign_keys: Include the foreign keys added by migration 3
+
+    Returns:
+        MetaData: users, documents, pocs, poc_conversations and poc_phases
+    """
+    metadata = MetaData()
+    fks = {(table, column): (parent, ondelete) for table, column, parent, ondelete in FOREIGN_KEYS_V3}
+
+    def fk(table, column):
+        if not foreign_keys:
+            return []
+        parent, ondelete = fks[(table, column)]
+        return [ForeignKey(f"{parent}.id", ondelete=ondelete)]
+
+    Table(
+        "users", metadata,
+        Column("id", Integer, primary_key=True, index=True, autoincrement=True),
+        Column("username", String(50), unique=True, nullable=False, index=True),
+        Column("email", String(100), nullable=True),
+        Column("password_hash", String(255), nullable=False),
+        Column("is_admin", Boolean, default=False, nullable=False),
+        Column("created_at", DateTime, nullable=False),
+        Column("updated_at", DateTime, nullable=False)
+    )
+    Table(
+        "documents", metadata,
+        Column("id", Integer, primary_key=True, index=True, autoincrement=True),
+        Column("user_id", Integer, *fk("documents", "user_id"), nullable=False, index=True),
+        Column("filename", String(255), nullable=False),
+        Column("file_path", String(500), nullable=False),
+        Column("content_text", Text, nullable=True),
+        Column("file_type", String(10), nullable=False),
+        Column("created_at", DateTime, nullable=False)
+    )
+    Table(
+        "pocs", metadata,
+        Column("id", Integer, primary_key=True, index=True, autoincrement=True),
+        Column("user_id", Integer, *fk("pocs", "user_id"), nullable=False, index=True),
+        Column("poc_id", String(100), nullable=False, index=True),
+        Column("poc_name", String(255), nullable=False),
+        Column("description", Text, nullable=True),
+        Column("requirements", JSON, nullable=True),
+        Column("directory", String(500), nullable=False),
+        Column("created_at", DateTime, nullable=False),
+        Index("idx_user_poc", "user_id", "poc_id")
+    )
+    Table(
+        "poc_conversations", metadata,
+        Column("id", Integer, primary_key=True, index=True, autoincrement=True),
+        Column("conversation_id", String(100), nullable=True, unique=True, index=True),
+        Column("poc_id", Integer, *fk("poc_conversations", "poc_id"), nullable=True, index=True),
+        Column("user_id", Integer, *fk("poc_conversations", "user_id"), nullable=False, index=True),
+        Column("conversation_history", JSON, nullable=True),
+        Column("langchain_memory", JSON, nullable=True),
+        Column("version", Integer, default=0, nullable=False),
+        Column("created_at", DateTime, nullable=False),
+        Column("updated_at", DateTime, nullable=True),
+        Index("idx_conversation_user_created", "user_id", "created_at")
+    )
+    Table(
+        "poc_phases", metadata,
+        Column("id", Integer, primary_key=True, index=True, autoincrement=True),
+        Column("poc_id", Integer, *fk("poc_phases", "poc_id"), nullable=False, index=True),
+        Column("phase_number", Integer, nullable=False),
+        Column("phase_name", String(50), nullable=False),
+        Column("instructions_file", String(500), nullable=False),
+        Column("status", String(20), default="pending", nullable=False),
+        Column("created_at", DateTime, nullable=False)
+    )
+    return metadata
+
+
+def create_baseline_schema(conn):
+    """
+    Migration 1: the core tables, plus the columns and indexes older databases lack.
+
+    Databases created before migrations existed may predate some baseline
+    columns (poc_conversations.conversation_id, version, updated_at); they are
+    added as nullable columns, or with their scalar default.
+    """
+    inspector = inspect(conn)
+
+    for table in baseline_tables().sorted_tables:
+        if not inspector.has_table(table.name):
+            conn.execute(CreateTable(table))
+            print(f"✓ Created table {table.name}")
+            continue
+
+        existing = {col["name"] for col in inspector.get_columns(table.name)}
+        added = []
+
+        for column in table.columns:
+            if column.name in existing:
+                continue
+
+            column_type = column.type.compile(dialect=conn.dialect)
+            ddl = f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"
+
+            default = column.default.arg if column.default is not None and column.default.is_scalar else None
+            if isinstance(default, bool):
+                ddl += f" DEFAULT {int(default)}"
+            elif isinstance(default, (int, float)):
+                ddl += f" DEFAULT {default}"
+            elif isinstance(default, str):
+                ddl += " DEFAULT '{}'".format(default.replace("'", "''"))
+
+            if not column.nullable and default is not None:
+                ddl += " NOT NULL"
+
+            conn.exec_driver_sql(ddl)
+            added.append(column.name)
+
+        if added:
+            print(f"✓ Added columns to {table.name}: {', '.join(added)}")
+
+    for table in baseline_tables().sorted_tables:
+        for index in table.indexes:
+            index.create(bind=conn, checkfirst=True)
+
+
+def add_hot_query_indexes(conn):
+    """Migration 2: documents by user, newest first, and users by email."""
+    conn.exec_driver_sql("CREATE INDEX IF NOT EXISTS idx_document_user_created ON documents (user_id, created_at)")
+    conn.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_users_email ON users (email)")
+
+
+def _remove_orphans(conn, table: str, column: str, parent: str, ondelete: str):
+    """
+    Apply a new foreign key's ON DELETE rule to rows whose parent is already gone.
+
+    Rows left behind by deletes made before the constraint existed would
+    otherwise violate it.
+    """
+    orphaned = f"{column} IS NOT NULL AND {column} NOT IN (SELECT id FROM {parent})"
+    if ondelete == "SET NULL":
+        result = conn.exec_driver_sql(f"UPDATE {table} SET {column} = NULL WHERE {orphaned}")
+        action = "cleared"
+    else:
+        result = conn.exec_driver_sql(f"DELETE FROM {table} WHERE {orphaned}")
+        action = "removed"
+
+    if result.rowcount:
+        print(f"✓ {table}: {action} {column} on {result.rowcount} rows without a {parent} row")
+
+
+def _rebuild_sqlite_table(conn, table: Table):
+    """
+    Recreate a SQLite table with a new definition, keeping its rows and indexes.
+
+    SQLite can't add constraints to an existing table, so the table is
+    renamed, created again from the given definition and refilled. The
+    indexes it had are dropped first and created again afterwards.
+    """
+    name = table.name
+    inspector = inspect(conn)
+    existing = {col["name"] for col in inspector.get_columns(name)}
+    columns = ", ".join(col.name for col in table.columns if col.name in existing)
+    indexes = inspector.get_indexes(name)
+
+    for index in indexes:
+        conn.exec_driver_sql(f'DROP INDEX {index["name"]}')
+    conn.exec_driver_sql(f'ALTER TABLE {name} RENAME TO _{name}_old')
+    conn.execute(CreateTable(table))
+    conn.exec_driver_sql(f'INSERT INTO {name} ({columns}) SELECT {columns} FROM _{name}_old')
+    conn.exec_driver_sql(f'DROP TABLE _{name}_old')
+
+    for index in indexes:
+        unique = "UNIQUE " if index["unique"] else ""
+        conn.exec_driver_sql(
+            f'CREATE {unique}INDEX {index["name"]} ON {name} ({", ".join(index["column_names"])})'
+        )
+
+
+def add_foreign_keys(conn):
+    """Migration 3: foreign keys to users and pocs (FOREIGN_KEYS_V3)."""
+    inspector = inspect(conn)
+    missing = [
+        (table, column, parent, ondelete) for table, column, parent, ondelete in FOREIGN_KEYS_V3
+        if not any(fk["constrained_columns"] == [column] and fk["referred_table"] == parent
+                   for fk in inspector.get_foreign_keys(table))
+    ]
+
+    for table, column, parent, ondelete in missing:
+        _remove_orphans(conn, table, column, parent, ondelete)
+
+    if conn.dialect.name == "sqlite":
+        tables = baseline_tables(foreign_keys=True)
+        for name in dict.fromkeys(table for table, *_ in missing):
+            _rebuild_sqlite_table(conn, tables.tables[name])
+    else:
+        for table, column, parent, ondelete in missing:
+            conn.exec_driver_sql(
+                f"ALTER TABLE {table} ADD CONSTRAINT {table}_{column}_fkey "
+                f"FOREIGN KEY ({column}) REFERENCES {parent} (id) ON DELETE {ondelete}"
+            )
+
+    for table, column, parent, _ in missing:
+        print(f"✓ Added foreign key {table}.{column} -> {parent}")
+
+
+def add_poc_list_index(conn):
+    """Migration 4: POCs by user, newest first (paginated POC lists)."""
+    conn.exec_driver_sql("CREATE INDEX IF NOT EXISTS idx_poc_user_created ON pocs (user_id, created_at)")
+
+
+def store_json_as_bytes(conn):
+    """
+    Migration 5: store the JSON state columns (BINARY_JSON_COLUMNS_V5) as bytes.
+
+    Only needed when DB_COMPRESS_JSON=1; otherwise CompressedJSON writes JSON
+    and the columns stay JSON. SQLite stores the bytes in the existing
+    columns as they are (old JSON text rows still decode), so only server
+    databases need the type changed. init_db() calls this again on every
+    start with compression on, so switching it on after migration 5 was
+    recorded still converts the columns (converted columns are skipped).
+    """
+    if conn.dialect.name != "postgresql" or not DB_COMPRESS_JSON:
+        return
+
+    inspector = inspect(conn)
+    for table, column in BINARY_JSON_COLUMNS_V5:
+        existing = {col["name"]: col["type"] for col in inspector.get_columns(table)}
+        if "BYTEA" not in str(existing[column]).upper():
+            conn.exec_driver_sql(
+                f"ALTER TABLE {table} ALTER COLUMN {column} "
+                f"TYPE BYTEA USING convert_to({column}::text, 'UTF8')"
+            )
+            print(f"✓ Converted {table}.{column} to BYTEA")
+
+
+# Every schema change, in order. Never renumber, remove or edit an applied migration.
+MIGRATIONS: List[Migration] = [
+    Migration(1, "add model columns missing from pre-migration tables", create_baseline_schema),
+    Migration(2, "indexes for hot queries (documents by user and date, users by email)", add_hot_query_indexes),
+    Migration(3, "foreign keys to users and pocs", add_foreign_keys),
+    Migration(4, "index for paginated POC lists (pocs by user and date)", add_poc_list_index),
+    Migration(5, "binary storage for compressible JSON columns", store_json_as_bytes),
+]
+
+
+def schema_drift(conn) -> List[str]:
+    """
+    What the models declare that the database lacks.
+
+    Only tables that exist are compared (create_all adds missing ones), so
+    anything listed here needs a migration.
+
+    Args:
+        conn: SQLAlchemy Connection
+
+    Returns:
+        list: One description per missing column, index or foreign key
+    """
+    inspector = inspect(conn)
+    drift = []
+
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        columns = {col["name"] for col in inspector.get_columns(table.name)}
+        indexes = {idx["name"] for idx in inspector.get_indexes(table.name)}
+        foreign_keys = {
+            (tuple(fk["constrained_columns"]), fk["referred_table"])
+            for fk in inspector.get_foreign_keys(table.name)
+        }
+
+        drift += [f"column {table.name}.{col.name}" for col in table.columns if col.name not in columns]
+        drift += [f"index {idx.name} on {table.name}" for idx in table.indexes if idx.name not in indexes]
+        drift += [
+            f"foreign key {table.name}.{fk.column_keys[0]} -> {fk.referred_table.name}"
+            for fk in table.foreign_key_constraints
+            if (tuple(fk.column_keys), fk.referred_table.name) not in foreign_keys
+        ]
+
+    return drift
+
+
+def applied_versions(conn) -> set:
+    """
+    Versions already applied to a database.
+
+    Args:
+        conn: SQLAlchemy Connection
+
+    Returns:
+        set: Applied version numbers (empty if migrations never ran)
+    """
+    if not inspect(conn).has_table(SCHEMA_MIGRATIONS.name):
+        return set()
+    return set(conn.execute(select(SCHEMA_MIGRATIONS.c.version)).scalars())
+
+
+def migrate(engine, target: int = None) -> List[int]:
+    """
+    Apply pending migrations, each in its own transaction.
+
+    On SQLite, foreign key enforcement is switched off while migrating (table
+    rebuilds would otherwise cascade) and the result is checked with
+    PRAGMA foreign_key_check before each migration commits.
+
+    Args:
+        engine: SQLAlchemy Engine (sync)
+        target: Last version to apply (default: all)
+
+    Returns:
+        list: Versions applied by this call
+
+    Example:
+        from database import engine
+        migrate(engine)
+    """
+    SCHEMA_MIGRATIONS.create(bind=engine, checkfirst=True)
+    is_sqlite = engine.dialect.name == "sqlite"
+    applied = []
+
+    with engine.connect() as conn:
+        done = applied_versions(conn)
+        conn.commit()
+        pending = [m for m in MIGRATIONS if m.version not in done and (target is None or m.version <= target)]
+        if not pending:
+            return applied
+
+        if is_sqlite:
+            conn.exec_driver_sql("PRAGMA foreign_keys=OFF")
+            conn.commit()
+        try:
+            for migration in pending:
+                with conn.begin():
+                    if is_sqlite:
+                        # pysqlite doesn't open a transaction for DDL on its own
+                        conn.exec_driver_sql("BEGIN")
+                    migration.upgrade(conn)
+                    if is_sqlite:
+                        violations = conn.exec_driver_sql("PRAGMA foreign_key_check").fetchall()
+                        if violations:
+                            raise RuntimeError(f"Migration {migration.version} left foreign key violations: {violations[:5]}")
+                    conn.execute(SCHEMA_MIGRATIONS.insert().values(
+                        version=migration.version, name=migration.name, applied_at=datetime.utcnow()
+                    ))
+                applied.append(migration.version)
+                print(f"✓ Applied migration {migration.version}: {migration.name}")
+        finally:
+            if is_sqlite:
+                conn.exec_driver_sql("PRAGMA foreign_keys=ON")
+                conn.commit()
+
+    return applied
+
+
+if __name__ == "__main__":
+    from database import engine
+
+    parser = argparse.ArgumentParser(description="Apply Boot_Lang schema migrations")
+    parser.add_argument("--status", action="store_true", help="Show applied and pending migrations")
+    args = parser.parse_args()
+
+    if args.status:
+        with engine.connect() as conn:
+            done = applied_versions(conn)
+        for migration in MIGRATIONS:
+            print(f"{'applied' if migration.version in done else 'pending':8} {migration.version:>3}  {migration.name}")
+    else:
+        applied = migrate(engine)
+        print(f"✓ {len(applied)} migrations applied" if applied else "✓ Database is up to date")
@@ -0,0 +1,397 @@
+"""
+Mock OpenAI Server
+
+Deterministic local stand-in for the OpenAI chat completions, vision and
+embeddings endpoints, for benchmarking the POC Agent without API costs.
+Point the backend at it with OPENAI_BASE_URL=http://127.0.0.1:8089/v1.
+
+Latency is simulated as a fixed base plus completion tokens divided by a
+token rate. Responses depend only on the request, so repeated runs produce
+the same conversations, documents and token counts.
+
+Endpoints:
+- POST /v1/chat/completions   Chat and vision (image_url content) requests
+- POST /v1/embeddings         Deterministic unit vectors per input
+- GET  /v1/models             Model list
+- GET  /stats                 Request and token counters
+- POST /stats/reset           Clear counters
+
+Usage:
+    python mock_openai_server.py --port 8089 --latency-ms 200 --tokens-per-sec 80
+"""
+
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import argparse
+import base64
+import hashlib
+import json
+import random
+import struct
+import threading
+import time
+
+# Canned structured replies, matched against the last prompt message
+REQUIREMENTS_JSON = {
+    "goal": "Track team expenses and approvals",
+    "users": "Employees submitting expenses and managers approving them",
+    "workflow": "Employees add an expense with a receipt. Managers approve or reject it. Everyone sees a monthly summary.",
+    "frontend": {"pages": ["Dashboard", "Add Expense", "Approvals"], "layout": "Sidebar navigation"},
+    "backend": {"operations": ["create expense", "approve expense", "monthly summary"]},
+    "database": {"entities": ["expenses", "approvals"], "relationships": "approval belongs to expense"},
+    "integrations": [],
+    "constraints": ["Single currency"]
+}
+
+CONTRADICTIONS_JSON = {
+    "has_contradictions": False,
+    "contradictions": [],
+    "clarifying_questions": []
+}
+
+SIMPLIFICATION_JSON = {
+    "needs_simplification": False,
+    "complexity_score": 0.3,
+    "suggestions": []
+}
+
+WIREFRAME_JSON = {
+    "layout": "Header with navigation, main content area with a table",
+    "components": ["header", "navigation", "table", "button", "form"],
+    "styling": "Light theme, blue accents",
+    "description": "Dashboard listing records with an add button"
+}
+
+CHAT_REPLIES = [
+    "Got it. Who will be using this application day to day?",
+    "Thanks! What is the single most important thing a user should be able to do?",
+    "Makes sense. What pages or screens do you picture for the first version?",
+    "Great. What data needs to be saved, and does anything need approval?",
+    "Understood. Are there any systems this needs to connect to?",
+    "Perfect. Anything else that must be in the first version?"
+]
+
+MARKDOWN_SECTION = (
+    "## {title}\n\n"
+    "This section describes the {title_lower} for the proof of concept. "
+    "It keeps the scope small, lists the concrete steps to build it and "
+    "names the files that change, so it can be implemented in one pass.\n\n"
+    "- Step one: define the data shown on the main page\n"
+    "- Step two: add the API endpoint that returns it\n"
+    "- Step three: connect the page to the endpoint and handle errors\n\n"
+)
+
+
+def _estimate_tokens(text: str) -> int:
+    """Rough OpenAI token estimate (4 characters per token)."""
+    return max(1, len(text) // 4)
+
+
+def _markdown(title: str, sections: list) -> str:
+    body = "".join(
+        MARKDOWN_SECTION.format(title=s, title_lower=s.lower()) for s in sections
+    )
+    return f"# {title}\n\n{body}"
+
+
+def _message_text(message: dict) -> str:
+    """Flatten a chat message's content (string or content parts) to text."""
+    content = message.get("content") or ""
+    if isinstance(content, str):
+        return content
+    return "\n".join(part.get("text", "") for part in content if part.get("type") == "text")
+
+
+def _has_image(messages: list) -> bool:
+    for message in messages:
+        content = message.get("content")
+        if isinstance(content, list) and any(p.get("type") == "image_url" for p in content):
+            return True
+    return False
+
+
+def build_completion(messages: list) -> tuple:
+    """
+    Pick a deterministic reply for a chat request.
+
+    Args:
+        messages (list): OpenAI chat messages
+
+    Returns:
+        tuple: (call_type, reply_text)
+    """
+    if _has_image(messages):
+        return "vision", json.dumps(WIREFRAME_JSON)
+
+    prompt = _message_text(messages[-1]).lower() if messages else ""
+
+    if "could not be parsed as the required json" in prompt:
+        return "json_repair", "{}"
+    if "extract the requirements" in prompt:
+        return "requirements_extraction", json.dumps(REQUIREMENTS_JSON)
+    if "contradictions or conflicts" in prompt:
+        return "contradiction_detection", json.dumps(CONTRADICTIONS_JSON)
+    if "analyze these poc requirements for complexity" in prompt:
+        return "simplification", json.dumps(SIMPLIFICATION_JSON)
+    if "generate only the name" in prompt:
+        return "poc_naming", "expense_approval_tracker"
+    if "product requirements document" in prompt:
+        return "prd_content", _markdown(
+            "Product Requirements Document",
+            ["Overview", "Goals", "User Stories", "Frontend", "Backend", "Database", "Testing"]
+        )
+    if "poc description document" in prompt:
+        return "poc_description", _markdown(
+            "POC Description", ["Purpose", "Users", "Key Features", "Success Criteria"]
+        )
+    if "fill in this implementation template" in prompt:
+        return "phase_document", _markdown(
+            "Phase Implementation", ["Objective", "Tasks", "Files", "Verification"]
+        )
+
+    # Conversation turn: reply chosen by the number of user turns so far
+    user_turns = sum(1 for m in messages if m.get("role") == "user")
+    return "chat", CHAT_REPLIES[(user_turns - 1) % len(CHAT_REPLIES)]
+
+
+def build_embedding(value, dimensions: int) -> list:
+    """
+    Deterministic unit vector for an input string or token list.
+
+    Args:
+        value: Input text or list of token ids
+        dimensions (int): Vector size
+
+    Returns:
+        list: Normalized floats
+    """
+    seed = hashlib.sha256(json.dumps(value).encode()).hexdigest()
+    rng = random.Random(seed)
+    vector = [rng.uniform(-1.0, 1.0) for _ in range(dimensions)]
+    norm = sum(v * v for v in vector) ** 0.5
+    return [v / norm for v in vector]
+
+
+class MockStats:
+    """Thread-safe request and token counters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests = 0
+            self.prompt_tokens = 0
+            self.completion_tokens = 0
+            self.by_type = {}
+
+    def record(self, call_type: str, prompt_tokens: int, completion_tokens: int):
+        with self._lock:
+            self.requests += 1
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+            self.by_type[call_type] = self.by_type.get(call_type, 0) + 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "prompt_tokens": self.prompt_tokens,
+                "completion_tokens": self.completion_tokens,
+                "total_tokens": self.prompt_tokens + self.completion_tokens,
+                "by_type": dict(self.by_type)
+            }
+
+
+class MockOpenAIHandler(BaseHTTPRequestHandler):
+    """Handle OpenAI-compatible API requests."""
+
+    protocol_version = "HTTP/1.1"  # Keep-alive, like the real API
+
+    def do_GET(self):
+        if self.path.rstrip('/') == '/stats':
+            self._send_json(200, self.server.stats.snapshot())
+        elif self.path.rstrip('/') == '/v1/models':
+            self._send_json(200, {
+                "object": "list",
+                "data": [
+                    {"id": m, "object": "model", "owned_by": "mock"}
+                    for m in ("gpt-3.5-turbo", "gpt-4o-mini", "gpt-4o", "text-embedding-ada-002")
+                ]
+            })
+        else:
+            self._send_json(404, {"error": {"message": "Not found", "type": "invalid_request_error"}})
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        path = self.path.rstrip('/')
+
+        if path == '/stats/reset':
+            self.server.stats.reset()
+            self._send_json(200, {"success": True})
+        elif path == '/v1/chat/completions':
+            self._send_json(200, self.chat_completion(body))
+        elif path == '/v1/embeddings':
+            self._send_json(200, self.embeddings(body))
+        else:
+            self._send_json(404, {"error": {"message": "Not found", "type": "invalid_request_error"}})
+
+    def chat_completion(self, body: dict) -> dict:
+        """Build a chat completion after the simulated generation delay."""
+        config = self.server.config
+        messages = body.get("messages", [])
+        call_type, content = build_completion(messages)
+
+        prompt_tokens = sum(_estimate_tokens(_message_text(m)) for m in messages)
+        completion_tokens = _estimate_tokens(content)
+
+        delay = config["latency_ms"] / 1000 + completion_tokens / config["tokens_per_sec"]
+        if call_type == "vision":
+            delay += config["vision_latency_ms"] / 1000
+        time.sleep(delay)
+
+        self.server.stats.record(call_type, prompt_tokens, completion_tokens)
+        digest = hashlib.sha1(json.dumps(messages).encode()).hexdigest()[:24]
+
+        return {
+            "id": f"chatcmpl-mock{digest}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "gpt-3.5-turbo"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop"
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens
+            }
+        }
+
+    def embeddings(self, body: dict) -> dict:
+        """Build embeddings for every input after the simulated delay."""
+        config = self.server.config
+        inputs = body.get("input", [])
+        if not isinstance(inputs, list) or (inputs and isinstance(inputs[0], int)):
+            inputs = [inputs]
+
+        prompt_tokens = sum(
+            len(v) if isinstance(v, list) else _estimate_tokens(v) for v in inputs
+        )
+        time.sleep(config["latency_ms"] / 1000 + len(inputs) * config["embedding_ms_per_input"] / 1000)
+        self.server.stats.record("embeddings", prompt_tokens, 0)
+
+        data = []
+        for index, value in enumerate(inputs):
+            vector = build_embedding(value, config["embedding_dim"])
+            if body.get("encoding_format") == "base64":
+                vector = base64.b64encode(struct.pack(f"<{len(vector)}f", *vector)).decode()
+            data.append({"object": "embedding", "index": index, "embedding": vector})
+
+        return {
+            "object": "list",
+            "data": data,
+            "model": body.get("model", "text-embedding-ada-002"),
+            "usage": {"prompt_tokens": prompt_tokens, "total_tokens": prompt_tokens}
+        }
+
+    def _send_json(self, status: int, payload: dict):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.send_header('x-request-id', f"req_mock_{self.server.stats.requests}")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        """Suppress log messages."""
+        pass
+
+
+class MockOpenAIServer:
+    """
+    Mock OpenAI server that can run in a background thread.
+
+    Example:
+        server = MockOpenAIServer(latency_ms=50).start()
+        os.environ["OPENAI_BASE_URL"] = server.base_url
+        ...
+        server.stop()
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency_ms: float = 200,
+        tokens_per_sec: float = 80,
+        vision_latency_ms: float = 800,
+        embedding_ms_per_input: float = 2,
+        embedding_dim: int = 1536
+    ):
+        self.httpd = ThreadingHTTPServer((host, port), MockOpenAIHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.stats = MockStats()
+        self.httpd.config = {
+            "latency_ms": latency_ms,
+            "tokens_per_sec": tokens_per_sec,
+            "vision_latency_ms": vision_latency_ms,
+            "embedding_ms_per_input": embedding_ms_per_input,
+            "embedding_dim": embedding_dim
+        }
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    @property
+    def stats(self) -> MockStats:
+        return self.httpd.stats
+
+    def start(self) -> "MockOpenAIServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mock OpenAI server for benchmarks")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency-ms", type=float, default=200, help="Base latency per request")
+    parser.add_argument("--tokens-per-sec", type=float, default=80, help="Completion token rate")
+    parser.add_argument("--vision-latency-ms", type=float, default=800, help="Extra latency for image requests")
+    parser.add_argument("--embedding-dim", type=int, default=1536)
+    args = parser.parse_args()
+
+    server = MockOpenAIServer(
+        port=args.port,
+        latency_ms=args.latency_ms,
+        tokens_per_sec=args.tokens_per_sec,
+        vision_latency_ms=args.vision_latency_ms,
+        embedding_dim=args.embedding_dim
+    )
+
+    print("=" * 60)
+    print("[MOCK] Mock OpenAI Server")
+    print("=" * 60)
+    print(f"\nBase URL: {server.base_url}")
+    print(f"Set OPENAI_BASE_URL={server.base_url} to use it")
+    print("\nPress Ctrl+C to stop")
+    print("=" * 60)
+    print()
+
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        print("\n\n[OK] Mock server stopped")
+        server.httpd.server_close()
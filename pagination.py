@@ -0,0 +1,167 @@
+"""
+Keyset pagination and ETags for list endpoints.
+
+List endpoints return one page at a time, ordered by a sort column with the
+row id as tie-breaker. A page's next_cursor encodes the (sort value, id) of
+its last row; passing it back seeks straight past that row
+(WHERE (sort, id) < (:value, :id)) through the (user_id, sort) index instead
+of skipping OFFSET rows, so a page costs the same however large the table is.
+
+List responses carry a weak ETag of their body. A request whose
+If-None-Match matches gets 304 Not Modified without the body.
+
+Configuration (environment variables):
+    PAGE_SIZE_DEFAULT   Rows per page when no limit is given (default 50)
+    PAGE_SIZE_MAX       Largest limit a client may ask for (default 200)
+"""
+
+import base64
+import hashlib
+import json
+import os
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, Request, Response
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import DateTime, literal, tuple_
+
+DEFAULT_PAGE_SIZE = int(os.getenv("PAGE_SIZE_DEFAULT", "50"))
+MAX_PAGE_SIZE = int(os.getenv("PAGE_SIZE_MAX", "200"))
+
+
+def encode_cursor(sort_value: Any, row_id: Any) -> str:
+    """Encode the (sort value, id) of a page's last row as an opaque cursor."""
+    if isinstance(sort_value, datetime):
+        sort_value = sort_value.isoformat()
+    raw = json.dumps([sort_value, row_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, is_datetime: bool = False) -> Tuple[Any, Any]:
+    """
+    Decode a cursor from encode_cursor.
+
+    Args:
+        cursor: Opaque cursor string from a previous page
+        is_datetime: Parse the sort value back into a datetime
+
+    Returns:
+        tuple: (sort value, id)
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        sort_value, row_id = json.loads(raw)
+        if is_datetime:
+            sort_value = datetime.fromisoformat(sort_value)
+        return sort_value, row_id
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def parse_sort(sort: str, allowed: Dict[str, Any]) -> Tuple[str, Any, bool]:
+    """
+    Resolve a sort parameter such as "-created_at" (descending) or "filename".
+
+    Args:
+        sort: Field name, prefixed with "-" for descending order
+        allowed: Field name to column (or key, for in-memory lists)
+
+    Returns:
+        tuple: (field name, column, descending)
+
+    Raises:
+        HTTPException: 400 if the field can't be sorted on
+    """
+    descending = sort.startswith("-")
+    name = sort.lstrip("-")
+    if name not in allowed:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Cannot sort by '{name}'. Use one of: {', '.join(sorted(allowed))}"
+        )
+    return name, allowed[name], descending
+
+
+def keyset_page(stmt, sort_column, id_column, descending: bool, cursor: Optional[str], limit: int):
+    """
+    Order a select by (sort, id), seek past the cursor and fetch one extra row.
+
+    The extra row only tells page_rows whether there is a next page.
+
+    Args:
+        stmt: SQLAlchemy select with the endpoint's filters applied
+        sort_column: Column to sort on (non-null)
+        id_column: Primary key column, the tie-breaker
+        descending: Newest/largest first
+        cursor: next_cursor of the previous page, or None for the first page
+        limit: Page size
+
+    Returns:
+        Select: Statement for the page
+
+    Example:
+        stmt = keyset_page(select(Document.id, Document.created_at).where(...),
+                           Document.created_at, Document.id, True, cursor, 50)
+        rows, next_cursor = page_rows(db.execute(stmt).all(), 50, "created_at")
+    """
+    if cursor:
+        value, last_id = decode_cursor(cursor, isinstance(sort_column.type, DateTime))
+        if sort_column is id_column:
+            key, bound = id_column, last_id
+        else:
+            key = tuple_(sort_column, id_column)
+            bound = tuple_(literal(value, sort_column.type), literal(last_id, id_column.type))
+        stmt = stmt.where(key < bound if descending else key > bound)
+
+    if descending:
+        order = [sort_column.desc()] if sort_column is id_column else [sort_column.desc(), id_column.desc()]
+    else:
+        order = [sort_column.asc()] if sort_column is id_column else [sort_column.asc(), id_column.asc()]
+    return stmt.order_by(*order).limit(limit + 1)
+
+
+def page_rows(rows: List, limit: int, sort_name: str, id_name: str = "id") -> Tuple[List, Optional[str]]:
+    """
+    Split the rows of keyset_page into the page and the cursor of the next one.
+
+    Args:
+        rows: Rows (or dicts) fetched with limit + 1
+        limit: Page size
+        sort_name: Attribute/key holding the sort value
+        id_name: Attribute/key holding the id
+
+    Returns:
+        tuple: (page rows, next_cursor or None on the last page)
+    """
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    if isinstance(last, dict):
+        return rows, encode_cursor(last[sort_name], last[id_name])
+    return rows, encode_cursor(getattr(last, sort_name), getattr(last, id_name))
+
+
+def etag_response(request: Request, payload: Any) -> Response:
+    """
+    Serialize a JSON payload with a weak ETag, or answer 304 if the client has it.
+
+    Args:
+        request: Incoming request (If-None-Match is read from it)
+        payload: JSON-serializable response body
+
+    Returns:
+        Response: 200 with body and ETag, or 304 Not Modified
+    """
+    body = json.dumps(jsonable_encoder(payload), separators=(",", ":"))
+    etag = 'W/"' + hashlib.sha256(body.encode()).hexdigest()[:32] + '"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -5,9 +5,12 @@ This module provides FastAPI endpoints for interacting with the POC Agent,
 including document uploads, chat conversations, and POC generation.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query, Request
 from fastapi.responses import FileResponse
-from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.orm import Session, undefer
+from contextlib import contextmanager
 from typing import List, Optional
 from pydantic import BaseModel
 import os
@@ -17,6 +20,10 @@ from datetime import datetime
 from database import get_db, Document, POC, POCConversation, POCPhase
 from agents.poc_agent import POCAgent
 from auth import get_current_user, User
+from conversation_store import conversation_store, ConversationNotFoundError, ConversationConflictError
+from agents.llm_tracing import set_conversation, trace_store, summarize_calls
+from rate_limiter import rate_limiter, RateLimitExceeded
+from pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, parse_sort, keyset_page, page_rows, decode_cursor, etag_response
 
 router = APIRouter(prefix="/api/poc", tags=["poc"])
 
@@ -24,7 +31,9 @@ router = APIRouter(prefix="/api/poc", tags=["poc"])
 
 class ChatRequest(BaseModel):
     prompt: str
+    conversation_id: Optional[str] = None
     document_ids: Optional[List[int]] = None
+    # Deprecated: only its conversation_id is read, the state is held server-side
     conversation_history: Optional[dict] = None
 
 class ChatResponse(BaseModel):
@@ -32,9 +41,11 @@ class ChatResponse(BaseModel):
     conversation_id: str
     agent_state: dict
     next_action: str
+    version: int
 
 class GenerateRequest(BaseModel):
     requirements: dict
+    conversation_id: Optional[str] = None
 
 class POCResponse(BaseModel):
     poc_id: str
@@ -53,6 +64,25 @@ def get_poc_agent():
     return _poc_agent
 
 
+@contextmanager
+def admit_llm_request(user: User, endpoint: str, text: str = ""):
+    """
+    Admit an LLM-backed request through the rate limiter.
+    
+    Raises 429 when the user is over quota and 503 when the server is at its
+    global LLM limit, both with a Retry-After header.
+    """
+    try:
+        with rate_limiter.admit(user.id, endpoint, text):
+            yield
+    except RateLimitExceeded as e:
+        raise HTTPException(
+            status_code=429 if e.scope == "user" else 503,
+            detail=e.reason,
+            headers={"Retry-After": str(e.retry_after)}
+        )
+
+
 @router.post("/upload")
 async def upload_document(
     file: UploadFile = File(...),
@@ -86,15 +116,21 @@ async def upload_document(
     with open(file_path, "wb") as buffer:
         shutil.copyfileobj(file.file, buffer)
     
-    # Load and process document
+    def process_document():
+        with admit_llm_request(current_user, "upload"):
+            agent = get_poc_agent()
+            docs = agent.load_document(file_path, file_ext)
+            agent.create_vector_store(docs, str(current_user.id))
+            return "\n".join([doc.page_content for doc in docs])
+    
+    # Load and process document (in a worker thread, so admission queueing
+    # and embedding calls don't block the event loop)
     try:
-        agent = get_poc_agent()
-        docs = agent.load_document(file_path, file_ext)
-        agent.create_vector_store(docs, str(current_user.id))
-        
-        # Extract content for database
-        content_text = "\n".join([doc.page_content for doc in docs])
+        content_text = await run_in_threadpool(process_document)
         
+    except HTTPException:
+        os.remove(file_path)
+        raise
     except Exception as e:
         # Clean up file if processing fails
         os.remove(file_path)
@@ -122,21 +158,50 @@ async def upload_document(
 
 @router.get("/documents")
 def list_documents(
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    sort: str = "-created_at",
+    file_type: Optional[str] = None,
+    q: Optional[str] = Query(None, description="Filename contains"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """List all documents uploaded by current user."""
-    documents = db.query(Document).filter(Document.user_id == current_user.id).all()
-    
-    return [
-        {
-            "id": doc.id,
-            "filename": doc.filename,
-            "file_type": doc.file_type,
-            "created_at": doc.created_at
-        }
-        for doc in documents
-    ]
+    """
+    List the current user's documents, one page at a time (newest first by default).
+    
+    Only list columns are read, never content_text. Pass next_cursor back as
+    cursor for the following page.
+    """
+    sort_name, sort_column, descending = parse_sort(sort, {
+        "created_at": Document.created_at,
+        "filename": Document.filename,
+        "id": Document.id
+    })
+    
+    stmt = select(Document.id, Document.filename, Document.file_type, Document.created_at).where(
+        Document.user_id == current_user.id
+    )
+    if file_type:
+        stmt = stmt.where(Document.file_type == file_type.lower())
+    if q:
+        stmt = stmt.where(Document.filename.contains(q, autoescape=True))
+    
+    rows = db.execute(keyset_page(stmt, sort_column, Document.id, descending, cursor, limit)).all()
+    rows, next_cursor = page_rows(rows, limit, sort_name)
+    
+    return etag_response(request, {
+        "documents": [
+            {
+                "id": row.id,
+                "filename": row.filename,
+                "file_type": row.file_type,
+                "created_at": row.created_at
+            }
+            for row in rows
+        ],
+        "next_cursor": next_cursor
+    })
 
 
 @router.delete("/documents/{doc_id}")
@@ -174,42 +239,46 @@ def chat_with_agent(
     """
     Chat with POC Agent.
     
-    Processes user message and returns agent response with conversation tracking.
+    Clients send only the conversation_id and the new prompt; the conversation
+    state is held server-side. Omit conversation_id to start a new conversation.
     """
+    conversation_id = request.conversation_id
+    if not conversation_id and request.conversation_history:
+        conversation_id = request.conversation_history.get("conversation_id")
+    
     try:
-        agent = get_poc_agent()
-        result = agent.process_request(
-            prompt=request.prompt,
-            user_id=str(current_user.id),
-            document_ids=request.document_ids,
-            conversation_history=request.conversation_history
-        )
-        
-        # Update requirements from conversation after each message
-        agent.update_requirements_from_conversation()
-        
-        # Save conversation to database
-        if agent.conversation_id:
-            # Check if conversation exists
-            conv = db.query(POCConversation).filter(
-                POCConversation.user_id == current_user.id
-            ).order_by(POCConversation.created_at.desc()).first()
-            
-            if not conv:
-                # Create new conversation
-                conv = POCConversation(
-                    user_id=current_user.id,
-                    conversation_history=agent.save_conversation()
-                )
-                db.add(conv)
-            else:
-                # Update existing conversation
-                conv.conversation_history = agent.save_conversation()
+        if conversation_id:
+            session = conversation_store.get(db, conversation_id, current_user.id)
+        else:
+            session = conversation_store.create(db, current_user.id)
+    except ConversationNotFoundError:
+        raise HTTPException(status_code=404, detail="Conversation not found")
+    
+    set_conversation(session.conversation_id)
+    
+    try:
+        with admit_llm_request(current_user, "chat", request.prompt), session.lock:
+            # Own copy per request: the shared agent is used by other conversations at the same time
+            agent = get_poc_agent().for_session(session)
+            result = agent.process_request(
+                prompt=request.prompt,
+                user_id=str(current_user.id),
+                document_ids=request.document_ids
+            )
+            agent.update_session(session)
             
-            db.commit()
+            # Save conversation state (fails if another request saved it first)
+            version = conversation_store.save(db, session)
         
-        return ChatResponse(**result)
+        return ChatResponse(**result, version=version)
         
+    except ConversationConflictError:
+        raise HTTPException(
+            status_code=409,
+            detail="Conversation was updated by another request. Please retry."
+        )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Chat processing failed: {str(e)}")
 
@@ -227,10 +296,11 @@ def generate_poc(
     """
     try:
         agent = get_poc_agent()
-        result = agent.generate_poc(
-            requirements=request.requirements,
-            user_id=str(current_user.id)
-        )
+        with admit_llm_request(current_user, "generate", str(request.requirements)):
+            result = agent.generate_poc(
+                requirements=request.requirements,
+                user_id=str(current_user.id)
+            )
         
         # Save to database
         db_poc = POC(
@@ -266,6 +336,8 @@ def generate_poc(
         
         return POCResponse(**result)
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"POC generation failed: {str(e)}")
 
@@ -291,24 +363,25 @@ def generate_prd(
     try:
         agent = get_poc_agent()
         
-        # Use provided requirements or extract from agent state
+        # Use provided requirements or extract from the conversation
         requirements = request.requirements
         if not requirements or not requirements.get("goal"):
-            # Try to extract from agent's current state
-            requirements = agent.requirements if hasattr(agent, 'requirements') and agent.requirements else request.requirements
-        
-        # If still no requirements, try extracting from latest conversation
-        if not requirements or not requirements.get("goal"):
-            # Get latest conversation for this user
-            latest_conv = db.query(POCConversation).filter(
-                POCConversation.user_id == current_user.id
-            ).order_by(POCConversation.created_at.desc()).first()
-            
-            if latest_conv and latest_conv.conversation_history:
-                # Try to extract from stored conversation
-                conv_data = latest_conv.conversation_history
-                if isinstance(conv_data, dict) and conv_data.get("requirements"):
-                    requirements = conv_data["requirements"]
+            if request.conversation_id:
+                session = conversation_store.get(db, request.conversation_id, current_user.id)
+                requirements = session.requirements
+                set_conversation(session.conversation_id)
+            else:
+                # No conversation given, fall back to the user's latest one
+                latest_conv = db.query(POCConversation).options(
+                    undefer(POCConversation.conversation_history)
+                ).filter(
+                    POCConversation.user_id == current_user.id
+                ).order_by(POCConversation.created_at.desc()).first()
+                
+                if latest_conv and latest_conv.conversation_history:
+                    conv_data = latest_conv.conversation_history
+                    if isinstance(conv_data, dict) and conv_data.get("requirements"):
+                        requirements = conv_data["requirements"]
         
         # Ensure we have at least basic requirements
         if not requirements or not requirements.get("goal"):
@@ -317,47 +390,137 @@ def generate_prd(
                 detail="Requirements not complete. Please have a conversation about what you want to build first."
             )
         
-        result = agent.generate_prd(
-            requirements=requirements,
-            user_id=str(current_user.id)
-        )
-        
-        # Save conversation with PRD reference
-        if hasattr(agent, 'conversation_id') and agent.conversation_id:
-            conv = db.query(POCConversation).filter(
-                POCConversation.user_id == current_user.id
-            ).order_by(POCConversation.created_at.desc()).first()
-            
-            if not conv:
-                conv = POCConversation(
-                    user_id=current_user.id,
-                    conversation_history=agent.save_conversation()
-                )
-                db.add(conv)
-            else:
-                conv.conversation_history = agent.save_conversation()
-            
-            db.commit()
+        with admit_llm_request(current_user, "generate_prd", str(requirements)):
+            result = agent.generate_prd(
+                requirements=requirements,
+                user_id=str(current_user.id)
+            )
         
         return PRDResponse(**result)
         
+    except ConversationNotFoundError:
+        raise HTTPException(status_code=404, detail="Conversation not found")
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"PRD generation failed: {str(e)}")
 
 
+@router.get("/conversations")
+def list_conversations(
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    sort: str = "-created_at",
+    poc_id: Optional[int] = Query(None, description="Only conversations linked to this POC"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    List the current user's conversations, one page at a time (newest first by default).
+    
+    Only list columns are read, never the conversation state. Pass
+    next_cursor back as cursor for the following page.
+    """
+    sort_name, sort_column, descending = parse_sort(sort, {
+        "created_at": POCConversation.created_at,
+        "id": POCConversation.id
+    })
+    
+    stmt = select(
+        POCConversation.id,
+        POCConversation.conversation_id,
+        POCConversation.poc_id,
+        POCConversation.version,
+        POCConversation.created_at,
+        POCConversation.updated_at
+    ).where(POCConversation.user_id == current_user.id)
+    if poc_id is not None:
+        stmt = stmt.where(POCConversation.poc_id == poc_id)
+    
+    rows = db.execute(keyset_page(stmt, sort_column, POCConversation.id, descending, cursor, limit)).all()
+    rows, next_cursor = page_rows(rows, limit, sort_name)
+    
+    return etag_response(request, {
+        "conversations": [
+            {
+                "conversation_id": row.conversation_id,
+                "poc_id": row.poc_id,
+                "version": row.version,
+                "created_at": row.created_at,
+                "updated_at": row.updated_at
+            }
+            for row in rows
+        ],
+        "next_cursor": next_cursor
+    })
+
+
+@router.get("/conversations/{conversation_id}")
+def get_conversation(
+    conversation_id: str,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get a single conversation's stage, requirements and messages."""
+    try:
+        session = conversation_store.get(db, conversation_id, current_user.id)
+    except ConversationNotFoundError:
+        raise HTTPException(status_code=404, detail="Conversation not found")
+    
+    state = session.to_state()
+    state["version"] = session.version
+    return state
+
+
+@router.get("/conversations/{conversation_id}/llm-calls")
+def get_conversation_llm_calls(
+    conversation_id: str,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Get the LLM calls made for a conversation since the server started.
+    
+    Returns a breakdown by call site (calls, latency and its share of the
+    total, tokens, retries, cache hits) plus every call record with its
+    API request id.
+    """
+    exists = db.query(POCConversation.id).filter(
+        POCConversation.conversation_id == conversation_id,
+        POCConversation.user_id == current_user.id
+    ).first()
+    if not exists:
+        raise HTTPException(status_code=404, detail="Conversation not found")
+    
+    calls = trace_store.conversation_calls(conversation_id)
+    return {
+        "conversation_id": conversation_id,
+        **summarize_calls(calls),
+        "calls": calls
+    }
+
+
 @router.get("/list-prds")
-def list_prds():
-    """List all PRD files in /prd/ folder."""
+def list_prds(
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    q: Optional[str] = Query(None, description="Feature name contains")
+):
+    """
+    List PRD files in /prd/ folder, newest first, one page at a time.
+    
+    Pass next_cursor back as cursor for the following page.
+    """
     prd_dir = "prd"
     
     if not os.path.exists(prd_dir):
-        return []
+        return etag_response(request, {"prds": [], "next_cursor": None})
     
     prds = []
     for filename in os.listdir(prd_dir):
-        if filename.endswith("-prd.md"):
+        if filename.endswith("-prd.md") and (not q or q.lower() in filename.lower()):
             file_path = os.path.join(prd_dir, filename)
             stat = os.stat(file_path)
             
@@ -371,10 +534,14 @@ def list_prds():
                 "created_at": datetime.fromtimestamp(stat.st_mtime).isoformat()
             })
     
-    # Sort by creation time (newest first)
-    prds.sort(key=lambda x: x["created_at"], reverse=True)
+    # Sort by creation time (newest first), then seek past the cursor
+    prds.sort(key=lambda x: (x["created_at"], x["prd_name"]), reverse=True)
+    if cursor:
+        after = decode_cursor(cursor)
+        prds = [prd for prd in prds if (prd["created_at"], prd["prd_name"]) < tuple(after)]
     
-    return prds
+    page, next_cursor = page_rows(prds, limit, "created_at", "prd_name")
+    return etag_response(request, {"prds": page, "next_cursor": next_cursor})
 
 
 @router.get("/prd/{prd_name}")
@@ -399,22 +566,48 @@ def get_prd_content(prd_name: str):
 
 @router.get("/list")
 def list_pocs(
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    sort: str = "-created_at",
+    q: Optional[str] = Query(None, description="POC name or id contains"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """List all POCs created by current user."""
-    pocs = db.query(POC).filter(POC.user_id == current_user.id).all()
-    
-    return [
-        {
-            "id": poc.id,
-            "poc_id": poc.poc_id,
-            "poc_name": poc.poc_name,
-            "description": poc.description,
-            "created_at": poc.created_at
-        }
-        for poc in pocs
-    ]
+    """
+    List the current user's POCs, one page at a time (newest first by default).
+    
+    Only list columns are read, never the requirements JSON. Pass
+    next_cursor back as cursor for the following page.
+    """
+    sort_name, sort_column, descending = parse_sort(sort, {
+        "created_at": POC.created_at,
+        "poc_name": POC.poc_name,
+        "id": POC.id
+    })
+    
+    stmt = select(POC.id, POC.poc_id, POC.poc_name, POC.description, POC.created_at).where(
+        POC.user_id == current_user.id
+    )
+    if q:
+        stmt = stmt.where(POC.poc_name.contains(q, autoescape=True) | POC.poc_id.contains(q, autoescape=True))
+    
+    rows = db.execute(keyset_page(stmt, sort_column, POC.id, descending, cursor, limit)).all()
+    rows, next_cursor = page_rows(rows, limit, sort_name)
+    
+    return etag_response(request, {
+        "pocs": [
+            {
+                "id": row.id,
+                "poc_id": row.poc_id,
+                "poc_name": row.poc_name,
+                "description": row.description,
+                "created_at": row.created_at
+            }
+            for row in rows
+        ],
+        "next_cursor": next_cursor
+    })
 
 
 @router.get("/{poc_id}/files")
@@ -507,15 +700,19 @@ def update_poc(
     # Regenerate phase files
     try:
         agent = get_poc_agent()
-        result = agent.generate_poc(
-            requirements=request.requirements,
-            user_id=str(current_user.id)
-        )
+        with admit_llm_request(current_user, "generate", str(request.requirements)):
+            result = agent.generate_poc(
+                requirements=request.requirements,
+                user_id=str(current_user.id)
+            )
         
         db.commit()
         
         return {"message": "POC updated", "directory": result["directory"]}
         
+    except HTTPException:
+        db.rollback()
+        raise
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=f"POC update failed: {str(e)}")
@@ -0,0 +1,391 @@
+"""
+Rate limiting and admission control for LLM-backed endpoints.
+
+Every /api/poc call that fans out into OpenAI calls (chat, generate,
+generate-prd, upload) is admitted through token buckets measured in both
+requests and estimated LLM tokens:
+- Per-user buckets stop one user from using up the provider limit; a user
+  over their quota gets 429 with Retry-After straight away
+- Global buckets and a concurrency cap protect the provider limit; requests
+  queue briefly when the wait is short and the queue has room, otherwise
+  they are shed with 503 and Retry-After
+- After the request, the estimate is replaced by the tokens the LLM calls
+  actually used (from agents/llm_tracing.py)
+
+Bucket state lives in process memory, or in a SQLite file (RATE_LIMIT_DB)
+so several workers share the same buckets. The concurrency cap and queue
+are per worker.
+
+Configuration (environment variables):
+    RATE_LIMIT_ENABLED          Set to 0 to disable admission control (default 1)
+    RATE_LIMIT_USER_RPM         Requests per minute per user (default 20)
+    RATE_LIMIT_USER_BURST       Requests a user may send at once (default 5)
+    RATE_LIMIT_USER_TPM         Estimated LLM tokens per minute per user (default 40000)
+    RATE_LIMIT_GLOBAL_RPM       Requests per minute for all users (default 300)
+    RATE_LIMIT_GLOBAL_TPM       LLM tokens per minute for all users (default 400000)
+    RATE_LIMIT_MAX_CONCURRENT   LLM-backed requests running at once per worker (default 8)
+    RATE_LIMIT_MAX_QUEUE        Requests waiting for admission per worker (default 16)
+    RATE_LIMIT_MAX_WAIT         Seconds a request may wait in the queue (default 10)
+    RATE_LIMIT_DB               SQLite file shared by workers (default: in-process)
+"""
+
+import math
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+from agents.llm_tracing import current_request
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "1") != "0"
+USER_RPM = float(os.getenv("RATE_LIMIT_USER_RPM", "20"))
+USER_BURST = float(os.getenv("RATE_LIMIT_USER_BURST", "5"))
+USER_TPM = float(os.getenv("RATE_LIMIT_USER_TPM", "40000"))
+GLOBAL_RPM = float(os.getenv("RATE_LIMIT_GLOBAL_RPM", "300"))
+GLOBAL_TPM = float(os.getenv("RATE_LIMIT_GLOBAL_TPM", "400000"))
+MAX_CONCURRENT = int(os.getenv("RATE_LIMIT_MAX_CONCURRENT", "8"))
+MAX_QUEUE = int(os.getenv("RATE_LIMIT_MAX_QUEUE", "16"))
+MAX_WAIT = float(os.getenv("RATE_LIMIT_MAX_WAIT", "10"))
+RATE_LIMIT_DB = os.getenv("RATE_LIMIT_DB", "")
+
+# Typical LLM tokens per endpoint call (see benchmark_poc.py tok/op); the
+# prompt text is added on top at about 4 characters per token
+ENDPOINT_TOKEN_ESTIMATES = {
+    "chat": 2000,
+    "generate": 12000,
+    "generate_prd": 6000,
+    "upload": 1500
+}
+
+
+class RateLimitExceeded(Exception):
+    """
+    Raised when a request is not admitted.
+
+    Attributes:
+        retry_after: Seconds the client should wait before retrying
+        scope: "user" (quota exceeded, 429) or "global" (overloaded, 503)
+        reason: Human-readable reason
+    """
+
+    def __init__(self, retry_after: float, scope: str, reason: str):
+        super().__init__(reason)
+        self.retry_after = max(1, math.ceil(retry_after))
+        self.scope = scope
+        self.reason = reason
+
+
+# A bucket request: (key, capacity, refill per second, amount)
+BucketRequest = Tuple[str, float, float, float]
+
+
+def _refill(tokens: float, updated: float, capacity: float, rate: float, now: float) -> float:
+    return min(capacity, tokens + (now - updated) * rate)
+
+
+class MemoryBucketStore:
+    """Token buckets held in process memory."""
+
+    def __init__(self):
+        self._buckets: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, requests: List[BucketRequest], now: float) -> float:
+        """
+        Take from several buckets at once, or from none of them.
+
+        Args:
+            requests (list): (key, capacity, rate, amount) per bucket
+            now (float): Current time in seconds
+
+        Returns:
+            float: 0 if taken, otherwise seconds until all buckets have enough
+        """
+        with self._lock:
+            wait = 0.0
+            levels = []
+            for key, capacity, rate, amount in requests:
+                tokens, updated = self._buckets.get(key, (capacity, now))
+                tokens = _refill(tokens, updated, capacity, rate, now)
+                levels.append(tokens)
+                if tokens < amount:
+                    wait = max(wait, (amount - tokens) / rate)
+            if wait > 0:
+                return wait
+            for (key, _, _, amount), tokens in zip(requests, levels):
+                self._buckets[key] = [tokens - amount, now]
+            return 0.0
+
+    def adjust(self, requests: List[BucketRequest], now: float):
+        """Give back (positive amount) or charge extra (negative amount) to buckets."""
+        with self._lock:
+            for key, capacity, rate, amount in requests:
+                tokens, updated = self._buckets.get(key, (capacity, now))
+                tokens = _refill(tokens, updated, capacity, rate, now)
+                self._buckets[key] = [min(capacity, tokens + amount), now]
+
+
+class SQLiteBucketStore:
+    """
+    Token buckets in a SQLite file shared by several worker processes.
+
+    Each acquire runs in a BEGIN IMMEDIATE transaction, so concurrent workers
+    see each other's takes.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = sqlite3.connect(path, timeout=5, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS rate_limit_buckets "
+            "(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+        )
+        self._lock = threading.Lock()
+
+    def _levels(self, requests: List[BucketRequest], now: float) -> List[float]:
+        levels = []
+        for key, capacity, rate, _ in requests:
+            row = self._conn.execute(
+                "SELECT tokens, updated FROM rate_limit_buckets WHERE key = ?", (key,)
+            ).fetchone()
+            tokens, updated = row if row else (capacity, now)
+            levels.append(_refill(tokens, updated, capacity, rate, now))
+        return levels
+
+    def _store(self, key: str, tokens: float, now: float):
+        self._conn.execute(
+            "INSERT INTO rate_limit_buckets (key, tokens, updated) VALUES (?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated",
+            (key, tokens, now)
+        )
+
+    def acquire(self, requests: List[BucketRequest], now: float) -> float:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                levels = self._levels(requests, now)
+                wait = 0.0
+                for (_, _, rate, amount), tokens in zip(requests, levels):
+                    if tokens < amount:
+                        wait = max(wait, (amount - tokens) / rate)
+                if wait == 0:
+                    for (key, _, _, amount), tokens in zip(requests, levels):
+                        self._store(key, tokens - amount, now)
+                self._conn.execute("COMMIT")
+                return wait
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def adjust(self, requests: List[BucketRequest], now: float):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                levels = self._levels(requests, now)
+                for (key, capacity, _, amount), tokens in zip(requests, levels):
+                    self._store(key, min(capacity, tokens + amount), now)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+
+class RateLimiter:
+    """
+    Admission control with per-user and global token buckets.
+
+    Example:
+        with rate_limiter.admit(user_id, "chat", prompt):
+            result = agent.process_request(...)
+    """
+
+    def __init__(
+        self,
+        store=None,
+        user_rpm: float = USER_RPM,
+        user_burst: float = USER_BURST,
+        user_tpm: float = USER_TPM,
+        global_rpm: float = GLOBAL_RPM,
+        global_tpm: float = GLOBAL_TPM,
+        max_concurrent: int = MAX_CONCURRENT,
+        max_queue: int = MAX_QUEUE,
+        max_wait: float = MAX_WAIT,
+        enabled: bool = RATE_LIMIT_ENABLED
+    ):
+        self.store = store or MemoryBucketStore()
+        self.user_rpm = user_rpm
+        self.user_burst = user_burst
+        self.user_tpm = user_tpm
+        self.global_rpm = global_rpm
+        self.global_tpm = global_tpm
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.enabled = enabled
+
+        self._cond = threading.Condition()
+        self._active = 0
+        self._waiting = 0
+        self._avg_duration = 1.0
+        self.stats = {"admitted": 0, "queued": 0, "shed_user": 0, "shed_global": 0}
+
+    def estimate_tokens(self, endpoint: str, text: str = "") -> int:
+        """
+        Estimate the LLM tokens one call to an endpoint will use.
+
+        Args:
+            endpoint (str): Key of ENDPOINT_TOKEN_ESTIMATES
+            text (str): Prompt text sent by the client
+
+        Returns:
+            int: Estimated prompt + completion tokens
+        """
+        return ENDPOINT_TOKEN_ESTIMATES.get(endpoint, 2000) + len(text or "") // 4
+
+    def _user_buckets(self, user_id, requests: float, tokens: float) -> List[BucketRequest]:
+        return [
+            (f"user:{user_id}:requests", self.user_burst, self.user_rpm / 60, requests),
+            (f"user:{user_id}:tokens", self.user_tpm, self.user_tpm / 60, min(tokens, self.user_tpm))
+        ]
+
+    def _global_buckets(self, requests: float, tokens: float) -> List[BucketRequest]:
+        return [
+            ("global:requests", max(1.0, self.global_rpm / 6), self.global_rpm / 60, requests),
+            ("global:tokens", self.global_tpm, self.global_tpm / 60, min(tokens, self.global_tpm))
+        ]
+
+    def _shed(self, retry_after: float, scope: str, reason: str):
+        self.stats["shed_user" if scope == "user" else "shed_global"] += 1
+        raise RateLimitExceeded(retry_after, scope, reason)
+
+    def _acquire_global(self, tokens: float, deadline: float):
+        """Take from the global buckets, queueing while the wait is short."""
+        queued = False
+        try:
+            while True:
+                now = time.time()
+                wait = self.store.acquire(self._global_buckets(1, tokens), now)
+                if wait == 0:
+                    return
+                if now + wait > deadline:
+                    self._shed(wait, "global", "Server is at its LLM rate limit, please retry")
+                if not queued:
+                    with self._cond:
+                        if self._waiting >= self.max_queue:
+                            self._shed(wait, "global", "Too many requests queued, please retry")
+                        self._waiting += 1
+                        self.stats["queued"] += 1
+                    queued = True
+                time.sleep(min(wait, 0.5))
+        finally:
+            if queued:
+                with self._cond:
+                    self._waiting -= 1
+
+    def _acquire_slot(self, deadline: float):
+        """Wait for one of max_concurrent slots, shedding when the queue is full."""
+        with self._cond:
+            if self._active < self.max_concurrent:
+                self._active += 1
+                return
+            # Expected wait: requests ahead of this one over the slots freeing up
+            expected = (self._waiting + 1) * self._avg_duration / self.max_concurrent
+            if self._waiting >= self.max_queue or time.time() + expected > deadline:
+                self._shed(expected, "global", "Too many requests in progress, please retry")
+            self._waiting += 1
+            self.stats["queued"] += 1
+            try:
+                while self._active >= self.max_concurrent:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        self._shed(self._avg_duration, "global", "Timed out waiting for admission, please retry")
+                    self._cond.wait(remaining)
+                self._active += 1
+            finally:
+                self._waiting -= 1
+
+    def _release_slot(self, duration: float):
+        with self._cond:
+            self._active -= 1
+            self._avg_duration = 0.8 * self._avg_duration + 0.2 * duration
+            self._cond.notify()
+
+    @contextmanager
+    def admit(self, user_id, endpoint: str, text: str = ""):
+        """
+        Admit one LLM-backed request, or raise RateLimitExceeded.
+
+        Args:
+            user_id: Requesting user
+            endpoint (str): Endpoint name for the token estimate
+            text (str): Prompt text sent by the client
+
+        Raises:
+            RateLimitExceeded: If the user is over quota or the server is overloaded
+        """
+        if not self.enabled:
+            yield
+            return
+
+        estimate = self.estimate_tokens(endpoint, text)
+        deadline = time.time() + self.max_wait
+
+        # A user over their own quota is never queued
+        wait = self.store.acquire(self._user_buckets(user_id, 1, estimate), time.time())
+        if wait > 0:
+            self._shed(wait, "user", "Rate limit exceeded, please slow down")
+
+        try:
+            self._acquire_global(estimate, deadline)
+        except RateLimitExceeded:
+            self.store.adjust(self._user_buckets(user_id, 1, estimate), time.time())
+            raise
+
+        try:
+            self._acquire_slot(deadline)
+        except RateLimitExceeded:
+            now = time.time()
+            self.store.adjust(self._user_buckets(user_id, 1, estimate), now)
+            self.store.adjust(self._global_buckets(1, estimate), now)
+            raise
+
+        self.stats["admitted"] += 1
+        trace = current_request()
+        first_call = len(trace.calls) if trace else 0
+        start = time.time()
+        try:
+            yield
+        finally:
+            self._release_slot(time.time() - start)
+            if trace is not None:
+                # Swap the estimate for the tokens actually used
+                actual = sum(c["prompt_tokens"] + c["completion_tokens"] for c in trace.calls[first_call:])
+                if actual:
+                    now = time.time()
+                    self.store.adjust(self._user_buckets(user_id, 0, estimate - actual), now)
+                    self.store.adjust(self._global_buckets(0, estimate - actual), now)
+
+    def prometheus(self) -> str:
+        """Admission counters in Prometheus text format."""
+        lines = [
+            "# HELP poc_rate_limit_requests_total LLM-backed requests by admission outcome",
+            "# TYPE poc_rate_limit_requests_total counter"
+        ]
+        for outcome, count in self.stats.items():
+            lines.append(f'poc_rate_limit_requests_total{{outcome="{outcome}"}} {count}')
+        lines += [
+            "# HELP poc_rate_limit_active LLM-backed requests running in this worker",
+            "# TYPE poc_rate_limit_active gauge",
+            f"poc_rate_limit_active {self._active}",
+            "# HELP poc_rate_limit_waiting LLM-backed requests queued in this worker",
+            "# TYPE poc_rate_limit_waiting gauge",
+            f"poc_rate_limit_waiting {self._waiting}"
+        ]
+        return "\n".join(lines) + "\n"
+
+
+# Global limiter instance used by the POC endpoints
+rate_limiter = RateLimiter(SQLiteBucketStore(RATE_LIMIT_DB) if RATE_LIMIT_DB else None)
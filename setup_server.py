@@ -2,15 +2,31 @@
 Setup Server - Configuration webpage for Boot_Lang initial setup.
 
 Uses Python's built-in http.server - no external dependencies needed.
+
+Progress is read from setup_progress.log through log_tailer.progress_tailer,
+which only parses what was appended since the last poll. The live log page
+gets new output over Server-Sent Events (/log_events); /log_content?offset=P
+returns the bytes from position P on (see log_tailer.read_log), with the
+position to continue from in X-Log-Offset.
+
+Configuration (environment variables):
+    LOG_POLL_SECONDS        How often /log_events checks for new output (default 0.5)
+    SSE_KEEPALIVE_SECONDS   Idle time before /log_events sends a keepalive (default 15)
 """
 
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
 import json
 import os
 import re
+import time
 import urllib.parse
 import platform
 
+from log_tailer import progress_tailer
+
+LOG_POLL_SECONDS = float(os.getenv("LOG_POLL_SECONDS", "0.5"))
+SSE_KEEPALIVE_SECONDS = float(os.getenv("SSE_KEEPALIVE_SECONDS", "15"))
+
 class SetupHandler(BaseHTTPRequestHandler):
     """Handle setup webpage requests."""
     
@@ -30,45 +46,9 @@ class SetupHandler(BaseHTTPRequestHandler):
             self.send_header('Content-type', 'application/json')
             self.end_headers()
             
-            # Read progress log
-            if os.path.exists('setup_progress.log'):
-                with open('setup_progress.log', 'r', encoding='utf-8') as f:
-                    lines = f.readlines()
-                
-                progress = []
-                complete_url = ""
-                error_message = ""
-                download_progress = {}
-                
-                for line in lines:
-                    line = line.strip()
-                    if line.startswith('PROGRESS:'):
-                        task = line.replace('PROGRESS:', '')
-                        progress.append({"task": task, "status": "running", "progress": 0})
-                    elif line.startswith('DONE:'):
-                        task = line.replace('DONE:', '')
-                        # Update matching task to done
-                        for p in progress:
-                            if p["task"] == task:
-                                p["status"] = "done"
-                                p["progress"] = 100
-                                break
-                    elif line.startswith('DOWNLOAD_PROGRESS:'):
-                        # Format: DOWNLOAD_PROGRESS:Tool Name:75
-                        parts = line.replace('DOWNLOAD_PROGRESS:', '').split(':')
-                        if len(parts) >= 2:
-                            tool_name = parts[0]
-                            percent = int(parts[1])
-                            download_progress[tool_name] = percent
-                            # Update progress for matching task
-                            for p in progress:
-                                if tool_name in p["task"]:
-                                    p["progress"] = percent
-                                    break
-                    elif line.startswith('COMPLETE:'):
-                        complete_url = line.replace('COMPLETE:', '')
-                    elif line.startswith('ERROR:'):
-                        error_message = line.replace('ERROR:', '')
+            # Parse only what was appended to the log since the last poll
+            if progress_tailer.poll():
+                state = progress_tailer.progress()
                 
                 # Extract GitHub URL for actions link
                 github_url = ""
@@ -80,19 +60,14 @@ class SetupHandler(BaseHTTPRequestHandler):
                 except:
                     pass
                 
-                self.wfile.write(json.dumps({
-                    "progress": progress,
-                    "complete": bool(complete_url),
-                    "url": complete_url,
-                    "error": error_message,
-                    "github_actions_url": github_url
-                }).encode())
+                self.wfile.write(json.dumps({**state, "github_actions_url": github_url}).encode())
             else:
                 self.wfile.write(json.dumps({
                     "progress": [],
                     "complete": False,
                     "url": "",
                     "error": "",
+                    "device_codes": {},
                     "github_actions_url": ""
                 }).encode())
                 
@@ -101,18 +76,24 @@ class SetupHandler(BaseHTTPRequestHandler):
             self.send_response(200)
             self.send_header('Content-type', 'text/html')
             self.end_headers()
-            html = '''<!DOCTYPE html><html><head><title>Live Setup Log</title><style>body{margin:0;padding:20px;background:#1e1e1e;color:#d4d4d4;font-family:Consolas,Monaco,monospace;font-size:14px}#log{white-space:pre-wrap;word-wrap:break-word;line-height:1.4}.header{position:sticky;top:0;background:#1e1e1e;padding:10px 0;border-bottom:2px solid #007acc;margin-bottom:10px}.auto-scroll{float:right}</style></head><body><div class="header"><strong>📄 Live Setup Log</strong><label class="auto-scroll"><input type="checkbox" id="autoScroll" checked> Auto-scroll</label></div><div id="log"></div><script>const logDiv=document.getElementById('log');const autoScrollCheckbox=document.getElementById('autoScroll');let lastSize=0;async function fetchLog(){try{const response=await fetch('/log_content');const text=await response.text();if(text.length!==lastSize){logDiv.textContent=text;lastSize=text.length;if(autoScrollCheckbox.checked){window.scrollTo(0,document.body.scrollHeight);}}}catch(error){console.error('Error fetching log:',error);}}setInterval(fetchLog,500);fetchLog();</script></body></html>'''
+            html = '''<!DOCTYPE html><html><head><title>Live Setup Log</title><style>body{margin:0;padding:20px;background:#1e1e1e;color:#d4d4d4;font-family:Consolas,Monaco,monospace;font-size:14px}#log{white-space:pre-wrap;word-wrap:break-word;line-height:1.4}.header{position:sticky;top:0;background:#1e1e1e;padding:10px 0;border-bottom:2px solid #007acc;margin-bottom:10px}.auto-scroll{float:right}</style></head><body><div class="header"><strong>📄 Live Setup Log</strong><label class="auto-scroll"><input type="checkbox" id="autoScroll" checked> Auto-scroll</label></div><div id="log"></div><script>const logDiv=document.getElementById('log');const autoScrollCheckbox=document.getElementById('autoScroll');const events=new EventSource('/log_events');events.addEventListener('log',(event)=>{logDiv.appendChild(document.createTextNode(event.data));if(autoScrollCheckbox.checked){window.scrollTo(0,document.body.scrollHeight);}});events.addEventListener('reset',()=>{logDiv.textContent='';});events.onerror=(error)=>{console.error('Log stream error:',error);};</script></body></html>'''
             self.wfile.write(html.encode())
-        elif self.path == '/log_content':
-            # Serve raw log content
+        elif self.path.split('?', 1)[0] == '/log_content':
+            # Serve raw log content from ?offset= (default 0); X-Log-Offset is where to continue
+            query = urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query)
+            data, position, reset = progress_tailer.read_log(self.log_position(query))
+            if data is None:
+                data = b'' if 'offset' in query else b'No log file yet...'
+            
             self.send_response(200)
-            self.send_header('Content-type', 'text/plain')
+            self.send_header('Content-type', 'text/plain; charset=utf-8')
+            self.send_header('X-Log-Offset', position)
+            if reset:
+                self.send_header('X-Log-Reset', '1')
             self.end_headers()
-            if os.path.exists('setup_progress.log'):
-                with open('setup_progress.log', 'r', encoding='utf-8', errors='replace') as f:
-                    self.wfile.write(f.read().encode('utf-8', errors='replace'))
-            else:
-                self.wfile.write(b'No log file yet...')
+            self.wfile.write(data)
+        elif self.path.split('?', 1)[0] == '/log_events':
+            self.stream_log_events()
         elif self.path == '/config':
             self.send_response(200)
             self.send_header('Content-type', 'application/json')
@@ -348,6 +329,50 @@ class SetupHandler(BaseHTTPRequestHandler):
             self.end_headers()
             self.wfile.write(json.dumps({"detail": str(e)}).encode())
     
+    def log_position(self, query: dict) -> str:
+        """Log position to read from: Last-Event-ID, else ?offset=, else the start."""
+        return self.headers.get('Last-Event-ID') or query.get('offset', ['0'])[0]
+    
+    def stream_log_events(self):
+        """
+        Stream the log as Server-Sent Events until the client disconnects.
+        
+        Each "log" event carries the text appended since the previous one and
+        has the next log position as its id, so a reconnecting EventSource
+        resumes from Last-Event-ID. A "reset" event means the log was
+        rewritten and the client should clear what it has.
+        """
+        query = urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query)
+        position = self.log_position(query)
+        
+        self.send_response(200)
+        self.send_header('Content-type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        
+        idle = 0.0
+        try:
+            while True:
+                data, position, reset = progress_tailer.read_log(position)
+                if reset:
+                    self.wfile.write(b'event: reset\ndata:\n\n')
+                if data:
+                    # pip and npm redraw progress with bare \r; any line break ends a data: line
+                    text = data.decode('utf-8', errors='replace').replace('\r\n', '\n').replace('\r', '\n')
+                    lines = text.split('\n')
+                    event = f"id: {position}\nevent: log\n" + ''.join(f"data: {line}\n" for line in lines) + "\n"
+                    self.wfile.write(event.encode('utf-8'))
+                    idle = 0.0
+                    continue
+                if idle >= SSE_KEEPALIVE_SECONDS:
+                    self.wfile.write(b': keepalive\n\n')
+                    idle = 0.0
+                self.wfile.flush()
+                time.sleep(LOG_POLL_SECONDS)
+                idle += LOG_POLL_SECONDS
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+    
     def log_message(self, format, *args):
         """Suppress log messages."""
         pass
@@ -362,7 +387,8 @@ if __name__ == "__main__":
     print("=" * 60)
     print()
     
-    server = HTTPServer(('0.0.0.0', 8001), SetupHandler)
+    # Threaded, so open /log_events streams don't block the setup page
+    server = ThreadingHTTPServer(('0.0.0.0', 8001), SetupHandler)
     try:
         server.serve_forever()
     except KeyboardInterrupt:
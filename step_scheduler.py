@@ -0,0 +1,195 @@
+"""
+Dependency-aware step scheduler for setup automation.
+
+Steps declare the steps they depend on and run on a thread pool as soon as
+those have finished, so independent work (installing dependencies, building
+the frontend, authenticating GitHub) overlaps instead of running in sequence.
+
+Every step is timed and may be retried. Progress is recorded as checkpoint
+lines through a callback (AutomationService appends them to
+setup_progress.log):
+    RUN:<key>                   A run (or resumed run) started for this config
+    STEP_DONE:<name>:<seconds>  A step finished
+    STEP_RETRY:<name>:<attempt>:<error>
+    STEP_FAILED:<name>:<error>
+    RUN_COMPLETE:<seconds>      Every step finished
+
+read_checkpoints() turns those lines back into the set of finished steps,
+so a failed run can be resumed from the step that failed.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+
+class Step:
+    """One unit of setup work; it fails if it raises or returns False."""
+
+    def __init__(self, name: str, run: Callable[[], Optional[bool]], depends_on: Iterable[str] = (),
+                 retries: int = 0, retry_delay: float = 2.0):
+        """
+        Args:
+            name: Unique step name (used in checkpoints)
+            run: Callable doing the work
+            depends_on: Names of steps that must finish first
+            retries: Extra attempts after a failure
+            retry_delay: Seconds before the first retry (doubled for each next one)
+        """
+        self.name = name
+        self.run = run
+        self.depends_on = list(depends_on)
+        self.retries = retries
+        self.retry_delay = retry_delay
+
+
+class StepScheduler:
+    """
+    Run steps in dependency order, in parallel where the dependencies allow.
+
+    Example:
+        scheduler = StepScheduler([
+            Step("venv", make_venv),
+            Step("deps", install, depends_on=["venv"], retries=2),
+            Step("frontend", build_frontend),
+        ], record=log_line)
+        with open("setup_progress.log") as f:
+            ok = scheduler.run(completed=read_checkpoints(f, key))
+    """
+
+    def __init__(self, steps: List[Step], max_workers: int = 4,
+                 record: Callable[[str], None] = print, log: Callable[[str], None] = print):
+        """
+        Args:
+            steps: Steps to run, in the order ready steps should start
+            max_workers: Most steps running at once
+            record: Writes a checkpoint line
+            log: Writes a human-readable message
+
+        Raises:
+            ValueError: If names repeat, a dependency is unknown, or there's a cycle
+        """
+        self.steps = {step.name: step for step in steps}
+        if len(self.steps) != len(steps):
+            raise ValueError("Step names must be unique")
+        for step in steps:
+            unknown = [name for name in step.depends_on if name not in self.steps]
+            if unknown:
+                raise ValueError(f"Step '{step.name}' depends on unknown step(s): {', '.join(unknown)}")
+        self._check_acyclic()
+
+        self.max_workers = max_workers
+        self.record = record
+        self.log = log
+        self.timings: Dict[str, float] = {}
+        self.skipped: List[str] = []
+        self.failed: Optional[str] = None
+
+    def _check_acyclic(self):
+        """Raise ValueError if the dependencies contain a cycle."""
+        remaining = {name: set(step.depends_on) for name, step in self.steps.items()}
+        while remaining:
+            ready = [name for name, deps in remaining.items() if not deps]
+            if not ready:
+                raise ValueError(f"Dependency cycle among steps: {', '.join(sorted(remaining))}")
+            for name in ready:
+                del remaining[name]
+            for deps in remaining.values():
+                deps.difference_update(ready)
+
+    def _run_step(self, step: Step) -> bool:
+        """Run one step with its retries, recording the outcome."""
+        started = time.perf_counter()
+        error = ""
+        for attempt in range(1, step.retries + 2):
+            try:
+                if step.run() is not False:
+                    self.timings[step.name] = time.perf_counter() - started
+                    self.record(f"STEP_DONE:{step.name}:{self.timings[step.name]:.1f}")
+                    return True
+                error = "step reported failure"
+            except Exception as e:
+                error = str(e).replace("\n", " ") or e.__class__.__name__
+
+            if attempt <= step.retries:
+                self.record(f"STEP_RETRY:{step.name}:{attempt}:{error}")
+                self.log(f"[RETRY] {step.name} failed ({error}), attempt {attempt + 1} of {step.retries + 1}")
+                time.sleep(step.retry_delay * 2 ** (attempt - 1))
+
+        self.timings[step.name] = time.perf_counter() - started
+        self.record(f"STEP_FAILED:{step.name}:{error}")
+        return False
+
+    def run(self, completed: Iterable[str] = ()) -> bool:
+        """
+        Run every step that hasn't completed.
+
+        Once a step fails no new steps start; the ones already running finish.
+
+        Args:
+            completed: Names of steps finished by an earlier run (skipped)
+
+        Returns:
+            bool: True if every step has finished
+        """
+        started = time.perf_counter()
+        done: Set[str] = set(completed) & set(self.steps)
+        self.skipped = [name for name in self.steps if name in done]
+        for name in self.skipped:
+            self.log(f"[SKIP] {name} (finished in an earlier run)")
+
+        pending = [name for name in self.steps if name not in done]
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="setup-step") as pool:
+            while pending or running:
+                if self.failed is None:
+                    for name in [n for n in pending if set(self.steps[n].depends_on) <= done]:
+                        pending.remove(name)
+                        running[pool.submit(self._run_step, self.steps[name])] = name
+                if not running:
+                    break
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    if future.result():
+                        done.add(name)
+                    elif self.failed is None:
+                        self.failed = name
+
+        if self.failed is None and not pending:
+            self.record(f"RUN_COMPLETE:{time.perf_counter() - started:.1f}")
+            return True
+        return False
+
+
+def read_checkpoints(lines: Iterable[str], run_key: str) -> Set[str]:
+    """
+    Steps finished by the latest unfinished run for run_key.
+
+    Runs resumed with the same key add up; a different key or a
+    RUN_COMPLETE line starts over, so a finished or reconfigured setup
+    runs every step again.
+
+    Args:
+        lines: Log lines (e.g. an open setup_progress.log)
+        run_key: Key of the current configuration
+
+    Returns:
+        set: Names of finished steps (empty if there's nothing to resume)
+    """
+    done: Set[str] = set()
+    key = None
+    for line in lines:
+        line = line.strip()
+        if line.startswith("RUN:"):
+            if line[4:] != key:
+                done = set()
+            key = line[4:]
+        elif line.startswith("RUN_COMPLETE:"):
+            done = set()
+            key = None
+        elif line.startswith("STEP_DONE:"):
+            done.add(line.split(":")[1])
+    return done if key == run_key else set()
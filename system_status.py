@@ -0,0 +1,384 @@
+"""
+Cached system status for the admin dashboards.
+
+Building the status (git branch/commits/changes, user_config.json, row counts
+of every table) costs three git subprocesses and a COUNT(*) per table.
+SystemStatus keeps a snapshot instead, refreshed by a background thread, so
+/api/system/status just returns it:
+- Git info is re-read only when .git/HEAD, .git/index or the branch ref
+  change (mtime), or after GIT_STATUS_MAX_AGE seconds (unstaged edits)
+- user_config.json is re-read when its mtime changes
+- Row counts are adjusted as ORM sessions commit inserts and deletes, and
+  recounted every STATUS_RECOUNT_SECONDS to pick up bulk statements,
+  cascades and other processes. Tables that sqlite_stat1 (or pg_class)
+  puts above STATUS_EXACT_COUNT_LIMIT rows use that estimate instead of
+  COUNT(*) and are marked "estimated"
+
+Configuration (environment variables):
+    STATUS_REFRESH_SECONDS      Snapshot refresh interval (default 5)
+    STATUS_RECOUNT_SECONDS      Full row recount interval (default 60)
+    GIT_STATUS_MAX_AGE          Re-read git status at least this often (default 30)
+    STATUS_EXACT_COUNT_LIMIT    Estimated rows above which COUNT(*) is skipped (default 100000)
+"""
+
+import json
+import os
+import subprocess
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event, func, inspect, select, table
+from sqlalchemy.orm import Session
+
+from database import engine as app_engine
+
+REFRESH_SECONDS = float(os.getenv("STATUS_REFRESH_SECONDS", "5"))
+RECOUNT_SECONDS = float(os.getenv("STATUS_RECOUNT_SECONDS", "60"))
+GIT_MAX_AGE = float(os.getenv("GIT_STATUS_MAX_AGE", "30"))
+EXACT_COUNT_LIMIT = int(os.getenv("STATUS_EXACT_COUNT_LIMIT", "100000"))
+
+
+def read_git_info(repo_dir: str = ".") -> Dict[str, Any]:
+    """
+    Read branch, last 3 commits and working tree state with git.
+
+    Args:
+        repo_dir: Repository directory
+
+    Returns:
+        dict: branch, recent_commits, has_uncommitted_changes, status
+    """
+    def git(*args):
+        return subprocess.check_output(
+            ['git', *args], cwd=repo_dir, text=True, stderr=subprocess.DEVNULL
+        ).strip()
+
+    try:
+        branch = git('branch', '--show-current')
+
+        commits = []
+        for line in git('log', '-3', '--pretty=%h|%s').split('\n'):
+            if '|' in line:
+                hash_part, msg_part = line.split('|', 1)
+                commits.append({
+                    "hash": hash_part.strip(),
+                    "message": msg_part.strip()
+                })
+
+        has_changes = bool(git('status', '--porcelain'))
+
+        return {
+            "branch": branch,
+            "recent_commits": commits,
+            "has_uncommitted_changes": has_changes,
+            "status": "⚠️ Uncommitted changes" if has_changes else "✅ Clean"
+        }
+    except Exception:
+        return {
+            "branch": "unknown",
+            "recent_commits": [],
+            "has_uncommitted_changes": False,
+            "status": "⚠️ Git info unavailable"
+        }
+
+
+def count_rows(connection, exact_limit: int = EXACT_COUNT_LIMIT) -> Dict[str, Dict[str, Any]]:
+    """
+    Row counts per table: exact, or the planner's estimate for large tables.
+
+    Args:
+        connection: SQLAlchemy Connection
+        exact_limit: Estimated rows above which the estimate is used
+
+    Returns:
+        dict: table name -> {"records": int or "Error", "estimated": bool}
+    """
+    estimates = {}
+    try:
+        if connection.dialect.name == "sqlite":
+            if inspect(connection).has_table("sqlite_stat1"):
+                # First number of an index's stat is the table's row count at ANALYZE time
+                for tbl, stat in connection.exec_driver_sql("SELECT tbl, stat FROM sqlite_stat1"):
+                    rows = int((stat or "0").split()[0])
+                    estimates[tbl] = max(estimates.get(tbl, 0), rows)
+        elif connection.dialect.name == "postgresql":
+            for name, rows in connection.exec_driver_sql(
+                "SELECT relname, reltuples::bigint FROM pg_class "
+                "WHERE relkind = 'r' AND relnamespace = 'public'::regnamespace"
+            ):
+                estimates[name] = rows
+    except Exception:
+        connection.rollback()
+
+    counts = {}
+    for name in inspect(connection).get_table_names():
+        if estimates.get(name, 0) > exact_limit:
+            counts[name] = {"records": estimates[name], "estimated": True}
+            continue
+        try:
+            count = connection.execute(select(func.count()).select_from(table(name))).scalar()
+            counts[name] = {"records": count, "estimated": False}
+        except Exception:
+            connection.rollback()
+            counts[name] = {"records": "Error", "estimated": False}
+    return counts
+
+
+def sqlite_file_exists(engine) -> bool:
+    """Whether a SQLite engine's database file exists (without creating it)."""
+    path = engine.url.database
+    return bool(path) and path != ":memory:" and os.path.exists(path)
+
+
+class SystemStatus:
+    """
+    Background-refreshed status snapshot (project, git, database).
+
+    Example:
+        system_status.start()             # at startup
+        return system_status.snapshot()   # in the endpoint
+    """
+
+    def __init__(self, engine=app_engine, repo_dir: str = ".", config_path: str = "user_config.json",
+                 refresh_interval: float = REFRESH_SECONDS, recount_interval: float = RECOUNT_SECONDS,
+                 git_max_age: float = GIT_MAX_AGE, exact_count_limit: int = EXACT_COUNT_LIMIT):
+        self.engine = engine
+        self.repo_dir = repo_dir
+        self.config_path = config_path
+        self.refresh_interval = refresh_interval
+        self.recount_interval = recount_interval
+        self.git_max_age = git_max_age
+        self.exact_count_limit = exact_count_limit
+
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._snapshot: Optional[Dict[str, Any]] = None
+        self._refreshed_at = 0.0
+        self._project = None
+        self._project_mtime = None
+        self._git = None
+        self._git_key = None
+        self._git_read_at = 0.0
+        self._counts: Optional[Dict[str, Dict[str, Any]]] = None
+        self._counted_at = 0.0
+        self._db_error = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.stats = {"refreshes": 0, "git_reads": 0, "recounts": 0, "incremental_updates": 0}
+
+    def _read_project(self) -> Dict[str, Any]:
+        """Project info from user_config.json, re-read when its mtime changes."""
+        try:
+            mtime = os.stat(self.config_path).st_mtime_ns
+        except OSError:
+            mtime = None
+
+        if self._project is None or mtime != self._project_mtime:
+            try:
+                with open(self.config_path, 'r') as f:
+                    config = json.load(f)
+                identity = config.get('user_identity', {})
+                self._project = {
+                    "name": identity.get('project_name', 'Unknown'),
+                    "user": identity.get('user_name', 'Unknown'),
+                    "environment": os.getenv('ENVIRONMENT', 'development')
+                }
+            except Exception:
+                self._project = {
+                    "name": "Unknown",
+                    "user": "Unknown",
+                    "environment": os.getenv('ENVIRONMENT', 'development')
+                }
+            self._project_mtime = mtime
+        return self._project
+
+    def _git_state_key(self):
+        """mtimes of .git/HEAD, .git/index and the checked-out branch ref."""
+        git_dir = os.path.join(self.repo_dir, ".git")
+        paths = [os.path.join(git_dir, "HEAD"), os.path.join(git_dir, "index")]
+        try:
+            with open(paths[0]) as f:
+                head = f.read().strip()
+            if head.startswith("ref: "):
+                paths.append(os.path.join(git_dir, head[5:]))
+        except OSError:
+            pass
+
+        key = []
+        for path in paths:
+            try:
+                key.append(os.stat(path).st_mtime_ns)
+            except OSError:
+                key.append(None)
+        return tuple(key)
+
+    def _read_git(self, now: float) -> Dict[str, Any]:
+        """Git info, re-read when the git state changes or it gets too old."""
+        key = self._git_state_key()
+        if self._git is None or key != self._git_key or now - self._git_read_at >= self.git_max_age:
+            self._git = read_git_info(self.repo_dir)
+            # git status may rewrite the index, so key on the state after it ran
+            self._git_key = self._git_state_key()
+            self._git_read_at = now
+            self.stats["git_reads"] += 1
+        return self._git
+
+    def _database_info(self) -> Dict[str, Any]:
+        """Database section of the snapshot from the current counts."""
+        if self._counts is None:
+            return {"exists": False, "tables": [], "total_records": 0}
+
+        tables = []
+        total = 0
+        for name in sorted(self._counts):
+            entry = self._counts[name]
+            info = {"name": name, "records": entry["records"]}
+            if entry["estimated"]:
+                info["estimated"] = True
+            if isinstance(entry["records"], int):
+                total += entry["records"]
+            tables.append(info)
+
+        database = {
+            "exists": True,
+            "dialect": self.engine.dialect.name,
+            "tables": tables,
+            "total_records": total,
+            "counted_at": datetime.fromtimestamp(self._counted_at).isoformat() if self._counted_at else None
+        }
+        if self._db_error:
+            database["error"] = self._db_error
+        return database
+
+    def _recount(self, now: float):
+        """Recount every table."""
+        if self.engine.dialect.name == "sqlite" and not sqlite_file_exists(self.engine):
+            counts, error = None, None
+        else:
+            try:
+                with self.engine.connect() as conn:
+                    counts, error = count_rows(conn, self.exact_count_limit), None
+            except Exception as e:
+                counts, error = {}, str(e)
+
+        with self._lock:
+            self._counts = counts
+            self._db_error = error
+            self._counted_at = now
+        self.stats["recounts"] += 1
+
+    def refresh(self, recount: bool = False) -> Dict[str, Any]:
+        """
+        Rebuild the snapshot, recounting rows if they are due (or recount=True).
+
+        Returns:
+            dict: The new snapshot
+        """
+        with self._refresh_lock:
+            now = time.time()
+            project = self._read_project()
+            git = self._read_git(now)
+            if recount or self._counts is None or now - self._counted_at >= self.recount_interval:
+                self._recount(now)
+
+            with self._lock:
+                self._snapshot = {
+                    "project": project,
+                    "git": git,
+                    "database": self._database_info(),
+                    "timestamp": datetime.fromtimestamp(now).isoformat()
+                }
+                self._refreshed_at = now
+            self.stats["refreshes"] += 1
+            return self._snapshot
+
+    def snapshot(self) -> Optional[Dict[str, Any]]:
+        """
+        The latest snapshot with its age, or None before the first refresh.
+
+        Returns:
+            dict: project, git, database, timestamp (refresh time), age_seconds
+        """
+        with self._lock:
+            if self._snapshot is None:
+                return None
+            snapshot = dict(self._snapshot)
+            snapshot["age_seconds"] = round(time.time() - self._refreshed_at, 3)
+        return snapshot
+
+    def apply_changes(self, deltas: Dict[str, int]):
+        """
+        Adjust row counts by committed inserts (+) and deletes (-) per table.
+
+        Args:
+            deltas: Table name to row count change
+        """
+        with self._lock:
+            if self._counts is None or self._snapshot is None:
+                return
+            for name, delta in deltas.items():
+                entry = self._counts.setdefault(name, {"records": 0, "estimated": False})
+                if isinstance(entry["records"], int):
+                    entry["records"] = max(0, entry["records"] + delta)
+            self._snapshot = {**self._snapshot, "database": self._database_info()}
+        self.stats["incremental_updates"] += 1
+
+    def tracks(self, bind) -> bool:
+        """Whether a session bind points at the database this status describes."""
+        url = getattr(bind, "url", None)
+        return url is not None and url.database == self.engine.url.database and \
+            url.get_backend_name() == self.engine.url.get_backend_name()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"⚠ System status refresh failed: {e}")
+            self._stop.wait(self.refresh_interval)
+
+    def start(self):
+        """Start the background refresher (no-op if it's running)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="system-status", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background refresher."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+# Global status instance used by /api/system/status
+system_status = SystemStatus()
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_row_changes(session, flush_context):
+    """Remember inserted and deleted rows per table until the session commits."""
+    if not system_status.tracks(session.bind):
+        return
+    deltas = session.info.setdefault("row_count_deltas", Counter())
+    for obj in session.new:
+        deltas[inspect(obj).mapper.local_table.name] += 1
+    for obj in session.deleted:
+        deltas[inspect(obj).mapper.local_table.name] -= 1
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_row_changes(session):
+    deltas = session.info.pop("row_count_deltas", None)
+    if deltas:
+        system_status.apply_changes(deltas)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _drop_row_changes(session, previous_transaction):
+    session.info.pop("row_count_deltas", None)
@@ -1,28 +1,52 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from database import get_db
+from typing import Optional
+from fastapi import APIRouter, Depends, Query, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_async_db
 from auth import get_current_user
+from pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, parse_sort, keyset_page, page_rows, etag_response
 
 router = APIRouter()
 
 @router.get("/tasks")
 async def get_tasks(
-    db: Session = Depends(get_db),
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    sort: str = "-created_at",
+    status: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """
-    Get all tasks for the current user
+    Get the current user's tasks, one page at a time (newest first by default).
+    Pass next_cursor back as cursor for the following page.
     """
     from .models import TaskModel
-    tasks = db.query(TaskModel).filter(
-        TaskModel.user_id == current_user.id
-    ).all()
-    return {"tasks": tasks}
+    sort_name, sort_column, descending = parse_sort(sort, {
+        "created_at": TaskModel.created_at,
+        "title": TaskModel.title,
+        "id": TaskModel.id
+    })
+    
+    stmt = select(
+        TaskModel.id, TaskModel.title, TaskModel.description, TaskModel.status,
+        TaskModel.created_at, TaskModel.updated_at
+    ).where(TaskModel.user_id == current_user.id)
+    if status:
+        stmt = stmt.where(TaskModel.status == status)
+    
+    rows = (await db.execute(keyset_page(stmt, sort_column, TaskModel.id, descending, cursor, limit))).all()
+    rows, next_cursor = page_rows(rows, limit, sort_name)
+    return etag_response(request, {
+        "tasks": [dict(row._mapping, user_id=current_user.id) for row in rows],
+        "next_cursor": next_cursor
+    })
 
 @router.post("/tasks")
 async def create_task(
     task_data: dict,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """
@@ -31,25 +55,25 @@ async def create_task(
     from .models import TaskModel
     new_task = TaskModel(user_id=current_user.id, **task_data)
     db.add(new_task)
-    db.commit()
-    db.refresh(new_task)
+    await db.commit()
+    await db.refresh(new_task)
     return {"task": new_task}
 
 @router.put("/tasks/{task_id}")
 async def update_task(
     task_id: int,
     task_data: dict,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """
     Update an existing task
     """
     from .models import TaskModel
-    task = db.query(TaskModel).filter(
+    task = await db.scalar(select(TaskModel).where(
         TaskModel.id == task_id,
         TaskModel.user_id == current_user.id
-    ).first()
+    ))
     
     if not task:
         return {"error": "Task not found"}
@@ -57,28 +81,28 @@ async def update_task(
     for key, value in task_data.items():
         setattr(task, key, value)
     
-    db.commit()
-    db.refresh(task)
+    await db.commit()
+    await db.refresh(task)
     return {"task": task}
 
 @router.delete("/tasks/{task_id}")
 async def delete_task(
     task_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """
     Delete a task
     """
     from .models import TaskModel
-    task = db.query(TaskModel).filter(
+    task = await db.scalar(select(TaskModel).where(
         TaskModel.id == task_id,
         TaskModel.user_id == current_user.id
-    ).first()
+    ))
     
     if not task:
         return {"error": "Task not found"}
     
-    db.delete(task)
-    db.commit()
+    await db.delete(task)
+    await db.commit()
     return {"message": "Task deleted successfully"}
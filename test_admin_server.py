@@ -0,0 +1,82 @@
+"""
+Admin server test script.
+
+Runs admin_server on a free port over a throwaway status snapshot and checks:
+1. The dashboard page and /api/status are gzipped for clients that accept it
+2. A repeated request with If-None-Match gets 304 Not Modified
+3. Concurrent clients are served while another request is in flight
+"""
+
+import gzip
+import json
+import socket
+import threading
+import urllib.error
+import urllib.request
+from http.server import ThreadingHTTPServer
+
+import admin_server
+from test_system_status import _make_status
+
+
+def _start_server():
+    """Serve AdminHandler on a free port in a background thread."""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), admin_server.AdminHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def _get(url, **headers):
+    """GET a URL, returning (status, headers, body) for 2xx and 3xx alike."""
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, headers=headers)) as response:
+            return response.status, response.headers, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers, b""
+
+
+def test_gzip_and_etags():
+    """Both responses are gzipped on request and revalidate with 304."""
+    status, _, _ = _make_status()
+    previous, admin_server.system_status = admin_server.system_status, status
+    server, base = _start_server()
+    try:
+        for path in ["/", "/api/status"]:
+            code, headers, body = _get(base + path, **{"Accept-Encoding": "gzip"})
+            assert code == 200
+            assert headers["Content-Encoding"] == "gzip"
+            body = gzip.decompress(body)
+
+            code, _, _ = _get(base + path, **{"If-None-Match": headers["ETag"]})
+            assert code == 304
+
+        assert json.loads(body)["git"]["recent_commits"][0]["message"] == "first"
+        # Serving the same snapshot again neither re-reads git nor re-encodes
+        assert status.stats["git_reads"] == 1
+        assert admin_server.status_response() is admin_server.status_response()
+    finally:
+        server.shutdown()
+        server.server_close()
+        admin_server.system_status = previous
+
+
+def test_slow_request_does_not_block():
+    """A client stuck on a slow connection doesn't hold up the others."""
+    server, base = _start_server()
+    try:
+        # Open a connection and send half a request, so its handler thread waits
+        stalled = socket.create_connection(server.server_address)
+        stalled.sendall(b"GET / HTTP/1.1\r\n")
+
+        code, _, _ = _get(base + "/")
+        assert code == 200
+        stalled.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    test_gzip_and_etags()
+    test_slow_request_does_not_block()
+    print("✓ ALL ADMIN SERVER TESTS PASSED!")
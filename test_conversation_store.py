@@ -0,0 +1,173 @@
+"""
+Conversation store test script.
+
+Verifies server-side POC conversation sessions against a throwaway
+in-memory SQLite database:
+1. New sessions are persisted and cached
+2. Cache misses reload state from SQLite without losing messages
+3. Stale saves are rejected with a version conflict
+4. Sessions are only visible to their owner
+5. Conversation state is deferred, and compressed or legacy JSON text decodes
+6. Without DB_COMPRESS_JSON state is stored as JSON text
+"""
+
+import json
+
+import zstandard
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import database
+from database import Base, POCConversation, ZSTD_MAGIC
+from conversation_store import (
+    ConversationStore,
+    ConversationConflictError,
+    ConversationNotFoundError
+)
+
+
+def _make_db():
+    """Create an isolated in-memory database session."""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)()
+
+
+def test_create_and_reload():
+    """A saved session survives a cache miss with its messages intact."""
+    db = _make_db()
+    store = ConversationStore()
+
+    session = store.create(db, user_id=1)
+    session.memory.chat_memory.add_user_message("I want an expense tracker")
+    session.memory.chat_memory.add_ai_message("Who will use it?")
+    session.stage = "initial_requirements"
+    assert store.save(db, session) == 2
+
+    store.evict(session.conversation_id)
+    reloaded = store.get(db, session.conversation_id, user_id=1)
+
+    assert reloaded is not session
+    assert reloaded.version == 2
+    assert reloaded.stage == "initial_requirements"
+    assert [m.content for m in reloaded.memory.chat_memory.messages] == [
+        "I want an expense tracker",
+        "Who will use it?"
+    ]
+
+
+def test_cache_hit_reuses_live_session():
+    """A hot session is returned as-is, without touching memory."""
+    db = _make_db()
+    store = ConversationStore()
+
+    session = store.create(db, user_id=1)
+    assert store.get(db, session.conversation_id, user_id=1) is session
+
+
+def test_stale_save_conflicts():
+    """Saving a session loaded before another save raises a conflict."""
+    db = _make_db()
+    store = ConversationStore()
+
+    session = store.create(db, user_id=1)
+    db.query(POCConversation).filter(
+        POCConversation.conversation_id == session.conversation_id
+    ).update({POCConversation.version: 5})
+    db.commit()
+
+    try:
+        store.save(db, session)
+        assert False, "expected ConversationConflictError"
+    except ConversationConflictError:
+        pass
+
+    # Stale copy is evicted so the next read picks up version 5
+    assert store.get(db, session.conversation_id, user_id=1).version == 5
+
+
+def test_other_user_cannot_load():
+    """Conversations are scoped to their owner."""
+    db = _make_db()
+    store = ConversationStore()
+
+    session = store.create(db, user_id=1)
+    for evict in (False, True):
+        if evict:
+            store.evict(session.conversation_id)
+        try:
+            store.get(db, session.conversation_id, user_id=2)
+            assert False, "expected ConversationNotFoundError"
+        except ConversationNotFoundError:
+            pass
+
+
+def test_state_deferred_and_compressed():
+    """Rows load without their state; compressed and legacy JSON state both reload."""
+    # The storage mode is fixed when an engine first uses the column type
+    database.DB_COMPRESS_JSON = True
+    try:
+        db = _make_db()
+        store = ConversationStore()
+        session = store.create(db, user_id=1)
+        for i in range(50):
+            session.memory.chat_memory.add_user_message(f"Requirement number {i} for the expense tracker")
+        store.save(db, session)
+
+        db.expunge_all()
+        row = db.query(POCConversation).first()
+        assert "conversation_history" not in row.__dict__
+
+        stored = db.connection().exec_driver_sql("SELECT conversation_history FROM poc_conversations").scalar()
+        assert stored[:4] == ZSTD_MAGIC
+        assert len(stored) < len(json.dumps(session.to_state()))
+
+        store.evict(session.conversation_id)
+        assert len(store.get(db, session.conversation_id, user_id=1).memory.chat_memory.messages) == 50
+
+        # Rows written with compression off hold JSON text
+        legacy = session.to_state()
+        db.connection().exec_driver_sql(
+            "UPDATE poc_conversations SET conversation_history = ?", (json.dumps(legacy),)
+        )
+        store.evict(session.conversation_id)
+        assert store.get(db, session.conversation_id, user_id=1).stage == legacy["stage"]
+    finally:
+        database.DB_COMPRESS_JSON = False
+
+
+def test_state_stored_as_json_by_default():
+    """Compression off writes JSON text, and rows compressed earlier still load."""
+    db = _make_db()
+    store = ConversationStore()
+    session = store.create(db, user_id=1)
+    session.memory.chat_memory.add_user_message("Track expenses")
+    store.save(db, session)
+
+    kind, stored = db.connection().exec_driver_sql(
+        "SELECT typeof(conversation_history), conversation_history FROM poc_conversations"
+    ).one()
+    assert kind == "text"
+    assert json.loads(stored)["memory"]["messages"][0]["content"] == "Track expenses"
+
+    compressed = zstandard.compress(json.dumps(session.to_state()).encode())
+    db.connection().exec_driver_sql(
+        "UPDATE poc_conversations SET conversation_history = ?", (compressed,)
+    )
+    store.evict(session.conversation_id)
+    assert len(store.get(db, session.conversation_id, user_id=1).memory.chat_memory.messages) == 1
+
+if __name__ == "__main__":
+    test_create_and_reload()
+    test_cache_hit_reuses_live_session()
+    test_stale_save_conflicts()
+    test_other_user_cannot_load()
+    test_state_deferred_and_compressed()
+    test_state_stored_as_json_by_default()
+    print("✓ ALL CONVERSATION STORE TESTS PASSED!")
@@ -0,0 +1,201 @@
+"""
+LLM client pool test script (offline).
+
+Runs a tiny local HTTP server standing in for OpenAI and verifies:
+1. Chat models share one client and reuse keep-alive connections
+2. Rate-limited requests are retried and succeed
+3. Latency and failures are recorded per model
+4. Traced calls record call site, model, tokens, retries and request ids
+5. Routed call sites fall back to the next model when one is rate limited
+"""
+
+import os
+import json
+import threading
+from functools import partial
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-test-offline")
+
+from agents import llm_clients
+from agents.llm_clients import get_chat_model, get_http_client, llm_metrics
+from agents.prompt_registry import PromptRegistry
+from agents.llm_tracing import start_request, set_conversation, llm_call, trace_store, summarize_calls
+
+# Keep backoff short for tests
+llm_clients.RETRY_BASE_DELAY = 0.01
+
+
+class MockOpenAIHandler(BaseHTTPRequestHandler):
+    """Answers chat completions; fails the first N requests with 429."""
+
+    protocol_version = "HTTP/1.1"
+    fail_remaining = 0
+    unavailable_models = set()
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+
+        if body["model"] in MockOpenAIHandler.unavailable_models:
+            self._send(429, {"error": {"message": "rate limited", "type": "rate_limit"}})
+            return
+
+        if MockOpenAIHandler.fail_remaining > 0:
+            MockOpenAIHandler.fail_remaining -= 1
+            self._send(429, {"error": {"message": "rate limited", "type": "rate_limit"}})
+            return
+
+        self._send(200, {
+            "id": "chatcmpl-test",
+            "object": "chat.completion",
+            "created": 0,
+            "model": body["model"],
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": "ok"},
+                "finish_reason": "stop"
+            }],
+            "usage": {"prompt_tokens": 5, "completion_tokens": 1, "total_tokens": 6}
+        })
+
+    def _send(self, status, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("x-request-id", "req_test")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def _start_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockOpenAIHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def test_pooled_clients_reuse_connections():
+    """Many calls across two models open a single connection."""
+    server = _start_server()
+    try:
+        llm_metrics.reset()
+        base_url = f"http://127.0.0.1:{server.server_port}/v1"
+        fast = get_chat_model("gpt-3.5-turbo", temperature=0.7, base_url=base_url)
+        vision = get_chat_model("gpt-4o", temperature=0.3, base_url=base_url)
+
+        assert get_chat_model("gpt-3.5-turbo", temperature=0.7, base_url=base_url) is fast
+        assert fast.http_client is get_http_client() is vision.http_client
+
+        for _ in range(5):
+            assert fast.invoke("hi").content == "ok"
+        assert vision.invoke("hi").content == "ok"
+
+        snapshot = llm_metrics.snapshot()
+        assert snapshot["models"]["gpt-3.5-turbo"]["calls"] == 5
+        assert snapshot["models"]["gpt-4o"]["calls"] == 1
+        assert snapshot["connections_opened"] == 1
+    finally:
+        server.shutdown()
+
+
+def test_rate_limit_retried_with_backoff():
+    """429 responses are retried and counted; giving up counts a failure."""
+    server = _start_server()
+    try:
+        llm_metrics.reset()
+        base_url = f"http://127.0.0.1:{server.server_port}/v1"
+        llm = get_chat_model("gpt-3.5-turbo", temperature=0.0, base_url=base_url)
+
+        MockOpenAIHandler.fail_remaining = 2
+        assert llm.invoke("hi").content == "ok"
+
+        MockOpenAIHandler.fail_remaining = llm_clients.MAX_RETRIES + 1
+        try:
+            llm.invoke("hi")
+            assert False, "expected rate limit error"
+        except Exception as e:
+            assert "rate limited" in str(e)
+        MockOpenAIHandler.fail_remaining = 0
+
+        stats = llm_metrics.snapshot()["models"]["gpt-3.5-turbo"]
+        assert stats["calls"] == 2
+        assert stats["retries"] == 2 + llm_clients.MAX_RETRIES
+        assert stats["failures"] == 1
+    finally:
+        server.shutdown()
+
+
+def test_llm_calls_traced_per_conversation():
+    """Call records carry call site, usage, retries and request ids."""
+    server = _start_server()
+    try:
+        trace_store.reset()
+        base_url = f"http://127.0.0.1:{server.server_port}/v1"
+        llm = get_chat_model("gpt-3.5-turbo", temperature=0.1, base_url=base_url)
+
+        trace = start_request("api-req-1")
+        set_conversation("conv_trace")
+        MockOpenAIHandler.fail_remaining = 1
+        with llm_call("requirements_extraction"):
+            llm.invoke("hi")
+        with llm_call("conversation"):
+            llm.invoke("hello")
+
+        calls = trace_store.conversation_calls("conv_trace")
+        assert [c["call_site"] for c in calls] == ["requirements_extraction", "conversation"]
+        first = calls[0]
+        assert first["model"] == "gpt-3.5-turbo"
+        assert first["prompt_tokens"] == 5 and first["completion_tokens"] == 1
+        assert first["retries"] == 1
+        assert first["request_id"] == "api-req-1"
+        assert first["openai_request_ids"] == ["req_test"]
+        assert len(trace.calls) == 2
+
+        summary = summarize_calls(calls)
+        assert summary["totals"]["calls"] == 2
+        assert {s["call_site"] for s in summary["by_call_site"]} == {"requirements_extraction", "conversation"}
+        assert summary["by_call_site"][0]["latency_share"] >= 0.5
+
+        metrics = trace_store.prometheus()
+        assert 'poc_llm_calls_total{call_site="conversation",model="gpt-3.5-turbo"} 1' in metrics
+        assert 'poc_llm_retries_total{call_site="requirements_extraction",model="gpt-3.5-turbo"} 1' in metrics
+    finally:
+        server.shutdown()
+
+
+def test_routed_model_falls_back():
+    """A rate-limited primary model hands the call to its fallback."""
+    server = _start_server()
+    try:
+        llm_metrics.reset()
+        base_url = f"http://127.0.0.1:{server.server_port}/v1"
+        registry = PromptRegistry(
+            os.path.join(os.path.dirname(__file__), "agents", "poc_agent_prompts.json"),
+            partial(get_chat_model, base_url=base_url)
+        )
+        route = registry.prompts["model_routing"]["call_sites"]["prd_content"]
+        assert registry.model("prd_content").runnable.max_tokens == route["max_tokens"]
+
+        MockOpenAIHandler.unavailable_models = {route["model"]}
+        result = registry.chain("prd_content").invoke({
+            "requirements": "{}", "feature_name": "demo", "timestamp": "now"
+        })
+        assert result.content == "ok"
+
+        models = llm_metrics.snapshot()["models"]
+        assert models[route["model"]]["failures"] == 1
+        assert models[route["fallbacks"][0]]["calls"] == 1
+    finally:
+        MockOpenAIHandler.unavailable_models = set()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    test_pooled_clients_reuse_connections()
+    test_rate_limit_retried_with_backoff()
+    test_llm_calls_traced_per_conversation()
+    test_routed_model_falls_back()
+    print("✓ ALL LLM CLIENT TESTS PASSED!")
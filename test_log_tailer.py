@@ -0,0 +1,120 @@
+"""
+Log tailer test script.
+
+Verifies the incremental setup_progress.log reader behind /progress:
+1. Polls parse only appended bytes, and a line is parsed once it's complete
+2. The parsed state matches the PROGRESS/DONE/DOWNLOAD_PROGRESS/COMPLETE format
+3. Rewriting the log (a new automation run) starts the state over
+4. read_log returns deltas by position without splitting UTF-8 characters
+5. Every reader, including those of a restarted server, detects a rewrite
+"""
+
+import os
+import tempfile
+
+from log_tailer import ProgressLogTailer, parse_position
+
+
+def _make_tailer():
+    """Tailer over a log file in a throwaway directory."""
+    path = os.path.join(tempfile.mkdtemp(), "setup_progress.log")
+    return ProgressLogTailer(path), path
+
+
+def _append(path, text):
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(text)
+
+
+def test_incremental_progress():
+    """New output is parsed once; idle polls parse nothing."""
+    tailer, path = _make_tailer()
+    assert tailer.poll() is False
+
+    _append(path, "PROGRESS:Installing Git\nPROGRESS:Installing GitHub CLI\nDOWNLOAD_PROGRESS:GitHub CLI:4")
+    tailer.poll()
+    state = tailer.progress()
+    assert [p["task"] for p in state["progress"]] == ["Installing Git", "Installing GitHub CLI"]
+    assert state["progress"][1]["progress"] == 0  # the download line isn't complete yet
+
+    _append(path, "0\nDONE:Installing Git\n")
+    tailer.poll()
+    parsed = tailer.stats["bytes_parsed"]
+    for _ in range(5):
+        tailer.poll()
+    assert tailer.stats["bytes_parsed"] == parsed
+
+    state = tailer.progress()
+    assert state["progress"][0] == {"task": "Installing Git", "status": "done", "progress": 100}
+    assert state["progress"][1]["progress"] == 40
+
+    _append(path, "! First copy your one-time code: AB12-CD34\n"
+                  "- Open this URL to continue in your web browser: https://github.com/login/device\n"
+                  "COMPLETE:https://example.azurewebsites.net\n")
+    tailer.poll()
+    state = tailer.progress()
+    assert state["complete"] and state["url"] == "https://example.azurewebsites.net"
+    assert state["device_codes"] == {"github": {"code": "AB12-CD34", "url": "https://github.com/login/device"}}
+    assert tailer.stats["bytes_parsed"] == os.path.getsize(path)
+
+
+def test_rewrite_resets_state():
+    """A log rewritten from scratch, even to a longer file, is parsed from the start."""
+    tailer, path = _make_tailer()
+    _append(path, "PROGRESS:Old run step\n")
+    tailer.poll()
+
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("PROGRESS:New run step one\nPROGRESS:New run step two\n")
+    tailer.poll()
+
+    assert [p["task"] for p in tailer.progress()["progress"]] == ["New run step one", "New run step two"]
+    assert tailer.stats["resets"] == 1
+
+
+def test_read_log_deltas():
+    """Reads continue from the returned position and never end mid-character."""
+    tailer, path = _make_tailer()
+    assert tailer.read_log("0") == (None, "0", False)
+
+    _append(path, "[12:00] ✓ done\r")
+    size = os.path.getsize(path)
+    first, position, reset = tailer.read_log("0", limit=len("[12:00] ") + 1)
+    assert first == b"[12:00] " and not reset  # the 3-byte ✓ isn't split
+
+    rest, position, _ = tailer.read_log(position)
+    assert rest.decode() == "✓ done"  # the \r waits for a possible \n
+    _append(path, "\n")
+    rest, position, _ = tailer.read_log(position)
+    assert rest == b"\r\n" and parse_position(position)[1] == size + 1
+    assert tailer.read_log(position) == (b"", position, False)
+
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("new\n")
+    data, position, reset = tailer.read_log(position)
+    assert (data, parse_position(position)[1], reset) == (b"new\n", 4, True)
+
+
+def test_rewrite_detected_by_every_reader():
+    """Two clients, and clients of a restarted server, each see a rewrite longer than their offset."""
+    tailer, path = _make_tailer()
+    _append(path, "Starting automation... (2026-01-01 12:00:00)\nold run output\n")
+    _, first_client, _ = tailer.read_log("0")
+    _, second_client, _ = tailer.read_log("0")
+
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("Starting automation... (2026-01-01 12:30:00)\nnew run, with a lot more output\n")
+    for position in (first_client, second_client):
+        data, _, reset = tailer.read_log(position)
+        assert reset and data.startswith(b"Starting automation... (2026-01-01 12:30:00)")
+
+    restarted = ProgressLogTailer(path)
+    data, _, reset = restarted.read_log(first_client)
+    assert reset and data.startswith(b"Starting")
+
+if __name__ == "__main__":
+    test_incremental_progress()
+    test_rewrite_resets_state()
+    test_read_log_deltas()
+    test_rewrite_detected_by_every_reader()
+    print("✓ ALL LOG TAILER TESTS PASSED!")
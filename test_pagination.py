@@ -0,0 +1,158 @@
+"""
+Pagination test script.
+
+Verifies the keyset-paginated list endpoints against a throwaway database:
+1. Walking /api/poc/documents with next_cursor returns every row once, newest first
+2. Sort and filter parameters are applied, and bad ones are rejected
+3. A repeated request with If-None-Match gets 304, and a change gives a new ETag
+4. List queries never read content_text
+5. /api/poc/conversations pages by cursor without counting or reading state
+"""
+
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app import app
+from database import Base, User, Document, POCConversation, get_db
+from auth_utils import create_access_token
+from user_cache import user_cache
+
+
+def _make_client(documents: int = 7):
+    """Create a test client on an isolated database with one user's documents."""
+    path = os.path.join(tempfile.mkdtemp(), "test.db")
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+
+    queries = []
+    event.listen(engine, "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: queries.append(statement))
+
+    def override_get_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    user_cache.clear()
+
+    db = Session()
+    user = User(username="alice", password_hash="x", is_admin=False)
+    db.add(user)
+    db.flush()
+    start = datetime(2025, 1, 1)
+    for i in range(documents):
+        # Two documents share each timestamp, so the id tie-breaker matters
+        db.add(Document(user_id=user.id, filename=f"doc{i}.{'pdf' if i % 2 else 'txt'}", file_path=f"/tmp/doc{i}",
+                        content_text="x" * 1000, file_type="pdf" if i % 2 else "txt",
+                        created_at=start + timedelta(minutes=i // 2)))
+    db.commit()
+    # get_current_user finds the user in its cache, so the app database is never read
+    user_cache.put_user(user)
+    headers = {"Authorization": "Bearer " + create_access_token(
+        data={"sub": str(user.id), "username": "alice", "is_admin": False}
+    )}
+    db.close()
+    return TestClient(app), headers, queries, Session
+
+
+def test_cursor_walk():
+    """Pages of three cover all seven documents once, newest first."""
+    client, headers, queries, _ = _make_client()
+    seen = []
+    cursor = None
+    pages = 0
+
+    while True:
+        params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+        data = client.get("/api/poc/documents", headers=headers, params=params).json()
+        seen += data["documents"]
+        cursor = data["next_cursor"]
+        pages += 1
+        if not cursor:
+            break
+
+    assert pages == 3
+    assert len({doc["id"] for doc in seen}) == 7
+    keys = [(doc["created_at"], doc["id"]) for doc in seen]
+    assert keys == sorted(keys, reverse=True)
+    assert not [q for q in queries if "content_text" in q and "FROM documents" in q]
+
+
+def test_sort_and_filter():
+    """sort and file_type are applied; unknown sort fields are a 400."""
+    client, headers, _, _ = _make_client()
+
+    data = client.get("/api/poc/documents", headers=headers, params={"sort": "filename", "file_type": "pdf"}).json()
+    names = [doc["filename"] for doc in data["documents"]]
+    assert names == ["doc1.pdf", "doc3.pdf", "doc5.pdf"]
+
+    response = client.get("/api/poc/documents", headers=headers, params={"sort": "content_text"})
+    assert response.status_code == 400
+    response = client.get("/api/poc/documents", headers=headers, params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+
+def test_etag_not_modified():
+    """Unchanged lists answer 304; a new document changes the ETag."""
+    client, headers, _, Session = _make_client()
+
+    first = client.get("/api/poc/documents", headers=headers)
+    etag = first.headers["ETag"]
+    again = client.get("/api/poc/documents", headers={**headers, "If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.content == b""
+
+    db = Session()
+    db.add(Document(user_id=1, filename="new.txt", file_path="/tmp/new", file_type="txt"))
+    db.commit()
+    db.close()
+
+    changed = client.get("/api/poc/documents", headers={**headers, "If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+
+
+def test_conversation_pages():
+    """Conversations are walked by cursor, filtered by POC, and never counted or loaded whole."""
+    client, headers, queries, Session = _make_client()
+    db = Session()
+    start = datetime(2025, 1, 1)
+    for i in range(5):
+        db.add(POCConversation(conversation_id=f"conv_{i}", user_id=1, poc_id=None,
+                               created_at=start + timedelta(minutes=i), conversation_history={"stage": "greeting"}))
+    db.commit()
+    db.close()
+    queries.clear()
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        data = client.get("/api/poc/conversations", headers=headers, params=params).json()
+        assert "total" not in data
+        seen += [conv["conversation_id"] for conv in data["conversations"]]
+        cursor = data["next_cursor"]
+        if not cursor:
+            break
+
+    assert seen == [f"conv_{i}" for i in reversed(range(5))]
+    assert not [q for q in queries if "FROM poc_conversations" in q and ("count(" in q or "conversation_history" in q)]
+    assert client.get("/api/poc/conversations", headers=headers, params={"poc_id": 1}).json()["conversations"] == []
+    assert client.get("/api/poc/conversations", headers=headers, params={"sort": "updated_at"}).status_code == 400
+
+
+if __name__ == "__main__":
+    test_cursor_walk()
+    test_sort_and_filter()
+    test_etag_not_modified()
+    test_conversation_pages()
+    app.dependency_overrides.clear()
+    print("✓ ALL PAGINATION TESTS PASSED!")
@@ -0,0 +1,209 @@
+"""
+POC Agent test script (offline).
+
+Verifies agent behaviour that doesn't need OpenAI:
+1. Approval / "what's next" turns are answered from templates
+2. Turns carrying new information still go through the LLM
+3. Structured outputs are validated, repaired once, and failures counted
+4. Wireframes are downscaled and their analyses cached by exact image content
+5. Each conversation's request gets its own agent state
+"""
+
+import base64
+import hashlib
+import io
+import os
+import tempfile
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-test-offline")
+
+from agents.poc_agent import POCAgent
+from agents.schemas import ContradictionAnalysis
+from agents.structured_output import parse_structured, StructuredOutputError
+from agents.llm_tracing import trace_store
+from agents.schemas import WireframeAnalysis
+from agents.wireframe_images import prepare_image, WireframeCache, MAX_SIDE
+from conversation_store import ConversationSession
+
+
+class FailingLLM:
+    """Stand-in LLM that fails the test if it is ever called."""
+
+    def __getattr__(self, name):
+        raise AssertionError(f"LLM should not be used on the fast path (called {name})")
+
+
+def _make_agent(stage: str) -> POCAgent:
+    agent = POCAgent()
+    agent.conversation_id = "conv_test"
+    agent.conversation_stage = stage
+    agent.requirements = {"goal": "Track expenses", "users": "Individuals"}
+    agent.memory.chat_memory.add_ai_message("Hello! What would you like to create?")
+    agent.llm = FailingLLM()
+    return agent
+
+
+def test_pure_flow_turns_detected():
+    """Only short approval / next messages qualify for the fast path."""
+    agent = _make_agent("backend_requirements")
+
+    assert agent._is_pure_flow_turn("Yes, sounds good!")
+    assert agent._is_pure_flow_turn("ok what's next?")
+    assert agent._is_pure_flow_turn("perfect thanks")
+    assert not agent._is_pure_flow_turn("yes but add a reports page")
+    assert not agent._is_pure_flow_turn("Store receipts and categories")
+    assert not agent._is_pure_flow_turn("yesterday")
+
+
+def test_fast_path_moves_stage_without_llm():
+    """Approvals advance the stage with a templated reply."""
+    agent = _make_agent("frontend_requirements")
+
+    result = agent.process_request("Sounds good!", user_id="test_user")
+    assert agent.conversation_stage == "backend_requirements"
+    assert result["next_action"] == "continue_chat"
+    assert "backend" in result["response"].lower()
+
+    result = agent.process_request("what's next?", user_id="test_user")
+    assert agent.conversation_stage == "requirements_review"
+    assert result["next_action"] == "present_requirements"
+    assert "Track expenses" in result["response"]
+
+    result = agent.process_request("yes", user_id="test_user")
+    assert agent.conversation_stage == "ready_to_generate"
+    assert "generate prd" in result["response"]
+
+    # Fast path turns are still recorded in memory
+    contents = [msg.content for msg in agent.memory.chat_memory.messages]
+    assert "Sounds good!" in contents and "yes" in contents
+
+
+def test_fast_path_skipped_without_template():
+    """A bare approval in the greeting stage falls through to the LLM."""
+    agent = _make_agent("greeting")
+
+    assert agent._try_fast_path("yes") is None
+    assert agent.conversation_stage == "greeting"
+    assert agent.message_count == 0
+
+
+def test_structured_output_repair():
+    """Invalid JSON gets one repair attempt; a second failure raises and is counted."""
+    trace_store.reset()
+    
+    result = parse_structured('{"has_contradictions": true}', ContradictionAnalysis, "contradiction_detection")
+    assert result.has_contradictions and result.contradictions == []
+    
+    repairs = []
+    def repair(reply, error, schema):
+        repairs.append(reply)
+        return '{"has_contradictions": true, "contradictions": ["Offline but real-time sync"]}'
+    
+    result = parse_structured('Here you go: {"has_contradictions": tru', ContradictionAnalysis,
+                              "contradiction_detection", repair)
+    assert result.contradictions == ["Offline but real-time sync"]
+    assert len(repairs) == 1
+    
+    try:
+        parse_structured('{"has_contradictions": "maybe"}', ContradictionAnalysis,
+                         "contradiction_detection", lambda r, e, s: "still not json")
+        assert False, "expected StructuredOutputError"
+    except StructuredOutputError:
+        pass
+    
+    metrics = trace_store.prometheus()
+    assert 'poc_llm_structured_outputs_total{call_site="contradiction_detection",outcome="repaired"} 1' in metrics
+    assert 'poc_llm_parse_failures_total{call_site="contradiction_detection"} 2' in metrics
+
+
+def test_wireframe_downscale_and_cache():
+    """Large wireframes are downscaled; re-saved copies reuse the cached analysis, other wireframes don't."""
+    from PIL import Image, ImageDraw
+    
+    tmp = tempfile.mkdtemp()
+    
+    def draw_form(name, title, button):
+        wireframe = Image.new("RGB", (3000, 2000), "white")
+        draw = ImageDraw.Draw(wireframe)
+        draw.rectangle([100, 100, 2900, 300], outline="black", width=8)
+        draw.rectangle([100, 400, 900, 1900], fill="lightgray", outline="black", width=8)
+        draw.text((1200, 500), title, fill="black")
+        draw.rectangle([1200, 900, 1800, 1000], outline="black", width=4)
+        draw.text((1250, 940), button, fill="black")
+        path = os.path.join(tmp, name)
+        wireframe.save(path)
+        return path, wireframe
+    
+    png_path, wireframe = draw_form("login.png", "Login to your account", "Sign in")
+    resaved_path = os.path.join(tmp, "login_copy.png")
+    wireframe.save(resaved_path, compress_level=1)
+    register_path, _ = draw_form("register.png", "Create a new account", "Register")
+    
+    image = prepare_image(png_path)
+    assert len(image.data) < os.path.getsize(png_path)
+    assert max(Image.open(io.BytesIO(image.data)).size) <= MAX_SIDE
+    assert prepare_image(resaved_path).sha256 == image.sha256
+    assert prepare_image(register_path).sha256 != image.sha256
+    
+    agent = _make_agent("requirements")
+    agent.wireframe_cache = WireframeCache(cache_dir=os.path.join(tmp, "cache"))
+    calls = []
+    def fake_vision(chain_name, inputs, schema):
+        data = base64.b64decode(inputs["image_data"])
+        calls.append(data)
+        layout = "Sign-in form" if hashlib.sha256(data).hexdigest() == image.sha256 else "Registration form"
+        return WireframeAnalysis(layout=layout, components=["header", "sidebar", "form"])
+    agent._invoke_structured = fake_vision
+    
+    results = agent.analyze_wireframes([png_path, png_path])
+    assert [r["layout"] for r in results] == ["Sign-in form"] * 2
+    assert 1 <= len(calls) <= 2
+    
+    # Sequentially: the same image and a re-saved copy are cache hits
+    calls.clear()
+    assert agent.analyze_wireframe(png_path)["layout"] == "Sign-in form"
+    assert agent.analyze_wireframe(resaved_path)["layout"] == "Sign-in form"
+    assert calls == []
+    
+    # A different wireframe with the same layout gets its own analysis
+    assert agent.analyze_wireframe(register_path)["layout"] == "Registration form"
+    assert len(calls) == 1
+    
+    # A fresh cache instance reads the entry back from disk
+    calls.clear()
+    agent.wireframe_cache = WireframeCache(cache_dir=os.path.join(tmp, "cache"))
+    agent.analyze_wireframe(png_path)
+    assert calls == []
+
+
+def test_for_session_isolates_conversations():
+    """Requests for different conversations don't share the agent's conversation state."""
+    shared = POCAgent()
+    shared.llm = FailingLLM()
+    first = ConversationSession("conv_a", user_id=1, stage="frontend_requirements",
+                                requirements={"goal": "Track expenses"})
+    second = ConversationSession("conv_b", user_id=2, stage="greeting")
+    for session in (first, second):
+        session.memory.chat_memory.add_ai_message("Hello! What would you like to create?")
+
+    agent_a = shared.for_session(first)
+    agent_b = shared.for_session(second)
+    assert agent_a is not shared and agent_a.llm is shared.llm
+    assert agent_a.memory is first.memory and agent_b.memory is second.memory
+
+    agent_a.process_request("Sounds good!", user_id="1")
+    agent_a.update_session(first)
+    assert first.stage == "backend_requirements"
+    assert agent_b.conversation_stage == "greeting" and second.stage == "greeting"
+    assert len(second.memory.chat_memory.messages) == 1
+    assert shared.conversation_id is None and shared.memory is not first.memory
+
+
+if __name__ == "__main__":
+    test_pure_flow_turns_detected()
+    test_fast_path_moves_stage_without_llm()
+    test_fast_path_skipped_without_template()
+    test_structured_output_repair()
+    test_wireframe_downscale_and_cache()
+    test_for_session_isolates_conversations()
+    print("✓ ALL POC AGENT TESTS PASSED!")
@@ -0,0 +1,117 @@
+"""
+Query plan test script.
+
+Runs EXPLAIN QUERY PLAN for the hot queries of the API against a migrated
+throwaway SQLite database, and fails if any of them scans a whole table or
+sorts in a temporary B-tree instead of reading an index in order:
+1. POC lookup by (poc_id, user_id) and POC lists by user
+2. Documents by user, newest first, and by (id, user_id)
+3. Conversations by user, newest first, and by conversation_id
+4. Users by username and by email (registration and profile checks)
+5. Phases by POC
+6. Keyset pages of the paginated list endpoints (documents, POCs, conversations, users)
+
+Also checks that the migrations alone build the schema the models declare,
+that each version adds its own DDL, and that a second run applies nothing.
+"""
+
+import os
+import tempfile
+from datetime import datetime
+
+from sqlalchemy import create_engine, inspect, select
+
+from database import User, Document, POC, POCConversation, POCPhase, apply_sqlite_pragmas
+from migrations import MIGRATIONS, applied_versions, migrate, schema_drift
+from pagination import encode_cursor, keyset_page
+
+# A cursor from the middle of a list, as the second page of an endpoint sends it
+CURSOR = encode_cursor(datetime(2025, 1, 1), 100)
+
+HOT_QUERIES = {
+    "poc_by_user_and_poc_id": select(POC).where(POC.poc_id == "poc_1", POC.user_id == 1),
+    "pocs_by_user": select(POC).where(POC.user_id == 1),
+    "documents_by_user_newest": select(Document.id, Document.filename).where(
+        Document.user_id == 1
+    ).order_by(Document.created_at.desc()).limit(50),
+    "document_by_id_and_user": select(Document).where(Document.id == 1, Document.user_id == 1),
+    "conversations_by_user_newest": select(POCConversation).where(
+        POCConversation.user_id == 1
+    ).order_by(POCConversation.created_at.desc()).limit(20),
+    "conversation_by_id": select(POCConversation).where(POCConversation.conversation_id == "conv_1"),
+    "user_by_username": select(User).where(User.username == "alice"),
+    "user_by_email": select(User).where(User.email == "alice@example.com"),
+    "phases_by_poc": select(POCPhase).where(POCPhase.poc_id == 1),
+    "documents_page": keyset_page(
+        select(Document.id, Document.filename).where(Document.user_id == 1),
+        Document.created_at, Document.id, True, CURSOR, 50
+    ),
+    "pocs_page": keyset_page(
+        select(POC.id, POC.poc_name).where(POC.user_id == 1),
+        POC.created_at, POC.id, True, CURSOR, 50
+    ),
+    "conversations_page": keyset_page(
+        select(POCConversation.id, POCConversation.conversation_id).where(POCConversation.user_id == 1),
+        POCConversation.created_at, POCConversation.id, True, CURSOR, 50
+    ),
+    "users_page": keyset_page(select(User.id, User.username), User.id, User.id, False, CURSOR, 50),
+}
+
+
+def _make_engine(target: int = None):
+    """Create a database on a throwaway file, built by the migrations only."""
+    path = os.path.join(tempfile.mkdtemp(), "plans.db")
+    engine = create_engine(f"sqlite:///{path}")
+    apply_sqlite_pragmas(engine, {"foreign_keys": "ON"})
+    migrate(engine, target=target)
+    return engine
+
+
+def query_plan(conn, statement) -> list:
+    """Return the detail lines of EXPLAIN QUERY PLAN for a statement."""
+    sql = str(statement.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True}))
+    return [row[-1] for row in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + sql)]
+
+
+def test_hot_queries_use_indexes():
+    """No hot query scans a table or sorts outside an index."""
+    engine = _make_engine()
+    problems = {}
+
+    with engine.connect() as conn:
+        for name, statement in HOT_QUERIES.items():
+            plan = query_plan(conn, statement)
+            bad = [line for line in plan if line.startswith("SCAN") or "TEMP B-TREE" in line]
+            if bad:
+                problems[name] = plan
+            print(f"  {name:32} {' | '.join(plan)}")
+
+    assert not problems, f"Full scans or sorts: {problems}"
+
+
+def test_migrations_recorded():
+    """A fresh database records every migration, and migrating again is a no-op."""
+    engine = _make_engine()
+
+    with engine.connect() as conn:
+        assert applied_versions(conn) == {m.version for m in MIGRATIONS}
+    assert migrate(engine) == []
+
+
+def test_migrations_build_model_schema():
+    """Replaying the migrations gives every column, index and foreign key of the models."""
+    engine = _make_engine(target=3)
+    with engine.connect() as conn:
+        assert "idx_poc_user_created" not in {idx["name"] for idx in inspect(conn).get_indexes("pocs")}
+        assert schema_drift(conn) == ["index idx_poc_user_created on pocs"]
+
+    assert migrate(engine) == [4, 5]
+    with engine.connect() as conn:
+        assert schema_drift(conn) == []
+
+
+if __name__ == "__main__":
+    test_hot_queries_use_indexes()
+    test_migrations_recorded()
+    test_migrations_build_model_schema()
+    print("✓ ALL QUERY PLAN TESTS PASSED!")
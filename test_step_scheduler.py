@@ -0,0 +1,188 @@
+"""
+Step scheduler test script.
+
+Verifies the dependency-aware scheduler behind AutomationService.run_automation:
+1. Independent steps run at the same time, dependent ones in order
+2. Failed steps are retried, and a step that keeps failing stops its dependents
+3. A failed run resumes from the failing step using its log checkpoints
+4. Cycles and unknown dependencies are rejected
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+
+import automation_service
+from automation_service import AutomationService
+from log_tailer import ProgressLogTailer
+from step_scheduler import Step, StepScheduler, read_checkpoints
+
+
+def _recorder():
+    """Checkpoint lines collected in a list (thread-safe)."""
+    lines = []
+    lock = threading.Lock()
+
+    def record(line):
+        with lock:
+            lines.append(line)
+    return lines, record
+
+
+def test_parallel_and_ordered():
+    """Two 0.2s steps overlap; the step depending on both starts after them."""
+    order = []
+    lines, record = _recorder()
+
+    def work(name):
+        def run():
+            time.sleep(0.2)
+            order.append(name)
+        return run
+
+    scheduler = StepScheduler([
+        Step("a", work("a")),
+        Step("b", work("b")),
+        Step("c", work("c"), depends_on=["a", "b"]),
+    ], record=record, log=lambda message: None)
+
+    started = time.perf_counter()
+    assert scheduler.run()
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 0.55, f"steps ran in sequence ({elapsed:.2f}s)"
+    assert order[-1] == "c"
+    assert set(scheduler.timings) == {"a", "b", "c"}
+    assert lines[-1].startswith("RUN_COMPLETE:")
+
+
+def test_retries_and_failure():
+    """A flaky step succeeds on retry; a broken one fails and blocks its dependents."""
+    attempts = {"flaky": 0}
+    ran = []
+    lines, record = _recorder()
+
+    def flaky():
+        attempts["flaky"] += 1
+        if attempts["flaky"] == 1:
+            raise RuntimeError("network hiccup")
+
+    scheduler = StepScheduler([
+        Step("flaky", flaky, retries=1, retry_delay=0),
+        Step("broken", lambda: False, retries=1, retry_delay=0),
+        Step("after_broken", lambda: ran.append("after_broken"), depends_on=["broken"]),
+    ], record=record, log=lambda message: None)
+
+    assert scheduler.run() is False
+    assert scheduler.failed == "broken"
+    assert attempts["flaky"] == 2 and not ran
+    assert "STEP_RETRY:flaky:1:network hiccup" in lines
+    assert any(line.startswith("STEP_FAILED:broken:") for line in lines)
+
+
+def test_resume_from_checkpoints():
+    """Rerunning with the same key only runs the failed step and what depends on it."""
+    ran = []
+    fail = {"deps": True}
+    lines, record = _recorder()
+
+    def step(name):
+        def run():
+            if name == "deps" and fail["deps"]:
+                return False
+            ran.append(name)
+        return run
+
+    def make_scheduler():
+        return StepScheduler([
+            Step("venv", step("venv")),
+            Step("deps", step("deps"), depends_on=["venv"]),
+            Step("frontend", step("frontend")),
+            Step("push", step("push"), depends_on=["deps", "frontend"]),
+        ], record=record, log=lambda message: None)
+
+    lines.append("RUN:key1")
+    assert make_scheduler().run() is False
+    assert sorted(ran) == ["frontend", "venv"]
+
+    completed = read_checkpoints(lines, "key1")
+    assert completed == {"venv", "frontend"}
+    assert read_checkpoints(lines, "other-config") == set()
+
+    fail["deps"] = False
+    ran.clear()
+    lines.append("RUN:key1")
+    assert make_scheduler().run(completed=completed)
+    assert ran == ["deps", "push"]
+    # A finished run isn't resumed
+    assert read_checkpoints(lines, "key1") == set()
+
+
+def test_invalid_graphs():
+    """Cycles and unknown dependencies raise ValueError."""
+    for steps in ([Step("a", print, depends_on=["b"]), Step("b", print, depends_on=["a"])],
+                  [Step("a", print, depends_on=["missing"])]):
+        try:
+            StepScheduler(steps)
+            assert False, "expected ValueError"
+        except ValueError:
+            pass
+
+
+def test_automation_resumes_in_progress_log():
+    """run_automation appends to the log when resuming, and the setup page clears the old error."""
+    work_dir = tempfile.mkdtemp()
+    config_path = os.path.join(work_dir, "user_config.json")
+    with open(config_path, "w") as f:
+        json.dump({"user_identity": {"project_name": "demo"}}, f)
+
+    ran = []
+    fail = {"second": True}
+
+    class FakeService(AutomationService):
+        def steps(self):
+            def second():
+                self._log_progress("PROGRESS:Second step")
+                if fail["second"]:
+                    return False
+                ran.append("second")
+                self._log_progress("DONE:Second step")
+            return [Step("first", lambda: ran.append("first")),
+                    Step("second", second, depends_on=["first"])]
+
+    service = FakeService(config_path)
+    service.progress_log = os.path.join(work_dir, "setup_progress.log")
+    tailer = ProgressLogTailer(service.progress_log)
+    previous, automation_service.TIMINGS_FILE = automation_service.TIMINGS_FILE, os.path.join(work_dir, "timings.jsonl")
+
+    try:
+        assert service.run_automation() is False
+        tailer.poll()
+        assert tailer.progress()["error"]
+
+        fail["second"] = False
+        assert service.run_automation() is True
+    finally:
+        automation_service.TIMINGS_FILE = previous
+    assert ran == ["first", "second"]
+    tailer.poll()
+    state = tailer.progress()
+    assert not state["error"]
+    assert state["progress"] == [{"task": "Second step", "status": "done", "progress": 100}]
+    assert tailer.stats["resets"] == 0
+
+    with open(os.path.join(work_dir, "timings.jsonl")) as f:
+        runs = [json.loads(line) for line in f]
+    assert [run["success"] for run in runs] == [False, True]
+    assert runs[1]["skipped"] == ["first"] and "second" in runs[1]["steps"]
+
+
+if __name__ == "__main__":
+    test_parallel_and_ordered()
+    test_retries_and_failure()
+    test_resume_from_checkpoints()
+    test_invalid_graphs()
+    test_automation_resumes_in_progress_log()
+    print("✓ ALL STEP SCHEDULER TESTS PASSED!")
@@ -0,0 +1,118 @@
+"""
+User cache test script.
+
+Verifies the get_current_user caches against a throwaway SQLite database
+(shared by a sync and an async engine, like the app's):
+1. Repeated authenticated requests do no user lookup queries
+2. A password change drops the cached row, so the next request reloads it
+3. A user deleted by an admin can no longer authenticate with their token
+"""
+
+import os
+import tempfile
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+from app import app
+from database import Base, User, get_db, get_async_db
+from auth_utils import hash_password, create_access_token
+from user_cache import user_cache
+
+
+def _make_client():
+    """Create a test client on an isolated database with a query log."""
+    path = os.path.join(tempfile.mkdtemp(), "test.db")
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    AsyncSession = async_sessionmaker(async_engine, expire_on_commit=False)
+
+    queries = []
+    for sync_engine in [engine, async_engine.sync_engine]:
+        event.listen(sync_engine, "before_cursor_execute",
+                     lambda conn, cursor, statement, *args: queries.append(statement))
+
+    def override_get_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def override_get_async_db():
+        async with AsyncSession() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    user_cache.clear()
+
+    db = Session()
+    users = {}
+    for username, is_admin in [("alice", False), ("admin", True)]:
+        user = User(username=username, password_hash=hash_password("pass1234"), is_admin=is_admin)
+        db.add(user)
+        db.commit()
+        users[username] = {"Authorization": "Bearer " + create_access_token(
+            data={"sub": str(user.id), "username": username, "is_admin": is_admin}
+        )}
+    db.close()
+    return TestClient(app), users, queries
+
+
+def test_cached_requests_skip_user_query():
+    """Only the first request loads the user row."""
+    client, users, queries = _make_client()
+
+    assert client.get("/api/auth/me", headers=users["alice"]).json()["username"] == "alice"
+    queries.clear()
+    for _ in range(5):
+        response = client.get("/api/auth/me", headers=users["alice"])
+        assert response.status_code == 200
+    assert not [q for q in queries if "FROM users" in q]
+    assert user_cache.stats["user_hits"] >= 5
+
+
+def test_password_change_invalidates():
+    """After a password change the next request reloads the user row."""
+    client, users, queries = _make_client()
+    client.get("/api/auth/me", headers=users["alice"])
+
+    response = client.put("/api/user/password", headers=users["alice"], json={
+        "current_password": "pass1234", "new_password": "newpass5678"
+    })
+    assert response.status_code == 200
+
+    queries.clear()
+    client.get("/api/auth/me", headers=users["alice"])
+    assert [q for q in queries if "FROM users" in q]
+
+    # The old password no longer verifies against the reloaded row
+    response = client.put("/api/user/password", headers=users["alice"], json={
+        "current_password": "pass1234", "new_password": "other9012"
+    })
+    assert response.status_code == 400
+
+
+def test_admin_delete_invalidates():
+    """A deleted user's cached token and row stop working immediately."""
+    client, users, queries = _make_client()
+    me = client.get("/api/auth/me", headers=users["alice"]).json()
+
+    response = client.delete(f"/api/admin/users/{me['id']}", headers=users["admin"])
+    assert response.status_code == 200
+
+    response = client.get("/api/auth/me", headers=users["alice"])
+    assert response.status_code == 401
+
+
+if __name__ == "__main__":
+    test_cached_requests_skip_user_query()
+    test_password_change_invalidates()
+    test_admin_delete_invalidates()
+    app.dependency_overrides.clear()
+    print("✓ ALL USER CACHE TESTS PASSED!")
@@ -0,0 +1,143 @@
+"""
+Wheelhouse test script.
+
+Runs AutomationService.install_dependencies with the commands recorded
+instead of executed, in a throwaway directory, and checks:
+1. The first install builds the wheelhouse and installs from it offline
+2. A second install with the same requirements.txt skips pip wheel entirely
+3. Changing requirements.txt uses a different wheelhouse
+4. A failed wheel build falls back to pip install -r requirements.txt
+5. An expired wheelhouse, or SETUP_REFRESH_WHEELS=1, is rebuilt from scratch
+"""
+
+import json
+import os
+import subprocess
+import tempfile
+import time
+
+import automation_service
+from automation_service import AutomationService
+
+
+class RecordingService(AutomationService):
+    """AutomationService whose commands are recorded, not run."""
+
+    def __init__(self, config_path, fail_wheel=False):
+        super().__init__(config_path)
+        self.commands = []
+        self.fail_wheel = fail_wheel
+
+    def _run_command(self, cmd, check=True, capture_output=False, cwd=None):
+        self.commands.append(cmd)
+        if '-c' in cmd:  # the Python version/platform probe
+            return subprocess.CompletedProcess(cmd, 0, stdout="py311-linux-x86_64\n", stderr="")
+        if 'wheel' in cmd and self.fail_wheel:
+            raise subprocess.CalledProcessError(1, cmd)
+        return subprocess.CompletedProcess(cmd, 0)
+
+
+SETTINGS = (automation_service.WHEELHOUSE_DIR, automation_service.USE_UV,
+            automation_service.WHEELHOUSE_MAX_AGE_DAYS, automation_service.REFRESH_WHEELS)
+
+
+def _restore():
+    (automation_service.WHEELHOUSE_DIR, automation_service.USE_UV,
+     automation_service.WHEELHOUSE_MAX_AGE_DAYS, automation_service.REFRESH_WHEELS) = SETTINGS
+
+
+def _setup(requirements="fastapi==0.110.0\n"):
+    """Work in a throwaway directory with a config, requirements.txt and wheelhouse root."""
+    work_dir = tempfile.mkdtemp()
+    os.chdir(work_dir)
+    with open("user_config.json", "w") as f:
+        json.dump({}, f)
+    with open("requirements.txt", "w") as f:
+        f.write(requirements)
+    automation_service.WHEELHOUSE_DIR = os.path.join(work_dir, "wheelhouse")
+    automation_service.USE_UV = False
+    automation_service.WHEELHOUSE_MAX_AGE_DAYS = 7
+    automation_service.REFRESH_WHEELS = False
+
+
+def _ran(service, word):
+    return [cmd for cmd in service.commands if word in cmd]
+
+
+def test_wheelhouse_reused():
+    """Build once, then install offline without pip wheel or a pip upgrade."""
+    cwd = os.getcwd()
+    try:
+        _setup()
+        first = RecordingService("user_config.json")
+        first.install_dependencies()
+        assert first.install_details["wheelhouse"] == "miss"
+        assert len(_ran(first, 'wheel')) == 1
+        assert all('--no-index' in cmd for cmd in _ran(first, '-r') if 'install' in cmd)
+
+        second = RecordingService("user_config.json")
+        second.install_dependencies()
+        assert second.install_details["wheelhouse"] == "hit"
+        assert not _ran(second, 'wheel') and not _ran(second, '--upgrade')
+        assert len(_ran(second, '--no-index')) == 1
+
+        with open("requirements.txt", "a") as f:
+            f.write("httpx==0.27.0\n")
+        third = RecordingService("user_config.json")
+        third.install_dependencies()
+        assert third.install_details["wheelhouse"] == "miss"
+        assert len(os.listdir(automation_service.WHEELHOUSE_DIR)) == 2
+    finally:
+        os.chdir(cwd)
+        _restore()
+
+
+def test_fallback_to_index():
+    """If wheels can't be built, requirements are installed from the index."""
+    cwd = os.getcwd()
+    try:
+        _setup()
+        service = RecordingService("user_config.json", fail_wheel=True)
+        service.install_dependencies()
+        assert service.install_details["wheelhouse"] == "fallback"
+        assert service.commands[-1][-3:] == ['install', '-r', 'requirements.txt']
+    finally:
+        os.chdir(cwd)
+        _restore()
+
+
+def test_stale_wheelhouse_rebuilt():
+    """Wheelhouses past WHEELHOUSE_MAX_AGE_DAYS, or refreshed on request, are built again."""
+    cwd = os.getcwd()
+    try:
+        _setup()
+        RecordingService("user_config.json").install_dependencies()
+        wheelhouse = os.path.join(automation_service.WHEELHOUSE_DIR, os.listdir(automation_service.WHEELHOUSE_DIR)[0])
+        marker = os.path.join(wheelhouse, ".complete")
+        old_wheel = os.path.join(wheelhouse, "fastapi-0.110.0-py3-none-any.whl")
+        open(old_wheel, "w").close()
+
+        eight_days_ago = time.time() - 8 * 86400
+        os.utime(marker, (eight_days_ago, eight_days_ago))
+        expired = RecordingService("user_config.json")
+        expired.install_dependencies()
+        assert expired.install_details["wheelhouse"] == "expired"
+        assert len(_ran(expired, 'wheel')) == 1 and not os.path.exists(old_wheel)
+
+        automation_service.REFRESH_WHEELS = True
+        refreshed = RecordingService("user_config.json")
+        refreshed.install_dependencies()
+        assert refreshed.install_details["wheelhouse"] == "refresh"
+
+        automation_service.REFRESH_WHEELS = False
+        assert RecordingService("user_config.json")._wheelhouse_state(marker) == "hit"
+    finally:
+        os.chdir(cwd)
+        _restore()
+
+
+if __name__ == "__main__":
+    test_wheelhouse_reused()
+    test_fallback_to_index()
+    test_stale_wheelhouse_rebuilt()
+    print("✓ ALL WHEELHOUSE TESTS PASSED!")
@@ -0,0 +1,132 @@
+"""
+In-process caches for get_current_user.
+
+Every authenticated request decodes its JWT and loads the user row. Both are
+cached here for a short TTL so busy endpoints (document lists, tenant task
+routes) do no JWT or database work for the user lookup:
+- Decoded token payloads, keyed by the token string, never kept past the
+  token's own expiry
+- User rows, keyed by user id; every request gets its own detached copy
+
+Entries are dropped with invalidate_user() when a user changes their
+password or profile, or an admin deletes the user or resets their password.
+Other workers pick the change up within the TTL.
+
+Configuration (environment variables):
+    AUTH_TOKEN_CACHE_TTL    Seconds a decoded token is reused (default 60, 0 disables)
+    AUTH_USER_CACHE_TTL     Seconds a user row is reused (default 30, 0 disables)
+    AUTH_CACHE_SIZE         Entries kept in each cache (default 10000)
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from database import User
+
+TOKEN_CACHE_TTL = float(os.getenv("AUTH_TOKEN_CACHE_TTL", "60"))
+USER_CACHE_TTL = float(os.getenv("AUTH_USER_CACHE_TTL", "30"))
+AUTH_CACHE_SIZE = int(os.getenv("AUTH_CACHE_SIZE", "10000"))
+
+# Columns copied out of a loaded user row
+USER_COLUMNS = [column.name for column in User.__table__.columns]
+
+
+class UserCache:
+    """
+    TTL caches of decoded tokens and user rows.
+
+    Example:
+        payload = user_cache.get_token(token)
+        if payload is None:
+            payload = decode_access_token(token)
+            user_cache.put_token(token, payload)
+    """
+
+    def __init__(self, token_ttl: float = TOKEN_CACHE_TTL, user_ttl: float = USER_CACHE_TTL,
+                 max_entries: int = AUTH_CACHE_SIZE):
+        self.token_ttl = token_ttl
+        self.user_ttl = user_ttl
+        self.max_entries = max_entries
+        self._tokens: "OrderedDict[str, tuple]" = OrderedDict()
+        self._users: "OrderedDict[int, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"token_hits": 0, "token_misses": 0, "user_hits": 0, "user_misses": 0}
+
+    def _put(self, cache: OrderedDict, key, value, expires: float):
+        cache[key] = (value, expires)
+        cache.move_to_end(key)
+        while len(cache) > self.max_entries:
+            cache.popitem(last=False)
+
+    def _get(self, cache: OrderedDict, key, stat: str):
+        entry = cache.get(key)
+        if entry is None or entry[1] <= time.time():
+            if entry is not None:
+                del cache[key]
+            self.stats[f"{stat}_misses"] += 1
+            return None
+        cache.move_to_end(key)
+        self.stats[f"{stat}_hits"] += 1
+        return entry[0]
+
+    def get_token(self, token: str) -> Optional[Dict[str, Any]]:
+        """Return the cached payload of a token, or None."""
+        with self._lock:
+            return self._get(self._tokens, token, "token")
+
+    def put_token(self, token: str, payload: Dict[str, Any]):
+        """Cache a decoded token payload until the TTL or the token's expiry."""
+        if self.token_ttl <= 0:
+            return
+        expires = time.time() + self.token_ttl
+        if payload.get("exp"):
+            expires = min(expires, float(payload["exp"]))
+        with self._lock:
+            self._put(self._tokens, token, payload, expires)
+
+    def get_user(self, user_id: int) -> Optional[User]:
+        """
+        Return a detached copy of a cached user row, or None.
+
+        Args:
+            user_id (int): User id
+
+        Returns:
+            User: Transient User instance (changes to it are not saved)
+        """
+        with self._lock:
+            values = self._get(self._users, user_id, "user")
+        return User(**values) if values is not None else None
+
+    def put_user(self, user: User):
+        """Cache the column values of a loaded user row."""
+        if self.user_ttl <= 0:
+            return
+        values = {name: getattr(user, name) for name in USER_COLUMNS}
+        with self._lock:
+            self._put(self._users, user.id, values, time.time() + self.user_ttl)
+
+    def invalidate_user(self, user_id: int):
+        """
+        Drop a user's row and every cached token issued to them.
+
+        Args:
+            user_id (int): User id
+        """
+        with self._lock:
+            self._users.pop(user_id, None)
+            for token in [t for t, (payload, _) in self._tokens.items() if payload.get("sub") == str(user_id)]:
+                del self._tokens[token]
+
+    def clear(self):
+        """Drop every cached token and user."""
+        with self._lock:
+            self._tokens.clear()
+            self._users.clear()
+
+
+# Global cache instance used by auth.get_current_user
+user_cache = UserCache()
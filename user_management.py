@@ -8,12 +8,14 @@ This module provides authenticated users the ability to:
 
 from fastapi import APIRouter, HTTPException, Depends, status
 from pydantic import BaseModel, Field
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 
-from database import get_db, User
-from auth_utils import hash_password, verify_password, validate_password_strength
+from database import get_async_db, User
+from auth_utils import hash_password_async, verify_password_async, validate_password_strength
 from auth import get_current_user
+from user_cache import user_cache
 
 router = APIRouter(prefix="/api/user", tags=["user-management"])
 
@@ -42,7 +44,7 @@ class UserResponse(BaseModel):
 async def change_password(
     request: ChangePasswordRequest,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Change user's password.
@@ -60,10 +62,18 @@ async def change_password(
     Raises:
         HTTPException: If current password is incorrect or new password is invalid
     """
-    # Verify current password
-    if not verify_password(request.current_password, current_user.password_hash):
+    # Load the row itself; current_user may be a cached, detached copy
+    current_user = await db.get(User, current_user.id)
+    if current_user is None:
         raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    
+    # Verify current password first, so a wrong one costs a single bcrypt check
+    if not await verify_password_async(request.current_password, current_user.password_hash):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
             detail="Current password is incorrect"
         )
     
@@ -76,15 +86,16 @@ async def change_password(
         )
     
     # Check if new password is same as current
-    if verify_password(request.new_password, current_user.password_hash):
+    if await verify_password_async(request.new_password, current_user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="New password must be different from current password"
         )
     
     # Update password
-    current_user.password_hash = hash_password(request.new_password)
-    db.commit()
+    current_user.password_hash = await hash_password_async(request.new_password)
+    await db.commit()
+    user_cache.invalidate_user(current_user.id)
     
     return UserResponse(
         success=True,
@@ -96,7 +107,7 @@ async def change_password(
 async def update_profile(
     request: UpdateProfileRequest,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Update user profile information.
@@ -121,6 +132,14 @@ async def update_profile(
             detail="At least one field (username or email) must be provided"
         )
     
+    # Load the row itself; current_user may be a cached, detached copy
+    current_user = await db.get(User, current_user.id)
+    if current_user is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    
     # Update username if provided
     if request.username:
         # Check if username is different
@@ -131,10 +150,10 @@ async def update_profile(
             )
         
         # Check if username already exists
-        existing_user = db.query(User).filter(
+        existing_user = await db.scalar(select(User).where(
             User.username == request.username,
             User.id != current_user.id
-        ).first()
+        ))
         
         if existing_user:
             raise HTTPException(
@@ -154,10 +173,10 @@ async def update_profile(
             )
         
         # Check if email already exists
-        existing_email = db.query(User).filter(
+        existing_email = await db.scalar(select(User).where(
             User.email == request.email,
             User.id != current_user.id
-        ).first()
+        ))
         
         if existing_email:
             raise HTTPException(
@@ -168,8 +187,9 @@ async def update_profile(
         current_user.email = request.email
     
     # Commit changes
-    db.commit()
-    db.refresh(current_user)
+    await db.commit()
+    await db.refresh(current_user)
+    user_cache.invalidate_user(current_user.id)
     
     return UserResponse(
         success=True,